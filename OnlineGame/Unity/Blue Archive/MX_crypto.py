@@ -1,5 +1,7 @@
 import base64
+from functools import lru_cache
 
+import numpy as np
 import xxhash
 
 
@@ -43,18 +45,72 @@ class Mt19937:
         x ^= x >> 18
         return x & 0xFFFFFFFF
 
+    def next_u32_array(self, count: int) -> np.ndarray:
+        """Same words as `count` calls to next_u32, twisted 624 at a time and tempered in bulk with NumPy."""
+        state = np.array(self.state, dtype=np.uint32)
+        out = np.empty(count, dtype=np.uint32)
+        done = min(count, self.N - self.idx)
+        out[:done] = state[self.idx : self.idx + done]
+        self.idx += done
+        while done < count:
+            _twist(state)
+            n = min(count - done, self.N)
+            out[done : done + n] = state[:n]
+            self.idx = n
+            done += n
+        self.state = state.tolist()
+        return _temper(out)
+
+
+def _twist(mt: np.ndarray):
+    """In-place _fill_next_state. Word i reads the already-twisted word i + M - N once i >= N - M, so the
+    second half goes in two slices of at most N - M words, and the last word sees the new mt[0]."""
+    n, m = Mt19937.N, Mt19937.M
+    for lo, hi in ((0, n - m), (n - m, 2 * (n - m)), (2 * (n - m), n - 1)):
+        x = (mt[lo:hi] & 0x80000000) | (mt[lo + 1 : hi + 1] & 0x7FFFFFFF)
+        src = mt[lo + m : hi + m] if hi <= n - m else mt[lo + m - n : hi + m - n]
+        mt[lo:hi] = src ^ (x >> 1) ^ ((x & 1) * np.uint32(Mt19937.MATRIX_A))
+    x = (int(mt[n - 1]) & 0x80000000) | (int(mt[0]) & 0x7FFFFFFF)
+    mt[n - 1] = int(mt[m - 1]) ^ (x >> 1) ^ (Mt19937.MATRIX_A if x & 1 else 0)
+
+
+def _temper(y: np.ndarray) -> np.ndarray:
+    y ^= y >> 11
+    y ^= (y << 7) & np.uint32(0x9D2C5680)
+    y ^= (y << 15) & np.uint32(0xEFC60000)
+    y ^= y >> 18
+    return y
+
 
 def next_bytes(rng: Mt19937, length: int) -> bytes:
-    buf = bytearray(length)
-    num_chunks = (length + 3) // 4
-    for i in range(num_chunks):
-        num = (rng.next_u32() >> 1) & 0x7FFFFFFF
-        offset = i * 4
-        end = min(offset + 4, length)
-        for j in range(offset, end):
-            shift = (j - offset) * 8
-            buf[j] = (num >> shift) & 0xFF
-    return bytes(buf)
+    words = rng.next_u32_array((length + 3) // 4)
+    return (words >> 1).astype("<u4").tobytes()[:length]
+
+
+class KeyStream:
+    """next_bytes keystream of one seed, kept so later files with the same type name reuse the generated prefix."""
+
+    def __init__(self, seed: int):
+        self.rng = Mt19937(seed)
+        self.data = np.empty(0, dtype=np.uint8)
+
+    def take(self, length: int) -> np.ndarray:
+        if length > len(self.data):
+            # Extend in whole words; next_bytes' trailing partial word must not be dropped from the stream.
+            words = self.rng.next_u32_array((length - len(self.data) + 3) // 4)
+            self.data = np.concatenate((self.data, (words >> 1).astype("<u4").view(np.uint8)))
+        return self.data[:length]
+
+
+@lru_cache(maxsize=64)
+def keystream(seed: int) -> KeyStream:
+    return KeyStream(seed & 0xFFFFFFFF)
+
+
+def xor_decrypt(data: bytes, seed: int) -> bytes:
+    """bytes(b ^ k for b, k in zip(data, next_bytes(Mt19937(seed), len(data)))) as one array op."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    return np.bitwise_xor(buf, keystream(seed).take(len(buf))).tobytes()
 
 
 def derive_password(filename: str) -> bytes:
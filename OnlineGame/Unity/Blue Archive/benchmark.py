@@ -0,0 +1,136 @@
+import argparse
+import importlib
+import json
+import random
+import time
+from pathlib import Path
+
+import flatbuffers
+import numpy as np
+from flatbuffers import number_types
+
+from fbs_parser import fb_to_dict, table_codec, table_fields
+
+GLOBAL_DIR = Path(__file__).resolve().parent / "Global"
+TEXT = "ABCDEFGabcdefg0123456789_/あいうえおカキクケコ先生生徒"
+# What each vtable slot stores; the numpy/length/isnone getters share the slot of their vector.
+DATA_KINDS = ("scalar", "string", "table", "scalar_vector", "string_vector", "table_vector")
+
+
+def generated_tables():
+    for path in sorted(GLOBAL_DIR.glob("*.py")):
+        if path.stem == "__init__":
+            continue
+        cls = getattr(importlib.import_module(f"Global.{path.stem}"), path.stem, None)
+        if cls is not None and hasattr(cls, "GetRootAs"):
+            yield cls
+
+
+def random_scalar(flags, rng):
+    if flags is number_types.BoolFlags:
+        return rng.random() < 0.5
+    if flags.py_type is float:
+        return float(np.float32(rng.uniform(-1e4, 1e4)))
+    return rng.randint(flags.min_val, flags.max_val)
+
+
+def random_text(rng):
+    return "".join(rng.choice(TEXT) for _ in range(rng.randint(0, 24)))
+
+
+def build_table(builder, cls, rng, rows, depth):
+    """Fills every slot of cls with random data (some left absent); returns the table offset."""
+    slots = {}
+    for field in table_fields(cls):
+        if field.kind in DATA_KINDS:
+            slots[field.slot] = field
+
+    values = {}
+    for slot, field in slots.items():
+        if rng.random() < 0.15 or (field.kind in ("table", "table_vector") and depth >= 2):
+            continue
+        if field.kind == "scalar":
+            values[slot] = random_scalar(field.flags, rng)
+        elif field.kind == "string":
+            values[slot] = builder.CreateString(random_text(rng))
+        elif field.kind == "table":
+            values[slot] = build_table(builder, field.child, rng, rows, depth + 1)
+        elif field.kind == "scalar_vector":
+            items = [random_scalar(field.flags, rng) for _ in range(rng.randint(0, 6))]
+            values[slot] = builder.CreateNumpyVector(np.array(items, dtype=number_types.to_numpy_type(field.flags)))
+        else:
+            count = rows if depth == 0 and field.kind == "table_vector" else rng.randint(0, 3)
+            if field.kind == "string_vector":
+                offsets = [builder.CreateString(random_text(rng)) for _ in range(count)]
+            else:
+                offsets = [build_table(builder, field.child, rng, rows, depth + 1) for _ in range(count)]
+            builder.StartVector(4, count, 4)
+            for offset in reversed(offsets):
+                builder.PrependUOffsetTRelative(offset)
+            values[slot] = builder.EndVector()
+
+    builder.StartObject(max(slots, default=2) // 2 - 1)
+    for slot, value in values.items():
+        field = slots[slot]
+        if field.kind == "scalar":
+            builder.PrependSlot(field.flags, slot // 2 - 2, value, field.default)
+        else:
+            builder.PrependUOffsetTRelativeSlot(slot // 2 - 2, value, 0)
+    return builder.EndObject()
+
+
+def build_buffer(cls, rng, rows):
+    builder = flatbuffers.Builder(1024)
+    builder.Finish(build_table(builder, cls, rng, rows, 0))
+    return bytes(builder.Output())
+
+
+def normalise(value):
+    """fb_to_dict leaves non-vector sub-tables as generated objects; decode them for comparison."""
+    if hasattr(value, "_tab"):
+        return normalise(fb_to_dict(value, type(value)))
+    if isinstance(value, dict):
+        return {k: normalise(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalise(v) for v in value]
+    return value
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200, help="Rows in each table's top-level vectors (DataList)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="Print the N tables with the largest reflective decode time")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    total_old = total_new = total_build = 0.0
+    per_table = []
+    tables = list(generated_tables())
+    for cls in tables:
+        buf = build_buffer(cls, rng, args.rows)
+        pos = int.from_bytes(buf[:4], "little")
+
+        start = time.perf_counter()
+        codec = table_codec(cls)
+        total_build += time.perf_counter() - start
+
+        old, old_elapsed = timed(lambda: fb_to_dict(cls.GetRootAs(buf, 0), cls), args.repeat)
+        new, new_elapsed = timed(lambda: codec(buf, pos), args.repeat)
+        if json.dumps(normalise(old), ensure_ascii=False) != json.dumps(new, ensure_ascii=False):
+            raise AssertionError(f"{cls.__name__}: codec output differs from fb_to_dict")
+        total_old += old_elapsed
+        total_new += new_elapsed
+        per_table.append((old_elapsed, new_elapsed, cls.__name__, len(buf)))
+
+    for old_elapsed, new_elapsed, name, size in sorted(per_table, reverse=True)[: args.top]:
+        print(f"{name:>48}: {size / 1024:8.1f} KiB, fb_to_dict {old_elapsed * 1000:8.2f}ms, codec {new_elapsed * 1000:7.2f}ms, x{old_elapsed / new_elapsed:.1f}")
+    print(f"{len(tables)} tables: fb_to_dict {total_old:.2f}s, codec {total_new:.2f}s (+{total_build:.2f}s building codecs), x{total_old / total_new:.1f}")
@@ -1,10 +1,11 @@
 import argparse
 import glob
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import xxhash
-from MX_crypto import Mt19937, next_bytes
+from MX_crypto import xor_decrypt
 
 
 def decrypt_file(src_path: Path, dst_root: Path, in_root: Path, type_map):
@@ -16,16 +17,30 @@ def decrypt_file(src_path: Path, dst_root: Path, in_root: Path, type_map):
     name = src_path.stem
     type_name = type_map.get(name.lower(), name)
     seed = xxhash.xxh32(type_name.encode("utf-8"), seed=0).intdigest() & 0xFFFFFFFF
-    rng = Mt19937(seed)
-    ks = next_bytes(rng, len(data))
-    dec = bytes(b ^ k for b, k in zip(data, ks))
-    out_path.write_bytes(dec)
+    out_path.write_bytes(xor_decrypt(data, seed))
+
+
+def try_decrypt_file(src_path: Path, dst_root: Path, in_root: Path, type_map):
+    try:
+        decrypt_file(src_path, dst_root, in_root, type_map)
+    except Exception as e:
+        return src_path.relative_to(in_root), False, f"{e}"
+    return src_path.relative_to(in_root), True, ""
+
+
+def report(results):
+    for rel_path, success, msg in results:
+        if success:
+            print(f"已解密: {rel_path}")
+        else:
+            print(f"解密失败: {rel_path}: {msg}")
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("input_dir", help="输入包含 .bytes 的目录（递归）")
     ap.add_argument("output_dir", help="输出目录")
+    ap.add_argument("--jobs", type=int, default=0, help="进程数 (0 = CPU 核数, 1 = 不用进程池)")
     args = ap.parse_args()
 
     in_dir = Path(args.input_dir)
@@ -52,12 +67,13 @@ def main():
         print("未发现 .bytes 文件")
         return
 
-    for p in paths:
-        try:
-            decrypt_file(p, out_dir, in_dir, type_map)
-            print(f"已解密: {p.relative_to(in_dir)}")
-        except Exception as e:
-            print(f"解密失败: {p.relative_to(in_dir)}: {e}")
+    max_workers = args.jobs if args.jobs > 0 else max(1, os.cpu_count() or 1)
+    if max_workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            futures = [ex.submit(try_decrypt_file, p, out_dir, in_dir, type_map) for p in paths]
+            report(fu.result() for fu in as_completed(futures))
+    else:
+        report(try_decrypt_file(p, out_dir, in_dir, type_map) for p in paths)
 
 
 if __name__ == "__main__":
@@ -1,66 +1,137 @@
 import argparse
+import itertools
 import json
+import os
 import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from fbs_parser import deserialize_bytes_file
+from fbs_parser import deserialize_bytes
 
+FORMATS = {"json": ".json", "jsonl": ".jsonl"}
 
-def dump_table(conn: sqlite3.Connection, table: str, out_dir: Path):
+
+def open_database(db_path: Path, key: str | None = None, cipher: str | None = None):
+    """Plain ExcelDB.db through sqlite3; with a key, the encrypted database through apsw-sqlite3mc."""
+    if key is None:
+        return sqlite3.connect(db_path.resolve().as_uri() + "?mode=ro", uri=True)
+    import apsw
+
+    connection = apsw.Connection(str(db_path), flags=apsw.SQLITE_OPEN_READONLY)
+    if cipher:
+        connection.pragma("cipher", cipher)
+    connection.pragma("hexkey", key)
+    connection.pragma("user_version")
+    return connection
+
+
+def convert_row(table: str, cols, row, has_bytes: bool) -> dict:
+    item = {}
+    blob_json = None
+    for col_name, value in zip(cols, row):
+        if has_bytes and col_name.lower() == "bytes" and value is not None:
+            blob_json = deserialize_bytes(bytes(value), table)
+        else:
+            if isinstance(value, bytes):
+                item[col_name] = value.decode("utf-8", errors="ignore")
+            else:
+                item[col_name] = value
+    if blob_json is not None:
+        item["Parsed"] = blob_json
+    return item
+
+
+def encode_batch(table: str, cols, rows, has_bytes: bool, fmt: str) -> list[str]:
+    """Worker: decodes the blobs of one batch and returns each row already serialised."""
+    out = []
+    for row in rows:
+        item = convert_row(table, cols, row, has_bytes)
+        if fmt == "jsonl":
+            out.append(json.dumps(item, ensure_ascii=False))
+        else:
+            # One element of json.dump(rows, indent=2): every line shifted one level in.
+            out.append("  " + json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+    return out
+
+
+class RowWriter:
+    """Streams serialised rows as JSON Lines, or as the same text json.dump(rows, indent=2) would produce."""
+
+    def __init__(self, f, fmt: str):
+        self.f = f
+        self.fmt = fmt
+        self.count = 0
+
+    def write(self, encoded: list[str]):
+        for text in encoded:
+            if self.fmt == "jsonl":
+                self.f.write(text + "\n")
+            else:
+                self.f.write(("[\n" if self.count == 0 else ",\n") + text)
+            self.count += 1
+
+    def close(self):
+        if self.fmt == "json":
+            self.f.write("[]" if self.count == 0 else "\n]")
+
+
+def dump_table(conn, table: str, out_dir: Path, fmt: str = "json", batch_size: int = 256, pool=None, max_pending: int = 4):
     cur = conn.execute(f"PRAGMA table_info({table})")
     cols = [row[1] for row in cur.fetchall()]  # cid, name, type, notnull, dflt_value, pk
     has_bytes = any(c.lower() == "bytes" for c in cols)
 
-    cur = conn.execute(f"SELECT * FROM {table}")
-    rows = cur.fetchall()
-
     # Prepare output path
-    out_path = out_dir / f"{table}.json"
+    out_path = out_dir / f"{table}{FORMATS[fmt]}"
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    out_items = []
-    for row in rows:
-        item = {}
-        blob_json = None
-        for col_name, value in zip(cols, row):
-            if has_bytes and col_name.lower() == "bytes" and value is not None:
-                if isinstance(value, memoryview):
-                    data = bytes(value)
-                else:
-                    data = value
-                bytes_path = out_dir / f"{table}.bytes"
-                bytes_path.write_bytes(data)
-                records = deserialize_bytes_file(bytes_path)
-                blob_json = records
-            else:
-                if isinstance(value, bytes):
-                    item[col_name] = value.decode("utf-8", errors="ignore")
-                else:
-                    item[col_name] = value
-        if blob_json is not None:
-            item["Parsed"] = blob_json
-        out_items.append(item)
-
+    rows = iter(conn.execute(f"SELECT * FROM {table}"))
     with out_path.open("w", encoding="utf-8") as f:
-        json.dump(out_items, f, ensure_ascii=False, indent=2)
+        writer = RowWriter(f, fmt)
+        # Bounded window of in-flight batches: decoding overlaps with reading, results are written in row order.
+        pending = deque()
+        while batch := list(itertools.islice(rows, batch_size)):
+            if pool is None:
+                writer.write(encode_batch(table, cols, batch, has_bytes, fmt))
+                continue
+            pending.append(pool.submit(encode_batch, table, cols, batch, has_bytes, fmt))
+            if len(pending) >= max_pending:
+                writer.write(pending.popleft().result())
+        while pending:
+            writer.write(pending.popleft().result())
+        writer.close()
+    return writer.count
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--db_path", default=r"C:\Program Files (x86)\Steam\steamapps\common\BlueArchive\BlueArchive_Data\StreamingAssets\PUB\Resource\Preload\TableBundles\ExcelDB.db")
     ap.add_argument("--output_dir", default=r"C:\Program Files (x86)\Steam\steamapps\common\BlueArchive\BlueArchive_Data\StreamingAssets\PUB\Resource\Preload\TableBundles\ExcelDB.json")
+    ap.add_argument("--format", choices=FORMATS, default="json", help="json: 每表一个 JSON 数组; jsonl: 每行一条记录")
+    ap.add_argument("--batch_size", type=int, default=256, help="每批读取/解析的行数")
+    ap.add_argument("--jobs", type=int, default=0, help="解析 FlatBuffers 的进程数 (0 = CPU 核数, 1 = 不用进程池)")
+    ap.add_argument("--key", default=None, help="加密数据库的 hex key (sqlite3mc, 需要 apsw-sqlite3mc)")
+    ap.add_argument("--cipher", default=None, help="sqlite3mc 加密算法, 例如 chacha20 / sqlcipher")
     args = ap.parse_args()
 
     db_path = Path(args.db_path)
     out_dir = Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(db_path))
+    conn = open_database(db_path, args.key, args.cipher)
     cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%DBSchema%'")
     tables = [r[0] for r in cur.fetchall()]
-    for t in tables:
-        dump_table(conn, t, out_dir)
-        print(f"已导出: {t}")
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for t in tables:
+            count = dump_table(conn, t, out_dir, args.format, args.batch_size, pool, max_pending=jobs * 2)
+            print(f"已导出: {t} ({count} 行)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
 
 
 if __name__ == "__main__":
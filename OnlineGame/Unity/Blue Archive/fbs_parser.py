@@ -1,10 +1,25 @@
+import ast
 import importlib
 import inspect
 import pkgutil
+import re
+import struct
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, NamedTuple, Optional
 
 import numpy as np
+from flatbuffers import number_types
+
+_U16 = struct.Struct("<H").unpack_from
+_U32 = struct.Struct("<I").unpack_from
+_I32 = struct.Struct("<i").unpack_from
+
+_SLOT_RE = re.compile(r"self\._tab\.Offset\((\d+)\)")
+_FLAGS_RE = re.compile(r"number_types\.(\w+Flags), [oa]\b")
+_IMPORT_RE = re.compile(r"from ([\w.]+) import (\w+)")
+_RETURN_RE = re.compile(r"return (.+)\s*$")
+_METHOD_RE = re.compile(r"^    def (\w+)\(.*?(?=^    \S|\Z)", re.M | re.S)
 
 
 def case_insensitive_import(module_name: str):
@@ -36,6 +51,7 @@ def case_insensitive_import(module_name: str):
     return module
 
 
+@lru_cache(maxsize=None)
 def load_schema_module(file_stem: str):
     # e.g. SomeTableDBSchema.bytes -> Global.SomeTableExcel
     if file_stem.lower().endswith("dbschema"):
@@ -102,8 +118,159 @@ def fb_to_dict(obj, root_cls) -> dict:
     return out
 
 
-def deserialize_bytes_file(file_path: Path):
-    stem = file_path.stem
+class Field(NamedTuple):
+    name: str
+    kind: str  # scalar, string, table, numpy, length, isnone, scalar_vector, string_vector, table_vector
+    slot: int  # vtable offset passed to self._tab.Offset()
+    flags: Any = None  # flatbuffers.number_types.*Flags for scalars and scalar vectors
+    default: Any = None  # value returned when a scalar is absent
+    child: Optional[type] = None  # element class for table and table_vector
+
+
+def _classify(name: str, src: str, indexed: bool) -> Optional[Field]:
+    """Reads one flatc-generated getter and returns what it decodes, or None if the shape is unknown."""
+    slot = _SLOT_RE.search(src)
+    if slot is None:
+        return None
+    slot = int(slot.group(1))
+    flags = _FLAGS_RE.search(src)
+    flags = getattr(number_types, flags.group(1)) if flags else None
+    if "GetVectorAsNumpy" in src:
+        return Field(name, "numpy", slot, flags)
+    if "VectorLen" in src:
+        return Field(name, "length", slot)
+    if "o == 0" in src:
+        return Field(name, "isnone", slot)
+    if "Indirect" in src:
+        module_name, cls_name = _IMPORT_RE.search(src).groups()
+        child = getattr(importlib.import_module(module_name), cls_name)
+        return Field(name, "table_vector" if indexed else "table", slot, child=child)
+    if "String(" in src:
+        return Field(name, "string_vector" if indexed else "string", slot)
+    if flags is not None:
+        if indexed:
+            return Field(name, "scalar_vector", slot, flags)
+        return Field(name, "scalar", slot, flags, ast.literal_eval(_RETURN_RE.search(src).group(1)))
+    return None
+
+
+@lru_cache(maxsize=None)
+def table_fields(root_cls) -> Optional[tuple[Field, ...]]:
+    """The keys fb_to_dict would emit for root_cls, in the same order, with how to read each one."""
+    members = [(name, fn) for name, fn in inspect.getmembers(root_cls, inspect.isfunction) if not name.startswith("_") and name[0].isupper()]
+    # One source read per class; getsource per method re-tokenizes the module every time.
+    sources = {m.group(1): m.group(0) for m in _METHOD_RE.finditer(inspect.getsource(root_cls))}
+    fields = []
+    for argcount in (1, 2):
+        for name, fn in members:
+            if getattr(fn, "__code__", None) is None or fn.__code__.co_argcount != argcount:
+                continue
+            if argcount == 2 and not hasattr(root_cls, f"{name}Length"):
+                continue
+            field = _classify(name, sources.get(name) or inspect.getsource(fn), argcount == 2)
+            if field is None:
+                return None
+            fields.append(field)
+    return tuple(fields)
+
+
+def _string(buf, off):
+    off += _U32(buf, off)[0]
+    return buf[off + 4 : off + 4 + _U32(buf, off)[0]].decode("utf-8", errors="ignore")
+
+
+def _vector(buf, off):
+    off += _U32(buf, off)[0]
+    return off + 4, _U32(buf, off)[0]
+
+
+def _vector_len(buf, off):
+    return _U32(buf, off + _U32(buf, off)[0])[0]
+
+
+def _numpy(buf, off, dtype):
+    start, length = _vector(buf, off)
+    return np.frombuffer(buf, dtype, length, start).tolist()
+
+
+def _strings(buf, off):
+    start, length = _vector(buf, off)
+    return [_string(buf, p) for p in range(start, start + 4 * length, 4)]
+
+
+def _tables(buf, off, decode):
+    start, length = _vector(buf, off)
+    return [decode(buf, p + _U32(buf, p)[0]) for p in range(start, start + 4 * length, 4)]
+
+
+def _compile_codec(root_cls, fields: tuple[Field, ...]) -> Callable:
+    """Generates decode(buf, pos) -> dict that reads every vtable slot once and builds the dict in one literal."""
+    ns = {"_U16": _U16, "_U32": _U32, "_I32": _I32, "_string": _string, "_vector_len": _vector_len, "_numpy": _numpy, "_strings": _strings, "_tables": _tables}
+    lines = ["def decode(buf, pos):", "    vt = pos - _I32(buf, pos)[0]", "    vt_len = _U16(buf, vt)[0]"]
+    for slot in sorted({f.slot for f in fields}):
+        lines.append(f"    o{slot} = _U16(buf, vt + {slot})[0] if vt_len > {slot} else 0")
+    lines.append("    return {")
+    for i, f in enumerate(fields):
+        o, at = f"o{f.slot}", f"pos + o{f.slot}"
+        if f.kind in ("numpy", "scalar_vector"):
+            ns[f"_dtype{i}"] = number_types.to_numpy_type(f.flags)
+            expr = f"_numpy(buf, {at}, _dtype{i}) if {o} else {0 if f.kind == 'numpy' else []}"
+        elif f.kind == "scalar":
+            ns[f"_get{i}"] = f.flags.packer_type.unpack_from
+            expr = f"_get{i}(buf, {at})[0] if {o} else {f.default!r}"
+        elif f.kind == "string":
+            expr = f"_string(buf, {at}) if {o} else None"
+        elif f.kind == "string_vector":
+            expr = f"_strings(buf, {at}) if {o} else []"
+        elif f.kind == "table":
+            ns[f"_child{i}"] = table_codec(f.child)
+            expr = f"_child{i}(buf, {at} + _U32(buf, {at})[0]) if {o} else None"
+        elif f.kind == "table_vector":
+            ns[f"_child{i}"] = table_codec(f.child)
+            expr = f"_tables(buf, {at}, _child{i}) if {o} else []"
+        elif f.kind == "length":
+            expr = f"_vector_len(buf, {at}) if {o} else 0"
+        else:  # isnone
+            expr = f"{o} == 0"
+        lines.append(f"        {f.name!r}: {expr},")
+    lines.append("    }")
+    exec(compile("\n".join(lines), f"<codec {root_cls.__name__}>", "exec"), ns)
+    return ns["decode"]
+
+
+def _reflective_codec(root_cls) -> Callable:
+    def decode(buf, pos):
+        obj = root_cls()
+        obj.Init(buf, pos)
+        return fb_to_dict(obj, root_cls)
+
+    return decode
+
+
+_CODECS: dict[type, Callable] = {}
+
+
+def table_codec(root_cls) -> Callable:
+    """decode(buf, pos) -> dict for a generated table class, built once per class.
+
+    Produces the same dict as fb_to_dict; classes with getters it doesn't recognise fall back to fb_to_dict.
+    Sub-tables (non-vector) are decoded into dicts as well, where fb_to_dict leaves the raw object.
+    """
+    codec = _CODECS.get(root_cls)
+    if codec is None:
+        # Self-referencing tables see this forwarder until the real codec is in place.
+        _CODECS[root_cls] = lambda buf, pos: _CODECS[root_cls](buf, pos)
+        try:
+            fields = table_fields(root_cls)
+        except (OSError, ImportError, AttributeError):
+            fields = None
+        codec = _compile_codec(root_cls, fields) if fields is not None else _reflective_codec(root_cls)
+        _CODECS[root_cls] = codec
+    return codec
+
+
+def deserialize_bytes(data: bytes, stem: str):
+    """Decodes one FlatBuffers blob whose schema is named by stem (file stem or *DBSchema table name)."""
     module = load_schema_module(stem)
     if not module:
         raise ValueError(f"Module not found: {stem}")
@@ -118,7 +285,10 @@ def deserialize_bytes_file(file_path: Path):
         get_root_fn = getattr(root_cls, f"GetRootAs{root_name}")
     else:
         raise ValueError(f"GetRootAs function not found: {root_name}")
-    data = file_path.read_bytes()
+    try:
+        return [table_codec(root_cls)(data, _U32(data, 0)[0])]
+    except (struct.error, ValueError, IndexError):
+        pass  # damaged buffer: the reflective path below skips fields it can't read
     try:
         fb_obj = get_root_fn(data, 0)
     except TypeError:
@@ -127,3 +297,7 @@ def deserialize_bytes_file(file_path: Path):
         except TypeError:
             fb_obj = get_root_fn(bytearray(data), 0)
     return [fb_to_dict(fb_obj, root_cls)]
+
+
+def deserialize_bytes_file(file_path: Path):
+    return deserialize_bytes(file_path.read_bytes(), file_path.stem)
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import urllib
 import requests
@@ -7,10 +8,9 @@ import base64
 import blackboxprotobuf as bbpb
 
 from requests.adapters import HTTPAdapter
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from rich.progress import (BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn)
-columns = (SpinnerColumn(), TextColumn("[bold blue]{task.description}"), BarColumn(bar_width=100), "[progress.percentage]{task.percentage:>6.2f}%", TextColumn("{task.completed}/{task.total}"), TimeElapsedColumn(), "•", TimeRemainingColumn())
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from asset_downloader import AssetDownloader, DownloadTask, download_all
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -96,36 +96,11 @@ class Game_API:
                 item = item.split("\\")[-1]
                 result.append(item)
         return result
-    
-    def call_asset(self, endpoint: str) -> bytes:
-        base = urllib.parse.urljoin(self.asset_url, endpoint)
-        resp = self._get(base, allow_redirects=True)
-        return resp.content
 
 def download_many_assetbundle(root, assets, version, workers):
     asset_api = Game_API()
-    with Progress(*columns, transient=True) as prog:
-        task_id = prog.add_task("Downloading", total=len(assets))
-        with ThreadPoolExecutor(max_workers=workers) as pool:
-            future_to_dest = {}
-            for a in assets:
-                url = f"{version}/{a}"
-                dest = os.path.join(root, a)
-
-                future = pool.submit(asset_api.call_asset, url)
-                future_to_dest[future] = dest
-
-            for future in as_completed(future_to_dest):
-                dest = future_to_dest[future]
-                try:
-                    content = future.result()
-                    os.makedirs(os.path.dirname(dest), exist_ok=True)
-                    with open(dest, "wb") as f:
-                        f.write(content)
-                except Exception as e:
-                    prog.console.log(f"[E]Error Saving {dest}: {e}")
-                finally:
-                    prog.update(task_id, advance=1)
+    tasks = [DownloadTask(urllib.parse.urljoin(asset_api.asset_url, f"{version}/{a}"), os.path.join(root, a)) for a in assets]
+    download_all(AssetDownloader(headers=asset_api.headers, workers=workers), tasks)
 
 if __name__ == "__main__":
     args = parse_args()
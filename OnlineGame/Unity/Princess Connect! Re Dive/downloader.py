@@ -1,13 +1,15 @@
+import os
 import re
-import time
+import sys
 import xxhash
 import requests
 import argparse
 from pathlib import Path
 from dataclasses import dataclass
 from requests.adapters import HTTPAdapter
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from rich.progress import (BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from asset_downloader import AssetDownloader, DownloadTask, download_all
 
 BASE_RES_ROOT = "https://prd-priconne-redive.akamaized.net/dl/Resources/10065100/Jpn"
 
@@ -73,18 +75,6 @@ def build_asset_url(hash_str, cat):
     root = pool_root_for(cat)
     return f"{root}/{hash_str[:2]}/{hash_str}"
 
-def download_asset(sess, url, dest):
-    while True:
-        try:
-            resp = sess.get(url)
-            resp.raise_for_status()
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_bytes(resp.content)
-            return
-        except Exception as exc:
-            print(f"[W] Download failed: {exc}")
-            time.sleep(1)
-
 def gather_assets(sess):
     print("Fetching master manifest…")
     master_text = fetch_text(sess, MANIFEST_FILE)
@@ -144,14 +134,10 @@ def filter_existing(assets, root):
             prog.update(task_id, advance=1)
     return to_dl, skipped
 
-def download_many(assets, root, sess, workers):
-    with Progress(*columns, transient=True) as prog:
-        task_id = prog.add_task("Downloading", total=len(assets))
-        with ThreadPoolExecutor(max_workers=workers) as pool:
-            futures = [pool.submit(download_asset, sess, build_asset_url(a.hash_, a.category), root / a.rel_path) for a in assets]
-            for fut in as_completed(futures):
-                fut.result()
-                prog.update(task_id, advance=1)
+def download_many(assets, root, workers):
+    # Size only: column 2 is the pool key, its digest algorithm is not pinned down (see AssetRow)
+    tasks = [DownloadTask(build_asset_url(a.hash_, a.category), str(root / a.rel_path), size=a.size or None) for a in assets]
+    download_all(AssetDownloader(workers=workers), tasks)
 
 def main(out_root, workers):
     out_root.mkdir(parents=True, exist_ok=True)
@@ -167,7 +153,7 @@ def main(out_root, workers):
         print("Up to date")
         return
 
-    download_many(to_dl, out_root, sess, workers)
+    download_many(to_dl, out_root, workers)
     print("Success")
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import io
 import os
+import sys
 import uuid
 import time
 import struct
@@ -15,14 +16,15 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from rich.progress import (BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn)
-columns = (SpinnerColumn(), TextColumn("[bold blue]{task.description}"), BarColumn(bar_width=100), "[progress.percentage]{task.percentage:>6.2f}%", TextColumn("{task.completed}/{task.total}"), TimeElapsedColumn(), "•", TimeRemainingColumn())
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from asset_downloader import AssetDownloader, DownloadTask, download_all, open_digest_cache, pending_tasks
 
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--RAW", default=r"E:\Game_Dataset\jp.co.bandainamcoent.BNEI0242\RAW")
     parser.add_argument("--thread", type=int, default=32)
+    parser.add_argument("--verify", action="store_true", help="ignore the digest cache and rehash every existing file")
+    parser.add_argument("--nocache", action="store_true", help="don't read or write RAW/.digest_cache.sqlite3")
     return parser.parse_args()
 
 class Hash:
@@ -204,86 +206,41 @@ def parse_manifest(data):
         parsed.append(item)
     return parsed
 
-def filter_existing(root, assets):
-    to_dl = []
-    skipped = 0
-    total_bytes = 0
-
+def build_tasks(root, assets, asset_url):
+    tasks = []
+    for a in assets:
+        if a['name'].endswith(".unity3d"):
+            url = f"/dl/resources/AssetBundles/{a['hash'][:2]}/{a['hash']}"
+            dest = os.path.join(root, "a", a['name'])
+
+        elif a['name'].endswith(".acb") or a['name'].endswith(".awb") or a['name'].endswith(".bytes"):
+            url = f"/dl/resources/Sound/{a['hash'][:2]}/{a['hash']}"
+            dest = os.path.join(root, a['name'])
+
+        elif a['name'].endswith(".usm"):
+            url = f"/dl/resources/Movie/{a['hash'][:2]}/{a['hash']}"
+            dest = os.path.join(root, a['name'])
+            
+        elif a['name'].endswith(".mdb"):
+            url = f"/dl/resources/Generic/{a['hash'][:2]}/{a['hash']}"
+            dest = os.path.join(root, "master", a["name"])
+
+        else:
+            print(f"[E] Unknown file type: {a['name']}")
+            continue
+
+        tasks.append(DownloadTask(asset_url + url, dest, size=a['size'], hash=a['hash'], hash_algo="md5"))
+    return tasks
+
+def filter_existing(tasks, cache, workers, verify_all=False):
     print("Scanning existing files (MD5)…")
-    with Progress(*columns, transient=True) as prog:
-        task_id = prog.add_task("Scanning", total=len(assets))
-        for a in assets:
-            if a['name'].endswith(".unity3d"):
-                dest = os.path.join(root, "a", a['name'])
-
-            elif a['name'].endswith(".acb") or a['name'].endswith(".awb") or a['name'].endswith(".bytes"):
-                dest = os.path.join(root, a['name'])
-
-            elif a['name'].endswith(".usm"):
-                dest = os.path.join(root, a['name'])
-                
-            elif a['name'].endswith(".mdb"):
-                dest = os.path.join(root, "master", a["name"])
-                
-            else:
-                print(f"[E] Unknown file type: {a['name']}")
-                continue
-
-            if os.path.exists(dest) and os.path.getsize(dest) == a['size']:
-                with open(dest, "rb") as f:
-                    if Hash.md5(f) == a['hash']:
-                        skipped += 1
-                        prog.update(task_id, advance=1)
-                        continue
-
-            to_dl.append(a)
-            total_bytes += a['size']
-            prog.update(task_id, advance=1)
-
-    total_gib = total_bytes / (1024 ** 3)
+    to_dl = pending_tasks(tasks, cache, workers, verify_all)
+    skipped = len(tasks) - len(to_dl)
+    total_gib = sum(t.size for t in to_dl) / (1024 ** 3)
     return to_dl, skipped, total_gib
 
-def download_many(root, assets, workers):
-    asset_api = Game_API()
-    with Progress(*columns, transient=True) as prog:
-        task_id = prog.add_task("Downloading", total=len(assets))
-        with ThreadPoolExecutor(max_workers=workers) as pool:
-            future_to_dest = {}
-            for a in assets:
-                if a['name'].endswith(".unity3d"):
-                    url = f"/dl/resources/AssetBundles/{a['hash'][:2]}/{a['hash']}"
-                    dest = os.path.join(root, "a", a['name'])
-
-                elif a['name'].endswith(".acb") or a['name'].endswith(".awb") or a['name'].endswith(".bytes"):
-                    url = f"/dl/resources/Sound/{a['hash'][:2]}/{a['hash']}"
-                    dest = os.path.join(root, a['name'])
-
-                elif a['name'].endswith(".usm"):
-                    url = f"/dl/resources/Movie/{a['hash'][:2]}/{a['hash']}"
-                    dest = os.path.join(root, a['name'])
-                    
-                elif a['name'].endswith(".mdb"):
-                    url = f"/dl/resources/Generic/{a['hash'][:2]}/{a['hash']}"
-                    dest = os.path.join(root, "master", a["name"])
-
-                else:
-                    print(f"[E] Unknown file type: {a['name']}")
-                    continue
-
-                future = pool.submit(asset_api.call_asset, url)
-                future_to_dest[future] = dest
-
-            for future in as_completed(future_to_dest):
-                dest = future_to_dest[future]
-                try:
-                    content = future.result()
-                    os.makedirs(os.path.dirname(dest), exist_ok=True)
-                    with open(dest, "wb") as f:
-                        f.write(content)
-                except Exception as e:
-                    prog.console.log(f"[E]Error Saving {dest}: {e}")
-                finally:
-                    prog.update(task_id, advance=1)
+def download_many(tasks, workers, cache=None):
+    download_all(AssetDownloader(headers=Game_API().session.headers, workers=workers), tasks, cache=cache)
                 
 if __name__ == "__main__":
     args = parse_args()
@@ -295,10 +252,13 @@ if __name__ == "__main__":
     asset_db = Game_API().call_asset(f"/dl/{asset_version}/manifests/{parse_manifest(asset_manifest)[2]['name']}")
     asset_db = table_to_dict(asset_db, "manifests")
     
-    to_dl, skipped, total_gib = filter_existing(args.RAW, asset_db)
+    tasks = build_tasks(args.RAW, asset_db, Game_API().ASSET_URL)
+    cache = open_digest_cache(args.RAW, enabled=not args.nocache)
+    to_dl, skipped, total_gib = filter_existing(tasks, cache, args.thread, args.verify)
     print(f"Total: {len(to_dl)}, Skipped: {skipped}, Size: {total_gib:.2f} GiB")
     if not to_dl:
         print("Up to date")
-        exit(0)
-    
-    download_many(args.RAW, to_dl, args.thread)
\ No newline at end of file
+    else:
+        download_many(to_dl, args.thread, cache)
+    if cache:
+        cache.close()
\ No newline at end of file
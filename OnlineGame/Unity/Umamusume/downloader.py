@@ -1,16 +1,16 @@
 import argparse
 import os
 import re
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from itertools import repeat
 from pathlib import Path
 
 import apsw
-import requests
-from requests.adapters import HTTPAdapter
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
-from urllib3.util.retry import Retry
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from asset_downloader import AssetDownloader, DownloadTask, download_all
 
 
 def parse_args():
@@ -87,37 +87,7 @@ DEFAULT_DATABASE_KEY = bytes([
 DEFAULT_CIPHER_NAME = "chacha20"
 
 
-class Game_API:
-    def __init__(self):
-        self.ASSET_URL = "https://prd-storage-app-umamusume.akamaized.net/dl/resources/"
-
-        self.session = requests.Session()
-        retries = Retry(total=100, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100, max_retries=retries)
-        self.session.mount("https://", adapter)
-
-    def _post(self, url, data=None, extra_headers=None, **kw):
-        hdr = self.session.headers.copy()
-        if extra_headers:
-            hdr.update(extra_headers)
-        return self.session.post(url, data=data, headers=hdr, **kw)
-
-    def _get(self, url, extra_headers=None, **kw):
-        hdr = self.session.headers.copy()
-        if extra_headers:
-            hdr.update(extra_headers)
-        return self.session.get(url, headers=hdr, **kw)
-
-    def call_asset(self, endpoint):
-        url = self.ASSET_URL + endpoint
-        while True:
-            try:
-                resp = self._get(url)
-                resp.raise_for_status()
-                return resp.content
-            except requests.RequestException as e:
-                print(f"[W] {e}")
-                time.sleep(2)
+ASSET_URL = "https://prd-storage-app-umamusume.akamaized.net/dl/resources/"
 
 
 def _open_encrypted_meta(meta_path: Path):
@@ -188,7 +158,7 @@ def _prepare_task(row, raw_root):
         except OSError:
             pass
 
-    return endpoint, dest_path
+    return DownloadTask(ASSET_URL + endpoint, dest_path, size=expected_size)
 
 
 def build_download_tasks(rows, raw_root, workers=None):
@@ -211,34 +181,12 @@ def build_download_tasks(rows, raw_root, workers=None):
     return tasks
 
 
-def download_assets(api, tasks, workers):
-    if not tasks:
-        print("[I] No assets to download.")
-        return
-
-    with Progress(*columns, transient=True) as prog:
-        task_id = prog.add_task("Downloading", total=len(tasks))
-        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
-            future_to_info = {pool.submit(api.call_asset, endpoint): (endpoint, dest) for endpoint, dest in tasks}
-            for future in as_completed(future_to_info):
-                endpoint, dest = future_to_info[future]
-                try:
-                    content = future.result()
-                    dest_dir = os.path.dirname(dest)
-                    if dest_dir:
-                        os.makedirs(dest_dir, exist_ok=True)
-                    with open(dest, "wb") as fp:
-                        fp.write(content)
-                except Exception as exc:
-                    prog.console.log(f"[E] Failed downloading {endpoint} -> {dest}: {exc}")
-                finally:
-                    prog.update(task_id, advance=1)
-
-
 if __name__ == "__main__":
     args = parse_args()
     manifest_rows = load_manifest(args.meta)
     download_tasks = build_download_tasks(manifest_rows, args.RAW, args.thread)
 
-    api = Game_API()
-    download_assets(api, download_tasks, args.thread)
+    if not download_tasks:
+        print("[I] No assets to download.")
+    else:
+        download_all(AssetDownloader(workers=args.thread), download_tasks)
@@ -1,16 +1,45 @@
 # Reference: https://github.com/K0lb3/UnityPy/blob/master/UnityPy/tools/extractor.py
 
 import argparse
+import gc
 import json
 import os
+import re
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import UnityPy
+import xxhash
 from tqdm import tqdm
 from UnityPy.classes import Font, MonoBehaviour, Object, PPtr
 from UnityPy.enums.ClassIDType import ClassIDType
+from UnityPy.environment import simplify_name
 
 UnityPy.config.FALLBACK_UNITY_VERSION = "2022.3.32f1"
 
+# 分片模式下每组主 bundle 的总大小上限 (不含依赖)
+SHARD_SIZE = 256 * 1024 * 1024
+SPLIT_RE = re.compile(r"(.+)\.split(\d+)$")
+# 增量模式的索引和孤立输出列表, 都放在导出目录下
+INDEX_NAME = ".export_index.sqlite3"
+ORPHANS_NAME = "orphaned_outputs.txt"
+# 数据全部在对象自身里的类型: bundle 变了但对象字节没变时可以跳过 (贴图/网格等可能引用 .resS, 不能按对象跳过)
+SELF_CONTAINED_TYPES = (ClassIDType.TextAsset, ClassIDType.MonoBehaviour)
+# crawl_obj 缓存的对象数上限 (每个对象只存它引用的 ObjectReader)
+CRAWL_CACHE_SIZE = 65536
+# 类型树 (dict) 中 PPtr 的形式
+PPTR_KEYS = {"m_FileID", "m_PathID"}
+
+# 增量模式下记录导出函数写出的文件
+_written = None
+
+
+def _record(path):
+    if _written is not None:
+        _written.append(path)
+    return path
+
 
 def export_obj(obj, destination, append_name=False, append_path_id=False, export_unknown_as_typetree=False):
     data = obj.read()
@@ -36,8 +65,17 @@ def export_obj(obj, destination, append_name=False, append_path_id=False, export
 def extract_assets(source, target, include_types=None, ignore_first_dirs=0, append_path_id=False, export_unknown_as_typetree=False):
     print("Loading Unity Environment...")
     env = UnityPy.load(source)
+    return export_items(env.container.items(), target, include_types, ignore_first_dirs, append_path_id, export_unknown_as_typetree)
+
+
+def export_items(items, target, include_types=None, ignore_first_dirs=0, append_path_id=False, export_unknown_as_typetree=False, progress=True):
     exported = []
+    for obj_path, obj in tqdm(select_items(items, include_types, progress), ncols=150, disable=not progress):
+        exported.extend(export_item(obj_path, obj, target, ignore_first_dirs, append_path_id, export_unknown_as_typetree))
+    return exported
 
+
+def select_items(items, include_types=None, progress=True):
     type_order = list(EXPORT_TYPES.keys())
 
     def order_key(item):
@@ -47,9 +85,10 @@ def extract_assets(source, target, include_types=None, ignore_first_dirs=0, appe
             idx = len(type_order)
         return idx
 
-    print("Filtering and sorting items...")
+    if progress:
+        print("Filtering and sorting items...")
     filtered_items = []
-    for item in env.container.items():
+    for item in items:
         if item[1].m_PathID == 0:
             print(f"警告: 发现 m_PathID 为 0 的项目: {item[0]}")
             continue
@@ -57,31 +96,344 @@ def extract_assets(source, target, include_types=None, ignore_first_dirs=0, appe
 
     # 对过滤后的项目进行排序
     sorted_items = sorted(filtered_items, key=order_key)
+    return [(obj_path, obj) for obj_path, obj in sorted_items if not include_types or obj.type.name in include_types]
 
-    for obj_path, obj in tqdm(sorted_items, ncols=150):
-        if include_types and obj.type.name not in include_types:
-            continue
 
-        parts = obj_path.split("/")[ignore_first_dirs:]
+def export_item(obj_path, obj, target, ignore_first_dirs=0, append_path_id=False, export_unknown_as_typetree=False):
+    parts = obj_path.split("/")[ignore_first_dirs:]
 
-        filtered_parts = []
-        for p in parts:
-            if p:
-                filtered_parts.append(p)
+    filtered_parts = []
+    for p in parts:
+        if p:
+            filtered_parts.append(p)
 
-        dest_dir = os.path.join(target, *filtered_parts)
+    dest_dir = os.path.join(target, *filtered_parts)
 
-        os.makedirs(os.path.dirname(dest_dir), exist_ok=True)
+    os.makedirs(os.path.dirname(dest_dir), exist_ok=True)
 
-        exports = export_obj(obj, dest_dir, append_path_id=append_path_id, export_unknown_as_typetree=export_unknown_as_typetree)
+    return export_obj(obj, dest_dir, append_path_id=append_path_id, export_unknown_as_typetree=export_unknown_as_typetree)
 
-        exported.extend(exports)
 
+def list_bundles(source):
+    """source 下的所有文件; 分卷文件只保留 .split0, UnityPy 会自动合并"""
+    if os.path.isfile(source):
+        return [source]
+    paths = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            m = SPLIT_RE.match(name)
+            if m and m.group(2) != "0":
+                continue
+            paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def hash_file(path):
+    hasher = xxhash.xxh64()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def scan_and_hash(path):
+    """子进程: 增量模式下扫描的同时计算文件内容哈希"""
+    return hash_file(path), scan_bundle(path)
+
+
+def scan_bundle(path):
+    """子进程: 单个文件自身的 CAB, 它引用的外部 CAB, 以及 container 条目数"""
+    try:
+        env = UnityPy.load(path)
+        cabs = set(env.cabs)
+        deps = set()
+        for f in env.cabs.values():
+            for external in getattr(f, "externals", ()):
+                deps.add(simplify_name(external.path))
+        return sorted(cabs), sorted(deps - cabs), len(env.container)
+    except Exception as e:
+        print(f"警告: 无法读取 {path}: {e}")
+        return [], [], 0
+
+
+def group_bundles(scans, shard_size=SHARD_SIZE, select=None):
+    """把有 container 的 bundle 按 (传递) 依赖集合分组, 同组再按大小切片
+
+    返回 [(主 bundle 列表, 依赖 bundle 列表)]; 每组只导出主 bundle 的 container, 依赖只用于解析 PPtr
+    select(path, deps) 返回 False 的 bundle 不导出 (增量模式下用来跳过没变的 bundle)"""
+    owner = {}
+    for path, (cabs, _, _) in scans.items():
+        for cab in cabs:
+            owner[cab] = path
+
+    def closure(path):
+        seen = set()
+        stack = [path]
+        while stack:
+            for cab in scans[stack.pop()][1]:
+                dep = owner.get(cab)
+                if dep is not None and dep != path and dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return frozenset(seen)
+
+    by_deps = {}
+    for path, (_, _, count) in scans.items():
+        if count:
+            deps = closure(path)
+            if select is None or select(path, deps):
+                by_deps.setdefault(deps, []).append(path)
+
+    shards = []
+    for deps, primaries in by_deps.items():
+        shard, size = [], 0
+        for path in primaries:
+            file_size = os.path.getsize(path)
+            if shard and size + file_size > shard_size:
+                shards.append((shard, sorted(deps - set(shard))))
+                shard, size = [], 0
+            shard.append(path)
+            size += file_size
+        shards.append((shard, sorted(deps - set(shard))))
+    return sorted(shards)
+
+
+def export_shard(primaries, dependencies, target, include_types=None, ignore_first_dirs=0, append_path_id=False, export_unknown_as_typetree=False, tracked=None):
+    """子进程: 用独立的 Environment 导出一组 bundle, 返回后随进程内的引用一起释放
+
+    tracked (增量模式): {主 bundle 的 CAB 名: (相对路径, 上次的 {(container 路径, path_id): (数据哈希, 输出)})}
+    返回 (exported, records), records 为 [(相对路径, container 路径, path_id, 数据哈希, 输出列表)]"""
+    global _written, _crawl_cache
+    env = UnityPy.load(*primaries)
+    # 先取主 bundle 的 container, 再加载依赖
+    items = list(env.container.items())
+    for path in dependencies:
+        env.load_file(path)
+
+    if tracked is None:
+        exported = export_items(items, target, include_types, ignore_first_dirs, append_path_id, export_unknown_as_typetree, progress=False)
+        records = []
+    else:
+        exported, records = [], []
+        for obj_path, obj in select_items(items, include_types, progress=False):
+            rel, previous = tracked.get(simplify_name(obj.assetsfile.name), (None, {}))
+            data_hash = xxhash.xxh64(obj.deref().get_raw_data()).hexdigest()
+            old = previous.get((obj_path, obj.path_id))
+            if old and old[0] == data_hash and obj.type in SELF_CONTAINED_TYPES and all(os.path.exists(os.path.join(target, out)) for out in old[1]):
+                records.append((rel, obj_path, obj.path_id, data_hash, old[1]))
+                continue
+            _written = []
+            try:
+                exported.extend(export_item(obj_path, obj, target, ignore_first_dirs, append_path_id, export_unknown_as_typetree))
+                outputs = sorted({os.path.relpath(out, target).replace("\\", "/") for out in _written})
+            finally:
+                _written = None
+            if rel is not None:
+                records.append((rel, obj_path, obj.path_id, data_hash, outputs))
+
+    # SerializedFile 不能跨进程传回, 换成文件名
+    exported = [(getattr(assets_file, "name", assets_file), path_id) for assets_file, path_id in exported]
+    # Environment 和文件之间有循环引用, 不手动回收的话要等到下一次完整 GC, 内存会随组数累积
+    del env, items
+    _crawl_cache = None
+    gc.collect()
+    return exported, records
+
+
+class ExportIndex:
+    """增量导出索引 (导出目录/.export_index.sqlite3)
+
+    files:   源文件相对路径 -> 大小, mtime_ns, 内容哈希, 扫描结果; stat 没变就不重新哈希和扫描
+    bundles: 上次导出成功的主 bundle -> 内容哈希, 依赖哈希, 导出参数; 三者都没变的 bundle 直接跳过
+    objects: (bundle, container 路径, path_id) -> bundle 哈希, 对象数据哈希, 写出的文件 (每个文件一行)"""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, scan TEXT);
+            CREATE TABLE IF NOT EXISTS bundles (path TEXT PRIMARY KEY, hash TEXT, deps_hash TEXT, options TEXT);
+            CREATE TABLE IF NOT EXISTS objects (path TEXT, container TEXT, path_id INTEGER, bundle_hash TEXT, data_hash TEXT, output TEXT);
+            CREATE INDEX IF NOT EXISTS objects_path ON objects (path);
+            CREATE INDEX IF NOT EXISTS objects_output ON objects (output);
+            """
+        )
+
+    def get_file(self, rel, stat):
+        row = self.conn.execute("SELECT size, mtime_ns, hash, scan FROM files WHERE path = ?", (rel,)).fetchone()
+        if row is None or (row[0], row[1]) != stat:
+            return None
+        return row[2], json.loads(row[3])
+
+    def put_files(self, items):
+        """items: [(相对路径, stat, 哈希, 扫描结果)]"""
+        self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", [(rel, *stat, digest, json.dumps(scan)) for rel, stat, digest, scan in items])
+
+    def retain_files(self, rels):
+        stale = [(row[0],) for row in self.conn.execute("SELECT path FROM files") if row[0] not in rels]
+        self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+
+    def get_bundle(self, rel):
+        return self.conn.execute("SELECT hash, deps_hash, options FROM bundles WHERE path = ?", (rel,)).fetchone()
+
+    def bundle_paths(self):
+        return [row[0] for row in self.conn.execute("SELECT path FROM bundles")]
+
+    def get_objects(self, rel):
+        """{(container 路径, path_id): (数据哈希, 输出列表)}"""
+        objects = {}
+        for container, path_id, data_hash, output in self.conn.execute("SELECT container, path_id, data_hash, output FROM objects WHERE path = ?", (rel,)):
+            outputs = objects.setdefault((container, path_id), (data_hash, []))[1]
+            if output:
+                outputs.append(output)
+        return objects
+
+    def _outputs(self, rel):
+        return {row[0] for row in self.conn.execute("SELECT output FROM objects WHERE path = ? AND output != ''", (rel,))}
+
+    def replace_bundle(self, rel, digest, deps_hash, options, records):
+        """用本次导出的 records 替换 bundle 的记录; 返回这个 bundle 以前写过、这次没写的文件"""
+        old = self._outputs(rel)
+        self.conn.execute("DELETE FROM objects WHERE path = ?", (rel,))
+        rows = []
+        for container, path_id, data_hash, outputs in records:
+            for output in outputs or [""]:
+                rows.append((rel, container, path_id, digest, data_hash, output))
+        self.conn.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO bundles VALUES (?, ?, ?, ?)", (rel, digest, deps_hash, options))
+        return old - {output for *_, outputs in records for output in outputs}
+
+    def remove_bundle(self, rel):
+        old = self._outputs(rel)
+        self.conn.execute("DELETE FROM objects WHERE path = ?", (rel,))
+        self.conn.execute("DELETE FROM bundles WHERE path = ?", (rel,))
+        return old
+
+    def is_live(self, output):
+        return self.conn.execute("SELECT 1 FROM objects WHERE output = ? LIMIT 1", (output,)).fetchone() is not None
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def extract_assets_sharded(source, target, include_types=None, ignore_first_dirs=0, append_path_id=False, export_unknown_as_typetree=False, jobs=0, shard_size=SHARD_SIZE, incremental=False):
+    """按依赖分组后多进程导出; 峰值内存取决于最大的一组而不是整个游戏
+
+    incremental: 内容哈希和依赖都没变的 bundle 整个跳过; 变了的 bundle 中数据没变的 TextAsset/MonoBehaviour 也跳过.
+    不再被写出的旧文件只报告 (写入导出目录/orphaned_outputs.txt), 不删除
+
+    返回本次导出的 exported, 其中资源文件是文件名 (str), 不是 SerializedFile"""
+    paths = list_bundles(source)
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+    index = None
+    if incremental:
+        os.makedirs(target, exist_ok=True)
+        index = ExportIndex(os.path.join(target, INDEX_NAME))
+    options = json.dumps([sorted(include_types or []), ignore_first_dirs, bool(append_path_id), bool(export_unknown_as_typetree)])
+
+    def rel(path):
+        return os.path.relpath(path, source).replace("\\", "/") if os.path.isdir(source) else os.path.basename(path)
+
+    exported = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        print("Scanning bundles...")
+        scans, hashes, todo = {}, {}, []
+        for path in paths:
+            cached = index.get_file(rel(path), file_stat(path)) if index else None
+            if cached is None:
+                todo.append(path)
+            else:
+                hashes[path], scans[path] = cached
+        chunksize = max(1, len(todo) // (jobs * 8))
+        if index:
+            results = list(tqdm(pool.map(scan_and_hash, todo, chunksize=chunksize), total=len(todo), ncols=150))
+            index.put_files([(rel(path), file_stat(path), digest, scan) for path, (digest, scan) in zip(todo, results)])
+            index.retain_files({rel(path) for path in paths})
+            index.commit()
+            for path, (digest, scan) in zip(todo, results):
+                hashes[path], scans[path] = digest, scan
+        else:
+            scans.update(zip(todo, tqdm(pool.map(scan_bundle, todo, chunksize=chunksize), total=len(todo), ncols=150)))
+
+        # 增量模式: 主 bundle -> (内容哈希, 依赖哈希, 上次的记录是否还能按对象复用)
+        state = {}
+
+        def changed(path, deps):
+            deps_hash = xxhash.xxh64("\n".join(sorted(f"{rel(dep)}:{hashes[dep]}" for dep in deps)).encode()).hexdigest()
+            old = index.get_bundle(rel(path))
+            state[path] = (hashes[path], deps_hash, old is not None and tuple(old[1:]) == (deps_hash, options))
+            return old is None or tuple(old) != (hashes[path], deps_hash, options)
+
+        shards = group_bundles(scans, shard_size, changed if index else None)
+        if index:
+            current = {rel(path) for path, scan in scans.items() if scan[2]}
+            dirty = sum(len(primaries) for primaries, _ in shards)
+            print(f"{len(paths)} files: {len(current) - dirty} bundles unchanged, {dirty} to export in {len(shards)} shards")
+        else:
+            print(f"{len(paths)} files -> {len(shards)} shards")
+
+        futures = {}
+        for i, (primaries, dependencies) in enumerate(shards):
+            tracked = None
+            if index:
+                tracked = {}
+                for path in primaries:
+                    previous = index.get_objects(rel(path)) if state[path][2] else {}
+                    for cab in scans[path][0]:
+                        tracked[cab] = (rel(path), previous)
+            future = pool.submit(export_shard, primaries, dependencies, target, include_types, ignore_first_dirs, append_path_id, export_unknown_as_typetree, tracked)
+            futures[future] = i
+        results = [[] for _ in shards]
+        candidates = set()
+        for future in tqdm(as_completed(futures), total=len(futures), ncols=150):
+            i = futures[future]
+            try:
+                results[i], records = future.result()
+            except Exception as e:
+                print(f"Failed to export {shards[i][0]}")
+                print(e)
+                continue
+            if index:
+                by_bundle = {}
+                for bundle, *record in records:
+                    by_bundle.setdefault(bundle, []).append(record)
+                for path in shards[i][0]:
+                    digest, deps_hash, _ = state[path]
+                    candidates |= index.replace_bundle(rel(path), digest, deps_hash, options, by_bundle.get(rel(path), []))
+                index.commit()
+    for shard_exported in results:
+        exported.extend(shard_exported)
+
+    if index:
+        for bundle in index.bundle_paths():
+            if bundle not in current:
+                candidates |= index.remove_bundle(bundle)
+        index.commit()
+        # 上次报告过、还没被删掉的也继续列出
+        orphans_path = os.path.join(target, ORPHANS_NAME)
+        if os.path.exists(orphans_path):
+            with open(orphans_path, encoding="utf-8") as f:
+                candidates.update(line.rstrip("\n") for line in f if line.strip())
+        orphans = sorted(out for out in candidates if not index.is_live(out) and os.path.exists(os.path.join(target, out)))
+        index.close()
+        with open(orphans_path, "w", encoding="utf-8") as f:
+            f.writelines(out + "\n" for out in orphans)
+        if orphans:
+            print(f"{len(orphans)} orphaned outputs, listed in {orphans_path}")
     return exported
 
 
 def exportTextAsset(obj, fp, extension=".bytes"):
-    with open(f"{fp}{extension}", "wb") as f:
+    with open(_record(f"{fp}{extension}"), "wb") as f:
         f.write(obj.m_Script.encode("utf-8", "surrogateescape"))
     return [(obj.assets_file, obj.object_reader.path_id)]
 
@@ -91,19 +443,19 @@ def exportFont(obj: Font, fp, extension=""):
         extension = ".ttf"
         if obj.m_FontData[0:4] == b"OTTO":
             extension = ".otf"
-        with open(f"{fp}{extension}", "wb") as f:
+        with open(_record(f"{fp}{extension}"), "wb") as f:
             f.write(bytes(obj.m_FontData))
     return [(obj.assets_file, obj.object_reader.path_id)]
 
 
 def exportMesh(obj, fp, extension=".obj"):
-    with open(f"{fp}{extension}", "wt", encoding="utf8", newline="") as f:
+    with open(_record(f"{fp}{extension}"), "wt", encoding="utf8", newline="") as f:
         f.write(obj.export())
     return [(obj.assets_file, obj.object_reader.path_id)]
 
 
 def exportShader(obj, fp, extension=".txt"):
-    with open(f"{fp}{extension}", "wt", encoding="utf8", newline="") as f:
+    with open(_record(f"{fp}{extension}"), "wt", encoding="utf8", newline="") as f:
         f.write(obj.export())
     return [(obj.assets_file, obj.object_reader.path_id)]
 
@@ -128,7 +480,7 @@ def exportMonoBehaviour(obj, fp, extension=""):
     else:
         extension = ".json"
         export = json.dumps(export, indent=4, ensure_ascii=False).encode("utf8", errors="surrogateescape")
-    with open(f"{fp}{extension}", "wb") as f:
+    with open(_record(f"{fp}{extension}"), "wb") as f:
         f.write(export)
     return [(obj.assets_file, obj.object_reader.path_id)]
 
@@ -138,18 +490,18 @@ def exportAudioClip(obj, fp, extension=""):
     if len(samples) == 0:
         pass
     elif len(samples) == 1:
-        with open(f"{fp}.wav", "wb") as f:
+        with open(_record(f"{fp}.wav"), "wb") as f:
             f.write(list(samples.values())[0])
     else:
         os.makedirs(fp, exist_ok=True)
         for name, clip_data in samples.items():
-            with open(os.path.join(fp, f"{name}.wav"), "wb") as f:
+            with open(_record(os.path.join(fp, f"{name}.wav")), "wb") as f:
                 f.write(clip_data)
     return [(obj.assets_file, obj.object_reader.path_id)]
 
 
 def exportSprite(obj, fp, extension=".png"):
-    obj.image.save(f"{fp}{extension}")
+    obj.image.save(_record(f"{fp}{extension}"))
     exported = [(obj.assets_file, obj.object_reader.path_id), (obj.m_RD.texture.assetsfile, obj.m_RD.texture.path_id)]
     alpha_assets_file = getattr(obj.m_RD.alphaTexture, "assets_file", None)
     alpha_path_id = getattr(obj.m_RD.alphaTexture, "path_id", None)
@@ -160,7 +512,7 @@ def exportSprite(obj, fp, extension=".png"):
 
 def exportTexture2D(obj, fp, extension=".png"):
     if obj.m_Width:
-        obj.image.save(f"{fp}{extension}")
+        obj.image.save(_record(f"{fp}{extension}"))
     return [(obj.assets_file, obj.object_reader.path_id)]
 
 
@@ -169,8 +521,8 @@ def exportGameObject(obj, fp, extension=""):
     refs = crawl_obj(obj)
     if refs:
         os.makedirs(fp, exist_ok=True)
-    for ref_id, ref in refs.items():
-        if (ref.assets_file, ref_id) in exported or ref.type == ClassIDType.GameObject:
+    for (assets_file, ref_id), ref in refs.items():
+        if (assets_file, ref_id) in exported or ref.type == ClassIDType.GameObject:
             continue
         try:
             exported.extend(export_obj(ref, fp, True, True))
@@ -195,42 +547,116 @@ EXPORT_TYPES = {
 MONOBEHAVIOUR_TYPETREES = {}
 
 
+class CrawlCache:
+    """一个 Environment 内所有 crawl_obj 共用的缓存, 被多个 GameObject 引用的材质/贴图/脚本只解析一次
+
+    files: (资源文件, m_FileID) -> 指向的资源文件
+    refs:  (资源文件, path_id) -> 该对象类型树中引用的 ObjectReader; LRU, 最多 max_size 个对象"""
+
+    def __init__(self, env, max_size=CRAWL_CACHE_SIZE):
+        self.env = env
+        self.max_size = max_size
+        self.files = {}
+        self.refs = OrderedDict()
+        self.reads = 0
+
+    def resolve(self, assets_file, file_id, path_id):
+        if path_id == 0:
+            return None
+        target = self.files.get((assets_file, file_id))
+        if target is not None:
+            return target.objects.get(path_id)
+        try:
+            reader = PPtr(m_FileID=file_id, m_PathID=path_id, assetsfile=assets_file).deref()
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+        self.files[(assets_file, file_id)] = reader.assets_file
+        return reader
+
+    def children(self, reader):
+        key = (reader.assets_file, reader.path_id)
+        refs = self.refs.get(key)
+        if refs is not None:
+            self.refs.move_to_end(key)
+            return refs
+
+        self.reads += 1
+        try:
+            tree = reader.read_typetree()
+        except Exception:
+            tree = {}
+        refs = []
+        for value in flatten(tree.values()):
+            if isinstance(value, dict):
+                ref = self.resolve(reader.assets_file, value["m_FileID"], value["m_PathID"])
+                if ref is not None:
+                    refs.append(ref)
+        refs = tuple(refs)
+
+        self.refs[key] = refs
+        if len(self.refs) > self.max_size:
+            self.refs.popitem(last=False)
+        return refs
+
+
+_crawl_cache = None
+
+
+def crawl_cache(env):
+    """当前 Environment 的 CrawlCache; 换了 Environment 就重建"""
+    global _crawl_cache
+    if _crawl_cache is None or _crawl_cache.env is not env:
+        _crawl_cache = CrawlCache(env)
+    return _crawl_cache
+
+
 def crawl_obj(obj, ret=None):
-    if not ret:
+    """obj 及其 (传递) 引用的所有对象: {(资源文件, path_id): ObjectReader}
+
+    obj 可以是 PPtr, ObjectReader 或解析后的对象; 用显式栈遍历, 引用链再长也不会递归过深"""
+    if ret is None:
         ret = {}
 
     if isinstance(obj, PPtr):
-        if obj.path_id == 0 and obj.file_id == 0 and obj.index == -2:
+        if not obj.m_PathID:
             return ret
         try:
-            obj = obj.read()
-        except AttributeError:
+            obj = obj.deref()
+        except (FileNotFoundError, KeyError, ValueError):
             return ret
-    else:
+    elif isinstance(obj, Object):
+        obj = obj.object_reader
+    if obj is None:
         return ret
-    ret[obj.path_id] = obj
 
-    if isinstance(obj, (MonoBehaviour, Object)):
-        data = obj.read_typetree().__dict__.values()
-    else:
-        data = obj.__dict__.values()
-
-    for value in flatten(data):
-        if isinstance(value, (Object, PPtr)):
-            if value.path_id in ret:
-                continue
-            crawl_obj(value, ret)
+    cache = crawl_cache(obj.assets_file.environment)
+    stack = [obj]
+    while stack:
+        reader = stack.pop()
+        key = (reader.assets_file, reader.path_id)
+        if key in ret:
+            continue
+        ret[key] = reader
+        # 倒序入栈, 保持与递归相同的先序
+        stack.extend(reversed(cache.children(reader)))
     return ret
 
 
 def flatten(target):
-    for el in list(target):
-        if isinstance(el, (list, tuple)):
-            yield from flatten(el)
-        elif isinstance(el, dict):
-            yield from flatten(el.values())
+    """类型树中的所有叶子值, PPtr ({m_FileID, m_PathID}) 作为一个整体返回"""
+    stack = [iter(target)]
+    while stack:
+        for el in stack[-1]:
+            if isinstance(el, (list, tuple)):
+                stack.append(iter(el))
+                break
+            elif isinstance(el, dict) and el.keys() != PPTR_KEYS:
+                stack.append(iter(el.values()))
+                break
+            else:
+                yield el
         else:
-            yield el
+            stack.pop()
 
 
 if __name__ == "__main__":
@@ -241,6 +667,13 @@ if __name__ == "__main__":
     parser.add_argument("--unknown", default=False)
     parser.add_argument("--ignore", type=int, default=0, metavar="N")
     parser.add_argument("--filter", nargs="+", default=["TextAsset"])
+    parser.add_argument("--shard", action="store_true", help="group bundles by dependency and export each group in its own process")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes for --shard (0 = CPU count)")
+    parser.add_argument("--shard_mb", type=int, default=SHARD_SIZE // (1024 * 1024), help="max size of the primary bundles in one group")
+    parser.add_argument("--incremental", action="store_true", help="implies --shard; skip bundles unchanged since the last export into --dst")
     args = parser.parse_args()
 
-    exported = extract_assets(source=args.src, target=args.dst, include_types=args.filter, ignore_first_dirs=args.ignore, append_path_id=args.id, export_unknown_as_typetree=args.unknown)
+    if args.shard or args.incremental:
+        exported = extract_assets_sharded(source=args.src, target=args.dst, include_types=args.filter, ignore_first_dirs=args.ignore, append_path_id=args.id, export_unknown_as_typetree=args.unknown, jobs=args.jobs, shard_size=args.shard_mb * 1024 * 1024, incremental=args.incremental)
+    else:
+        exported = extract_assets(source=args.src, target=args.dst, include_types=args.filter, ignore_first_dirs=args.ignore, append_path_id=args.id, export_unknown_as_typetree=args.unknown)
@@ -0,0 +1,287 @@
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+import xxhash
+from requests.adapters import HTTPAdapter
+from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+
+columns = (
+    SpinnerColumn(),
+    TextColumn("[bold blue]{task.description}"),
+    BarColumn(bar_width=100),
+    "[progress.percentage]{task.percentage:>6.2f}%",
+    TextColumn("{task.completed}/{task.total}"),
+    TimeElapsedColumn(),
+    "•",
+    TimeRemainingColumn(),
+)
+
+CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+DIGEST_CACHE_NAME = ".digest_cache.sqlite3"
+# Worth another attempt; any other 4xx fails the task at once.
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class DownloadTask:
+    url: str
+    dest: str
+    size: Optional[int] = None  # expected length in bytes, checked before the file is moved into place
+    hash: Optional[str] = None  # expected hex digest of the whole file
+    hash_algo: str = "md5"  # hashlib name, or an xxhash one such as "xxh64"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 5
+    backoff: float = 1.0
+    backoff_max: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so stalled workers don't hit the CDN in lockstep."""
+        return min(self.backoff_max, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+
+
+class DownloadError(Exception):
+    pass
+
+
+class _Retryable(Exception):
+    pass
+
+
+def new_hasher(algo: str):
+    if algo.startswith("xxh"):
+        return getattr(xxhash, algo)()
+    return hashlib.new(algo)
+
+
+def _hash_file(hasher, path: str, chunk_size: int):
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+
+
+def hash_file(path: str, algo: str = "md5", chunk_size: int = CHUNK_SIZE) -> str:
+    hasher = new_hasher(algo)
+    _hash_file(hasher, path, chunk_size)
+    return hasher.hexdigest()
+
+
+def file_stat(path: str):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class DigestCache:
+    """Relative path -> (size, mtime_ns, inode, algorithm, digest) of files already under root.
+
+    A cached digest is only trusted while all three stat fields are unchanged. Only touch it from one thread:
+    pending_tasks and download_all read and write it from the calling thread."""
+
+    def __init__(self, db_path: str, root: str):
+        self.root = root
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS digests (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, algo TEXT, digest TEXT)")
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace("\\", "/")
+
+    def get(self, path: str, algo: str, stat) -> Optional[str]:
+        row = self.conn.execute("SELECT size, mtime_ns, inode, algo, digest FROM digests WHERE path = ?", (self._key(path),)).fetchone()
+        if row is None or row[:3] != stat or row[3] != algo:
+            return None
+        return row[4]
+
+    def put(self, path: str, algo: str, stat, digest: str):
+        self.conn.execute("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)", (self._key(path), *stat, algo, digest))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def open_digest_cache(root: str, cache_path: Optional[str] = None, enabled: bool = True) -> Optional[DigestCache]:
+    if not enabled:
+        return None
+    os.makedirs(root, exist_ok=True)
+    return DigestCache(cache_path or os.path.join(root, DIGEST_CACHE_NAME), root)
+
+
+def pending_tasks(tasks, cache: Optional[DigestCache] = None, workers=8, verify_all=False, description="Scanning"):
+    """Returns the tasks whose dest is missing or doesn't match its size/hash, in their original order.
+
+    Digests come from the cache while a file's stat is unchanged; the remaining files are hashed in chunks on a
+    thread pool and written back to the cache. verify_all ignores cached digests and rehashes every file."""
+    stale = set()
+    to_hash = []
+    for i, task in enumerate(tasks):
+        try:
+            stat = file_stat(task.dest)
+        except OSError:
+            stale.add(i)
+            continue
+        if task.size is not None and stat[0] != task.size:
+            stale.add(i)
+        elif task.hash:
+            digest = None if verify_all or cache is None else cache.get(task.dest, task.hash_algo, stat)
+            if digest is None:
+                to_hash.append((i, stat))
+            elif digest != task.hash.lower():
+                stale.add(i)
+
+    if to_hash:
+        with Progress(*columns, transient=True) as prog:
+            task_id = prog.add_task(description, total=len(to_hash))
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                future_to_item = {pool.submit(hash_file, tasks[i].dest, tasks[i].hash_algo): (i, stat) for i, stat in to_hash}
+                for future in as_completed(future_to_item):
+                    i, stat = future_to_item[future]
+                    task = tasks[i]
+                    try:
+                        digest = future.result()
+                    except OSError:
+                        stale.add(i)
+                        continue
+                    finally:
+                        prog.update(task_id, advance=1)
+                    if cache is not None:
+                        cache.put(task.dest, task.hash_algo, stat, digest)
+                    if digest != task.hash.lower():
+                        stale.add(i)
+        if cache is not None:
+            cache.commit()
+
+    return [task for i, task in enumerate(tasks) if i in stale]
+
+
+class AssetDownloader:
+    """Streams assets to <dest>.part in chunks, resumes partial files with HTTP Range, verifies size/hash while
+    streaming and only then renames the file into place. Concurrency is capped per host."""
+
+    def __init__(self, headers=None, workers=32, per_host=16, retry: RetryPolicy = RetryPolicy(), chunk_size=CHUNK_SIZE, timeout=(10, 60)):
+        self.workers = workers
+        self.per_host = per_host
+        self.retry = retry
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        # Retries are handled per task (with resume); urllib3 must not replay requests on its own.
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(per_host, 1), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def fetch(self, task: DownloadTask) -> int:
+        """Downloads one task; returns the number of bytes transferred, raises DownloadError once retries run out."""
+        dest_dir = os.path.dirname(task.dest)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        last_error = None
+        for attempt in range(self.retry.attempts):
+            if attempt:
+                time.sleep(self.retry.delay(attempt - 1))
+            try:
+                return self._fetch_once(task, task.dest + PART_SUFFIX)
+            except (_Retryable, requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                last_error = e
+        raise DownloadError(f"{task.url}: giving up after {self.retry.attempts} attempts: {last_error}")
+
+    def _fetch_once(self, task: DownloadTask, part: str) -> int:
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if task.size is not None and offset > task.size:
+            offset = 0
+        hasher = new_hasher(task.hash_algo) if task.hash else None
+
+        written = 0
+        with self._host_slot(task.url):
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            with self.session.get(task.url, headers=headers, stream=True, timeout=self.timeout) as resp:
+                if resp.status_code == 416 and offset:
+                    # Nothing left to send: either the part is already complete or it is stale.
+                    if task.size is None or offset != task.size:
+                        os.remove(part)
+                        raise _Retryable(f"HTTP 416 for a {offset} byte partial file")
+                else:
+                    if resp.status_code in RETRY_STATUS:
+                        raise _Retryable(f"HTTP {resp.status_code}")
+                    if resp.status_code >= 400:
+                        raise DownloadError(f"{task.url}: HTTP {resp.status_code}")
+                    if offset and (resp.status_code != 206 or not resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-")):
+                        offset = 0  # Range ignored: start over
+                    if offset and hasher:
+                        _hash_file(hasher, part, self.chunk_size)
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in resp.iter_content(self.chunk_size):
+                            f.write(chunk)
+                            if hasher:
+                                hasher.update(chunk)
+                            written += len(chunk)
+
+        if resp.status_code == 416 and hasher:
+            _hash_file(hasher, part, self.chunk_size)
+        total = offset + written
+        if task.size is not None and total != task.size:
+            if total > task.size:
+                os.remove(part)
+            raise _Retryable(f"size mismatch: got {total}, expected {task.size}")
+        if hasher and hasher.hexdigest().lower() != task.hash.lower():
+            os.remove(part)
+            raise _Retryable(f"{task.hash_algo} mismatch: got {hasher.hexdigest()}, expected {task.hash}")
+        os.replace(part, task.dest)
+        return written
+
+
+def download_all(downloader: AssetDownloader, tasks, description="Downloading", cache: Optional[DigestCache] = None):
+    """Runs every task on a thread pool with a progress bar; returns the list of (task, error) that failed.
+
+    Files verified against a hash are recorded in cache, so the next pending_tasks doesn't have to rehash them."""
+    failures = []
+    if not tasks:
+        return failures
+    with Progress(*columns, transient=True) as prog:
+        task_id = prog.add_task(description, total=len(tasks))
+        with ThreadPoolExecutor(max_workers=max(1, downloader.workers)) as pool:
+            future_to_task = {pool.submit(downloader.fetch, t): t for t in tasks}
+            for future in as_completed(future_to_task):
+                task = future_to_task[future]
+                try:
+                    future.result()
+                    if cache is not None and task.hash:
+                        cache.put(task.dest, task.hash_algo, file_stat(task.dest), task.hash.lower())
+                except Exception as exc:
+                    failures.append((task, exc))
+                    prog.console.log(f"[E] Failed downloading {task.url} -> {task.dest}: {exc}")
+                finally:
+                    prog.update(task_id, advance=1)
+    if cache is not None:
+        cache.commit()
+    return failures
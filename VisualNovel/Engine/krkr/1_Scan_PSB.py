@@ -1,39 +1,38 @@
 import os
-import subprocess
-import threading
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-
-def main(file_path):
-    psb_decompile_path = os.path.join(os.path.dirname(__file__), "PsbDecompile.exe")
-    command = [psb_decompile_path, file_path]
-    subprocess.run(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+# in-process FreeMote (python port) instead of spawning PsbDecompile.exe per file
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "_ThirdParty", "freemote_python")))
+from FreeMote.PsBuild.PsbDecompiler import PsbDecompiler
+from FreeMote.PsbEnums import PsbExtractOption, PsbImageFormat
 
 
-def process_files(file_list):
-    for file_path in file_list:
-        main(file_path)
+def main(file_path):
+    # mdf/mzs shells are opened natively, output is <name>.json + <name>.resx.json like PsbDecompile.exe
+    PsbDecompiler.DecompileToFile(file_path, PsbExtractOption.Extract, PsbImageFormat.png)
 
 
 if __name__ == "__main__":
     input_directory_path = r"D:\Fuck_VN\scn"
-    THREAD_NUM = 20
+    PROCESS_NUM = os.cpu_count()
 
     scn_files = []
     for root, _, files in os.walk(input_directory_path):
         for file in files:
+            if file.endswith(".json"):
+                continue
             file_path = os.path.join(root, file)
             scn_files.append(file_path)
 
-    actual_threads = min(THREAD_NUM, len(scn_files))
-
-    chunks = [scn_files[i::actual_threads] for i in range(actual_threads)]
-    chunks = [chunk for chunk in chunks if chunk]
-
-    threads = []
-    for chunk in chunks:
-        thread = threading.Thread(target=process_files, args=(chunk,))
-        threads.append(thread)
-        thread.start()
-
-    for thread in threads:
-        thread.join()
+    errors = 0
+    with ProcessPoolExecutor(max_workers=PROCESS_NUM) as pool:
+        futures = {pool.submit(main, file_path): file_path for file_path in scn_files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors += 1
+                print(f"[E] {futures[future]}: {e}")
+
+    print(f"Done: {len(scn_files) - errors} ok, {errors} failed")
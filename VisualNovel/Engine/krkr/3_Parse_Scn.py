@@ -1,9 +1,10 @@
 import argparse
 import json
 import re
+from functools import partial
 from glob import glob
 
-from tqdm import tqdm
+from script_loader import open_cache, parse_files, parser_key
 
 
 def parse_args(args=None, namespace=None):
@@ -13,6 +14,9 @@ def parse_args(args=None, namespace=None):
     parser.add_argument("-ol", type=str, default=r"D:\Fuck_VN\files.txt")
     parser.add_argument("-ot", type=str, default=r"D:\Fuck_VN\appconfig.tjs")
     parser.add_argument("-ft", type=int, default=2)
+    parser.add_argument("-j", type=int, default=0, help="进程数 (0 = CPU 核数)")
+    parser.add_argument("-cache", type=str, default=None, help="解析缓存路径, 默认放在 -JA 目录下")
+    parser.add_argument("-nocache", action="store_true", help="不读写解析缓存")
     return parser.parse_args(args=args, namespace=namespace)
 
 
@@ -21,6 +25,12 @@ def read_json_file(filepath):
         return json.load(file)
 
 
+def parse_file(processor, filepath):
+    results = []
+    processor(read_json_file(filepath), results)
+    return results
+
+
 def text_cleaning(text):
     text = text.replace("\n", "").replace(r"\n", "")
     text = re.sub(r"%[^;]*;|#[^;]*;|%\d+|\[[^[\\\/]*\]", "", text)
@@ -122,19 +132,19 @@ def write_appconfig_tjs(results, tjs_path):
         fp.write(content)
 
 
-def main(JA_dir, op_json, ol, ot, force_version):
+def main(JA_dir, op_json, ol, ot, force_version, jobs=0, cache_path=None, use_cache=True):
     if force_version not in PROCESSORS:
         raise ValueError(f"未支持的解析类型: {force_version}")
     processor = PROCESSORS[force_version]
 
     filelist = [fn for fn in glob(f"{JA_dir}/**/*.json", recursive=True) if not fn.lower().endswith(".resx.json")]
 
-    results = []
-    for fn in tqdm(filelist):
-        data = read_json_file(fn)
-        processor(data, results)
-        if not results:
-            continue
+    cache = open_cache(JA_dir, cache_path, use_cache)
+    try:
+        results = parse_files(filelist, partial(parse_file, processor), parser_key(f"scn:{processor.__name__}", processor, parse_file), jobs, cache)
+    finally:
+        if cache:
+            cache.close()
 
     seen = set()
     unique_results = []
@@ -159,4 +169,4 @@ def main(JA_dir, op_json, ol, ot, force_version):
 
 if __name__ == "__main__":
     cmd = parse_args()
-    main(cmd.JA, cmd.op, cmd.ol, cmd.ot, cmd.ft)
+    main(cmd.JA, cmd.op, cmd.ol, cmd.ot, cmd.ft, cmd.j, cmd.cache, not cmd.nocache)
@@ -0,0 +1,95 @@
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from parse_ks import PROCESSORS
+
+# 每种解析类型一个台词块, {n} 为序号; 与各 process_typeN_M 的 docstring 对应
+SAMPLES = {
+    0.0: ["@Talk name=いつみ voice=ITM{n:06d}", "「やっぱり昨日渋丘スタジオにいたのって、", "永倉くんだったんだ。」", "@hitret"],
+    0.1: ['[cn name="深青" voice="mio_{n:05d}"]', "「ひ……！　……ん……おい、邪魔すんなハゲ。」", "[en]"],
+    0.2: ["[Voice file=RAMUNE_0B_{n:05d}", "[Talk name=美咲]", "「はぁ、はぁはぁ、お待たせっ！／", "大丈夫なの、カナちゃん！？」", "[Hitret"],
+    0.3: ['[【小鳥】][voia v="koto_{n:05d}"]', "「うんうん、そーだね。これはねえ、[r]", "だから、正解は４番」[ver]"],
+    0.4: ['[nm t="執事" rt="翠碕" s=aax_{n:05d}]「"[gly t="デビルズ・オーガン"]"の中でも、極めて特殊な部類に入る能力です」[wvl]'],
+    0.5: ['[name fn="あかり"][pv char="akari" voice=AKA_{n:05d}]', "「弟がそうであるように、姉にも真面目な弟にハチャメチャなことを言う権利があります」[ps]"],
+    1.0: ['@nm t="臨" s=rin_{n:05d}', "「んー、特には何も。[r]", "そっちが寂しいかなーって思ってさ」[np]"],
+    1.1: ['@msg name="晴菜" voice="vo_har_{n:05d}"', "「ご主人様、お願いがあります！」", "@msgend"],
+    1.2: ["@vo est{n:05d}", "【エスト/女の子】", "「わたし、エスト・フラグレンスと申します」"],
+    2.0: ['[天使 vo=vo1_{n:05d} text="？？？"]', "[>>]いや惚れろよ、このビューチーな私に[<<][c]"],
+    2.1: ["[マルエット v=vs{n:05d} f=07]「ちょっと！　隊長！」[k]"],
+    3.0: ["[msgname name=IWATANI]", "[cv str=i{n:05d}]", "「ま、そりゃそうだわな。誰だって、結局は自分の身がかわいいもんな」", "[np][cm]"],
+    3.1: ["[name text=ステラ]", '[voice storage="cv_D{n:05d}"]', "「あ……アベスターグの支部。[r]", "お兄ちゃん、せっかくだし寄っていかない？」"],
+    4.0: ["@V{n:05d}", "【Speaker】", "「Text」"],
+    5.0: ["@v s={n:05d}", "@se storage=door", "@【Speaker】", "台词行1", "台词行2"],
+    6.0: ["@満花 voice=C01_{n:05d}.ogg", "【満花】　「あっあっあっ、あああん、気持ちいい……」"],
+    6.1: ['@満花 voice="C01_{n:05d}.ogg"', "「あっあっあっ」"],
+    7.0: ["[菜穂子 voice=D{n:05d}]", "【菜穂子】", "「公序良俗に反した行いがなければ、止め立てする理由は", "私たちにはないということ」", ""],
+    999: ["[ZYCs face=1]", '[playvc storage="zyc_{n:05d}"]', "「台词」[p]"],
+}
+
+# 台词之间的演出指令/标签, 不属于任何类型
+FILLER = ["@bg storage=bg01 time=500", "[wait time=300]", "*label_{n}|", "@bgm storage=bgm01", "[trans method=crossfade time=500]", "[wt]"]
+
+
+# 台词块最后一行是结束标签的类型
+TERMINATED = {0.0, 0.1, 0.2, 0.3, 1.1, 3.0, 7.0}
+
+
+def build_scenario(key, blocks, filler, unterminated=False):
+    """unterminated: 去掉每块的结束标签 ([en]/[Hitret 等), 模拟标签和类型不匹配的脚本"""
+    sample = SAMPLES[key][:-1] if unterminated and key in TERMINATED else SAMPLES[key]
+    lines = []
+    for n in range(blocks):
+        for k in range(filler):
+            lines.append(FILLER[(n + k) % len(FILLER)].format(n=n) + "\n")
+        lines.extend(ln.format(n=n) + "\n" for ln in sample)
+    # 与 load_lines 一致: 行首空白已去掉
+    return [ln.lstrip() for ln in lines]
+
+
+def load_baseline(path):
+    """把旧版 parse_ks_types 目录作为独立包加载, 用来对比结果和耗时"""
+    spec = importlib.util.spec_from_file_location("parse_ks_types_baseline", os.path.join(path, "__init__.py"), submodule_search_locations=[path])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return {key: getattr(module, func.__name__) for key, func in PROCESSORS.items()}
+
+
+def run(func, lines):
+    results = []
+    start = time.perf_counter()
+    # 传副本: 旧版 type7 会清空传入的列表
+    func(list(lines), results)
+    return results, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=20000, help="每个脚本的台词块数")
+    parser.add_argument("--filler", type=int, default=3, help="每个台词块前的演出指令行数")
+    parser.add_argument("--unterminated", action="store_true", help="台词块缺少结束标签 (旧版 0.1/0.2 会对每个标签扫描到文件尾)")
+    parser.add_argument("--baseline", default=None, help="旧版 parse_ks_types 目录 (例如 git worktree 中的), 用于对比")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    total_new = total_old = 0.0
+    for key, func in PROCESSORS.items():
+        lines = build_scenario(key, args.blocks, args.filler, args.unterminated)
+        results, elapsed = run(func, lines)
+        total_new += elapsed
+        line = f"{key:>5}: {len(lines)} lines, {len(results)} entries in {elapsed:.3f}s ({len(lines) / elapsed / 1000:.0f}k lines/s)"
+        if baseline:
+            old_results, old_elapsed = run(baseline[key], lines)
+            total_old += old_elapsed
+            if old_results != results:
+                raise AssertionError(f"type {key}: results differ from baseline")
+            line += f", baseline {old_elapsed:.3f}s, x{old_elapsed / elapsed:.1f}"
+        print(line)
+
+    if baseline:
+        print(f"total {total_new:.2f}s, baseline {total_old:.2f}s, x{total_old / total_new:.1f}")
+    else:
+        print(f"total {total_new:.2f}s")
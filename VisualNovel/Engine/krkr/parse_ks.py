@@ -1,8 +1,8 @@
 import json
-import chardet
 import argparse
-from tqdm import tqdm
+from functools import partial
 from glob import glob
+from script_loader import open_cache, parse_files, parser_key, read_lines
 from parse_ks_types import (
     process_type0_0,
     process_type0_1,
@@ -31,26 +31,23 @@ def parse_args(args=None, namespace=None):
     p.add_argument("-JA", type=str, default=r"D:\Fuck_VN\scenario")
     p.add_argument("-op", type=str, default=r"D:\Fuck_VN\index.json")
     p.add_argument("-ft", type=float, default=1.0)
+    p.add_argument("-j", type=int, default=0, help="进程数 (0 = CPU 核数)")
+    p.add_argument("-cache", type=str, default=None, help="解析缓存路径, 默认放在 -JA 目录下")
+    p.add_argument("-nocache", action="store_true", help="不读写解析缓存")
     return p.parse_args(args=args, namespace=namespace)
 
 
-def guess_encoding(path):
-    with open(path, "rb") as f:
-        raw = f.read()
-    enc = chardet.detect(raw)["encoding"]
-    return enc
-
-
 def load_lines(path):
-    try:
-        with open(path, "r", encoding=guess_encoding(path)) as f:
-            lines = f.readlines()
-    except (UnicodeDecodeError, TypeError):
-        with open(path, "r", encoding="cp932") as f:
-            lines = f.readlines()
+    lines = read_lines(path)
     return [ln.lstrip() for ln in lines if not ln.lstrip().startswith(";")]
 
 
+def parse_file(processor, path):
+    results = []
+    processor(load_lines(path), results)
+    return results
+
+
 PROCESSORS = {
     0.0: process_type0_0,
     0.1: process_type0_1,
@@ -74,21 +71,19 @@ PROCESSORS = {
 }
 
 
-def main(JA_dir, op_json, force_version):
+def main(JA_dir, op_json, force_version, jobs=0, cache_path=None, use_cache=True):
     if force_version not in PROCESSORS:
         raise ValueError(f"未支持的解析类型: {force_version}")
     processor = PROCESSORS[force_version]
 
     filelist = glob(f"{JA_dir}/**/*.ks", recursive=True) + glob(f"{JA_dir}/**/*.ms", recursive=True) + glob(f"{JA_dir}/**/*.scn", recursive=True) + glob(f"{JA_dir}/**/*.txt", recursive=True)
 
-    results = []
-    for fn in tqdm(filelist, ncols=150):
-        lines = load_lines(fn)
-
-        processor(lines, results)
-
-        if not results:
-            continue
+    cache = open_cache(JA_dir, cache_path, use_cache)
+    try:
+        results = parse_files(filelist, partial(parse_file, processor), parser_key(f"ks:{processor.__name__}", processor, parse_file, read_lines), jobs, cache, ncols=150)
+    finally:
+        if cache:
+            cache.close()
 
     seen = set()
     unique_results = []
@@ -105,4 +100,4 @@ def main(JA_dir, op_json, force_version):
 
 if __name__ == "__main__":
     args = parse_args()
-    main(args.JA, args.op, args.ft)
+    main(args.JA, args.op, args.ft, args.j, args.cache, not args.nocache)
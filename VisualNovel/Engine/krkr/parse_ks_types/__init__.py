@@ -8,6 +8,7 @@ from .type6 import process_type6_0, process_type6_1
 from .type7 import process_type7_0
 from .type999 import process_type999
 from .text_cleaning import text_cleaning_01, text_cleaning_02
+from .tokenizer import KsTokens, tokenize
 
 __all__ = [
     "process_type0_0",
@@ -31,4 +32,6 @@ __all__ = [
     "process_type999",
     "text_cleaning_01",
     "text_cleaning_02",
+    "KsTokens",
+    "tokenize",
 ]
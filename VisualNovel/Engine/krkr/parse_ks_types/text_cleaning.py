@@ -1,21 +1,27 @@
 import re
 
+_RUBY_QUOTE_RE = re.compile(r"\[([^\]]+?)'[^]]+\]")
+_RUBY_TEXT_RE = re.compile(r"\['([^']+?) text=\"[^\"]+?\"\]")
+_SHARP_RE = re.compile(r"＃\([^()]+\) ")
+_TAG_RE = re.compile(r"\[[^\]]*\]")
+_TAG_LAZY_RE = re.compile(r"\[.*?\]")
+
 
 def text_cleaning_01(text):
     text = text.replace("\n", "")
-    text = re.sub(r"\[([^\]]+?)'[^]]+\]", r"\1", text)
-    text = re.sub(r"\['([^']+?) text=\"[^\"]+?\"\]", r"\1", text)
-    text = re.sub(r"＃\([^()]+\) ", "", text)
+    text = _RUBY_QUOTE_RE.sub(r"\1", text)
+    text = _RUBY_TEXT_RE.sub(r"\1", text)
+    text = _SHARP_RE.sub("", text)
     text = text.replace("[r]", "").replace("[np]", "")
     text = text.replace("『", "").replace("』", "").replace("「", "").replace("」", "").replace("（", "").replace("）", "").replace('"', "").replace('"', "")
     text = text.replace("　", "")
-    text = re.sub(r"\[[^\]]*\]", "", text)
+    text = _TAG_RE.sub("", text)
     text = text.replace('"', "")
     return text
 
 
 def text_cleaning_02(text):
-    text = re.sub(r"\[.*?\]", "", text)
+    text = _TAG_LAZY_RE.sub("", text)
     text = text.replace("『", "").replace("』", "").replace("「", "").replace("」", "").replace("（", "").replace("）", "")
     text = text.replace("　", "").replace("／", "").replace("\n", "")
     return text
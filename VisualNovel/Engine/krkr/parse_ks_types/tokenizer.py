@@ -0,0 +1,34 @@
+import re
+
+# @command / [tag 之后的名称
+_NAME_RE = re.compile(r"\w*")
+
+
+class KsTokens:
+    """一次遍历切好的 .ks 行事件 (按列存放):
+
+    - lines: 原始行
+    - stripped: strip() 之后的行
+    - heads: 行首字符, "@" 为指令行, "[" 为标签行
+    - name(i): 第 i 行的小写指令/标签名 (只在需要时计算)
+
+    各 process_typeN_M 在这个事件流上做状态机, 不再对每行反复 strip()/正则"""
+
+    __slots__ = ("lines", "stripped", "heads")
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.stripped = [ln.strip() for ln in lines]
+        self.heads = [s[:1] for s in self.stripped]
+
+    def __len__(self):
+        return len(self.lines)
+
+    def name(self, i):
+        if self.heads[i] not in ("@", "["):
+            return ""
+        return _NAME_RE.match(self.stripped[i], 1).group().lower()
+
+
+def tokenize(lines):
+    return KsTokens(lines)
@@ -1,6 +1,18 @@
 import re
 
 from .text_cleaning import text_cleaning_02
+from .tokenizer import tokenize
+
+TALK_ATTR_RE = re.compile(r"\b(name|voice)=([^\s]+)", flags=re.IGNORECASE)
+CN_RE = re.compile(r'\[cn\s+name="([^"]+)"(?:\s+voice="([^"]+)")?\]')
+VOICE_FILE_RE = re.compile(r'(?i)\[Voice\s+file="?([^\]\s"]+)"?')
+TALK_NAME_RE = re.compile(r'(?i)\[Talk\s+name="?([^\]\s"]+)"?\]')
+SPEAKER_BRACKET_RE = re.compile(r"\[【([^】]+)】\]")
+VOIA_RE = re.compile(r'\[\w{4}\s+v="([^"]+)"\]')
+NM_RE = re.compile(r'\[nm\s+t="([^"]+)"(?:\s+rt="[^"]*")?\s+s=([^\]]+)\]')
+NAME_FN_RE = re.compile(r'\[name\s+fn="([^"]+)"\]')
+VOICE_ATTR_RE = re.compile(r"\bvoice=([^\s\]]+)")
+STRIP_PS_RE = re.compile(r"\s*\[ps\]\s*$")
 
 
 def process_type0_0(lines, results):
@@ -14,31 +26,26 @@ def process_type0_0(lines, results):
     そんな訳ないでしょう。
     @hitret
     """
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        if re.search(r"^\s*@talk\b", line, flags=re.IGNORECASE):
-            attrs = dict((k.lower(), v.split("/")[0]) for k, v in re.findall(r"\b(name|voice)=([^\s]+)", line, flags=re.IGNORECASE))
-
-            Speaker = attrs.get("name") or None
-            Voice = attrs.get("voice") or None
-
-            tmp = []
-            i += 1
-            while i < len(lines):
-                if re.match(r"^\s*@hitret\b", lines[i], flags=re.IGNORECASE):
-                    Text = text_cleaning_02("".join(tmp))
-                    results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
-                    break
-                tmp.append(lines[i])
-                i += 1
-
-            else:
-                Text = text_cleaning_02("".join(tmp))
-                results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
-                return
-        i += 1
+    Speaker = Voice = None
+    tmp = None
+    tokens = tokenize(lines)
+    for i, head in enumerate(tokens.heads):
+        if tmp is None:
+            # 等待 @talk
+            if head == "@" and tokens.name(i) == "talk":
+                attrs = dict((k.lower(), v.split("/")[0]) for k, v in TALK_ATTR_RE.findall(lines[i]))
+                Speaker = attrs.get("name") or None
+                Voice = attrs.get("voice") or None
+                tmp = []
+        elif head == "@" and tokens.name(i) == "hitret":
+            results.append({"Speaker": Speaker, "Voice": Voice, "Text": text_cleaning_02("".join(tmp))})
+            tmp = None
+        else:
+            tmp.append(lines[i])
+
+    # 文件结束时没有 @hitret 也输出
+    if tmp is not None:
+        results.append({"Speaker": Speaker, "Voice": Voice, "Text": text_cleaning_02("".join(tmp))})
 
 
 def process_type0_1(lines, results):
@@ -47,23 +54,18 @@ def process_type0_1(lines, results):
     「ひ……！　……ん……おい、邪魔すんなハゲ。こっちは遊びでやってんじゃねーんだよ。キルレート下がったらどうすんだ」
     [en]
     """
-    cn_re = re.compile(r'\[cn\s+name="([^"]+)"(?:\s+voice="([^"]+)")?\]')
-    for i, line in enumerate(lines):
-        m = cn_re.search(line)
-        if not m:
-            continue
-
-        Speaker = m.group(1).replace("　", "")
-        Voice = m.group(2) if m.group(2) else None
-
-        tmp = []
-        # gather all lines until we hit the [en] tag
-        for j in range(i + 1, len(lines)):
-            if lines[j].strip().startswith("[en]"):
-                Text = text_cleaning_02("".join(tmp))
+    # 还没遇到 [en] 的 [cn]: (起始行, Speaker, Voice)；同一个 [en] 按出现顺序一起结束，不再从每个 [cn] 向后重扫
+    pending = []
+    for i, stripped in enumerate(tokenize(lines).stripped):
+        if pending and stripped.startswith("[en]"):
+            for start, Speaker, Voice in pending:
+                Text = text_cleaning_02("".join(lines[start + 1 : i]))
                 results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
-                break
-            tmp.append(lines[j])
+            pending.clear()
+
+        m = CN_RE.search(lines[i])
+        if m:
+            pending.append((i, m.group(1).replace("　", ""), m.group(2) if m.group(2) else None))
 
 
 def process_type0_2(lines, results):
@@ -75,28 +77,26 @@ def process_type0_2(lines, results):
     [Hitret
     """
     current_voice = None
+    # 还没遇到 [Hitret 的 [Talk: (起始行, Speaker, Voice)
+    pending = []
 
     for i, line in enumerate(lines):
-        m_voice = re.search(r'(?i)\[Voice\s+file="?([^\]\s"]+)"?', line)
+        if pending and line.lower().startswith("[hitret"):
+            for start, Speaker, Voice in pending:
+                Text = text_cleaning_02("".join(lines[start + 1 : i]))
+                results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
+            pending.clear()
+
+        m_voice = VOICE_FILE_RE.search(line)
         if m_voice:
             current_voice = m_voice.group(1).split("/")[0]
             continue
 
-        m_talk = re.search(r'(?i)\[Talk\s+name="?([^\]\s"]+)"?\]', line)
+        m_talk = TALK_NAME_RE.search(line)
         if not m_talk:
             continue
 
-        Speaker = m_talk.group(1).split("/")[0]
-        Voice = current_voice
-
-        tmp = []
-        for j in range(i + 1, len(lines)):
-            if lines[j].lower().startswith("[hitret"):
-                Text = text_cleaning_02("".join(tmp))
-                results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
-                break
-            tmp.append(lines[j])
-
+        pending.append((i, m_talk.group(1).split("/")[0], current_voice))
         current_voice = None
 
 
@@ -110,48 +110,37 @@ def process_type0_3(lines, results):
     "Ｉｔ"の後に、過去進行形が来るんだよ。[r]
     だから、正解は４番」[ver]
     """
-    speaker_re = re.compile(r"\[【([^】]+)】\]")
-    voice_re = re.compile(r'\[\w{4}\s+v="([^"]+)"\]')
-
-    i = 0
-    n = len(lines)
-
-    while i < n:
-        line = lines[i].strip()
-
-        # 查找 Speaker
-        m_speaker = speaker_re.search(line)
-        if not m_speaker:
-            i += 1
-            continue
-
-        speaker = m_speaker.group(1)
-
-        # 在同一行查找 Voice
-        m_voice = voice_re.search(line)
-        if not m_voice:
-            i += 1
+    speaker = voice = None
+    text_lines = None
+
+    for line, stripped in zip(lines, tokenize(lines).stripped):
+        if text_lines is None:
+            # 查找 Speaker, 并在同一行查找 Voice
+            m_speaker = SPEAKER_BRACKET_RE.search(stripped)
+            if not m_speaker:
+                continue
+            m_voice = VOIA_RE.search(stripped)
+            if not m_voice:
+                continue
+            speaker = m_speaker.group(1)
+            voice = m_voice.group(1)
+            text_lines = []
             continue
 
-        voice = m_voice.group(1)
-
         # 收集文本直到遇到 [ver]
-        i += 1
-        text_lines = []
-        while i < n:
-            if "[ver]" in lines[i]:
-                # 包含 [ver] 的行，取 [ver] 之前的部分
-                text_before_ver = lines[i].split("[ver]")[0]
-                if text_before_ver.strip():
-                    text_lines.append(text_before_ver)
-                i += 1
-                break
-            text_lines.append(lines[i])
-            i += 1
-
-        if text_lines:
-            text = text_cleaning_02("".join(text_lines))
-            results.append({"Speaker": speaker, "Voice": voice, "Text": text})
+        if "[ver]" in line:
+            # 包含 [ver] 的行，取 [ver] 之前的部分
+            text_before_ver = line.split("[ver]")[0]
+            if text_before_ver.strip():
+                text_lines.append(text_before_ver)
+            if text_lines:
+                results.append({"Speaker": speaker, "Voice": voice, "Text": text_cleaning_02("".join(text_lines))})
+            text_lines = None
+        else:
+            text_lines.append(line)
+
+    if text_lines:
+        results.append({"Speaker": speaker, "Voice": voice, "Text": text_cleaning_02("".join(text_lines))})
 
 
 def process_type0_4(lines, results):
@@ -159,10 +148,8 @@ def process_type0_4(lines, results):
     [nm t="執事" rt="翠碕" s=aax_0011]「"[gly t="デビルズ・オーガン"][rb t="悪魔の臓器|デビルズ・オーガン"][egly]"の中でも、極めて特殊な部類に入る能力です」[wvl]
     [nm t="睦月" s=mut_0187]「さてな」[np]
     """
-    nm_re = re.compile(r'\[nm\s+t="([^"]+)"(?:\s+rt="[^"]*")?\s+s=([^\]]+)\]')
-
     for line in lines:
-        m = nm_re.search(line)
+        m = NM_RE.search(line)
         if not m:
             continue
 
@@ -182,31 +169,21 @@ def process_type0_5(lines, results):
     [name fn="あかり"][pv char="akari" voice=AKA_scn17_029]
     「弟がそうであるように、姉にも真面目な弟にハチャメチャなことを言う権利があります」[ps]
     """
-    name_re = re.compile(r'\[name\s+fn="([^"]+)"\]')
-    voice_re = re.compile(r"\bvoice=([^\s\]]+)")
-    strip_ps = re.compile(r"\s*\[ps\]\s*$")
-
     n = len(lines)
-    i = 0
-    while i < n:
-        line = lines[i]
-        m_voice = voice_re.search(line)
+    for i, line in enumerate(lines):
+        m_voice = VOICE_ATTR_RE.search(line)
         if not m_voice:
-            i += 1
             continue
 
         voice = m_voice.group(1)
 
-        m_name = name_re.search(line) or (name_re.search(lines[i - 1]) if i > 0 else None)
+        m_name = NAME_FN_RE.search(line) or (NAME_FN_RE.search(lines[i - 1]) if i > 0 else None)
         speaker = m_name.group(1) if m_name else None
 
         Text = ""
         if i + 1 < n:
-            tline = lines[i + 1]
-            Text = strip_ps.sub("", tline).strip()
+            Text = STRIP_PS_RE.sub("", lines[i + 1]).strip()
             Text = text_cleaning_02(Text)
 
         if speaker and voice and Text:
             results.append({"Speaker": speaker, "Voice": voice, "Text": Text})
-
-        i += 1
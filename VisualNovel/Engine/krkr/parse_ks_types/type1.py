@@ -1,6 +1,25 @@
 import re
 
 from .text_cleaning import text_cleaning_02
+from .tokenizer import tokenize
+
+NM_GENERAL_RE = re.compile(r"@nm\s+(.+)")
+SAUDIO_RE = re.compile(
+    r"@saudio\s+"
+    r't="(?P<speaker>[^"]+)"\s+'
+    r"fv=(?P<voice1>[^\s]+)\s+"
+    r'front="(?P<text1>[^"]+)"\s+'
+    r"bv=(?P<voice2>[^\s]+)\s+"
+    r'back="(?P<text2>[^"]+)"'
+)
+RT_ATTR_RE = re.compile(r'rt="([^"]+)"')
+T_ATTR_RE = re.compile(r't="([^"]+)"')
+S_ATTR_RE = re.compile(r"s=([^\s]+)")
+CHR_TAG_RE = re.compile(r"\[chr2?\s+[^\]]+\]")
+MSG_HEADER_RE = re.compile(r"^@msg\b(.*)$")
+MSG_ATTR_RE = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+VO_RE = re.compile(r"^\s*@vo\s+(.+?)\s*$")
+SPEAKER_LINE_RE = re.compile(r"^\s*【([^】]+)】\s*$")
 
 
 def process_type1_0(lines, results):
@@ -17,24 +36,14 @@ def process_type1_0(lines, results):
 
     @saudio t="詩乃" fv=shi_0056 front="「わ、わかりました」" bv=shu_0024 back="「あとで観るのっ！？　そんなの、は、恥ずかしい……」"
     """
-    patterns = {
-        "nm_general": re.compile(r"@nm\s+(.+)"),
-        "saudio": re.compile(
-            r"@saudio\s+"
-            r't="(?P<speaker>[^"]+)"\s+'
-            r"fv=(?P<voice1>[^\s]+)\s+"
-            r'front="(?P<text1>[^"]+)"\s+'
-            r"bv=(?P<voice2>[^\s]+)\s+"
-            r'back="(?P<text2>[^"]+)"'
-        ),
-    }
+    tokens = tokenize(lines)
 
     def handle_nm_line(line, line_index):
         """处理@nm格式，支持任意顺序的参数"""
         # 提取所有参数
-        rt_match = re.search(r'rt="([^"]+)"', line)
-        t_match = re.search(r't="([^"]+)"', line)
-        s_match = re.search(r"s=([^\s]+)", line)
+        rt_match = RT_ATTR_RE.search(line)
+        t_match = T_ATTR_RE.search(line)
+        s_match = S_ATTR_RE.search(line)
 
         if not s_match:
             return line_index + 1  # 没有voice信息，跳过
@@ -72,9 +81,10 @@ def process_type1_0(lines, results):
         i = start_index + 1
         while i < len(lines):
             text_line = lines[i]
+            stripped = tokens.stripped[i]
 
             # 如果遇到@overlap_ch，放弃本次收集
-            if text_line.strip().startswith("@overlap_ch"):
+            if stripped.startswith("@overlap_ch"):
                 # 继续移动到文本结束位置，但不保存结果
                 while i < len(lines):
                     if "[np" in lines[i] or "[wvl" in lines[i]:
@@ -83,13 +93,13 @@ def process_type1_0(lines, results):
                 return i + 1
 
             # 跳过@chr、@chr2、@chr_poschange等命令行
-            if text_line.strip().startswith("@"):
+            if stripped.startswith("@"):
                 i += 1
                 continue
 
             # 处理行内的[chr2 ...]标签，去除这些标签但保留文本
             # 例如：[chr2 st05jc080b rt="依那"]　わーごめんなさい！！
-            text_line = re.sub(r"\[chr2?\s+[^\]]+\]", "", text_line)
+            text_line = CHR_TAG_RE.sub("", text_line)
 
             tmp.append(text_line)
             if "[np" in text_line or "[wv" in text_line:
@@ -103,30 +113,28 @@ def process_type1_0(lines, results):
 
         return i + 1
 
-    # 主处理循环
+    # 主处理循环: 只有 @ 开头的行才可能是 @nm / @saudio
     i = 0
     while i < len(lines):
         line = lines[i]
-
-        # 使用类似switch-case的结构
-        matched = False
+        if not line.startswith("@"):
+            i += 1
+            continue
 
         # Case 1: @nm (支持任意顺序的rt=, t=, s=参数)
-        match = patterns["nm_general"].match(line)
+        match = NM_GENERAL_RE.match(line)
         if match:
             i = handle_nm_line(line, i)
-            matched = True
+            continue
 
         # Case 2: @saudio ...
-        if not matched:
-            match = patterns["saudio"].match(line)
-            if match:
-                i = handle_saudio(match, i)
-                matched = True
+        match = SAUDIO_RE.match(line)
+        if match:
+            i = handle_saudio(match, i)
+            continue
 
         # 如果没有匹配任何模式，继续下一行
-        if not matched:
-            i += 1
+        i += 1
 
 
 def process_type1_1(lines, results):
@@ -135,41 +143,28 @@ def process_type1_1(lines, results):
     「ご主人様、お願いがあります！」
     @msgend
     """
-    # 形如：@msg name="Speaker" voice="Voice"
-    header_re = re.compile(r"^@msg\b(.*)$")
-    # 抽取形如 key="value" 的属性对；允许有任意空格
-    attr_re = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
-
-    i = 0
-    n = len(lines)
-
-    while i < n:
-        line = lines[i].strip()
-        m = header_re.match(line)
-        if not m:
-            i += 1
-            continue
-
-        # 解析属性
-        attr_str = m.group(1)
-        attrs = dict(attr_re.findall(attr_str))
-
-        Speaker = (attrs.get("name") or "").replace("　", "")
-        Voice = attrs.get("voice") or None
-
-        # 收集正文直到 @msgend
-        i += 1
-        tmp = []
-        while i < n and not lines[i].strip().startswith("@msgend"):
-            tmp.append(lines[i])
-            i += 1
-
-        Text = text_cleaning_02("".join(tmp))
-        results.append({"Speaker": Speaker, "Voice": Voice, "Text": Text})
+    # 形如：@msg name="Speaker" voice="Voice"，属性为 key="value"
+    Speaker = Voice = None
+    tmp = None
+
+    for line, stripped in zip(lines, tokenize(lines).stripped):
+        if tmp is None:
+            m = MSG_HEADER_RE.match(stripped)
+            if not m:
+                continue
+            attrs = dict(MSG_ATTR_RE.findall(m.group(1)))
+            Speaker = (attrs.get("name") or "").replace("　", "")
+            Voice = attrs.get("voice") or None
+            tmp = []
+        elif stripped.startswith("@msgend"):
+            # 收集正文直到 @msgend，并跳过该行
+            results.append({"Speaker": Speaker, "Voice": Voice, "Text": text_cleaning_02("".join(tmp))})
+            tmp = None
+        else:
+            tmp.append(line)
 
-        # 跳过 @msgend 行（如果存在）
-        if i < n and lines[i].strip().startswith("@msgend"):
-            i += 1
+    if tmp is not None:
+        results.append({"Speaker": Speaker, "Voice": Voice, "Text": text_cleaning_02("".join(tmp))})
 
 
 def process_type1_2(lines, results):
@@ -178,43 +173,30 @@ def process_type1_2(lines, results):
     【エスト/女の子】
     「わたし、エスト・フラグレンスと申します」
     """
-    # @vo Voice
-    vo_re = re.compile(r"^\s*@vo\s+(.+?)\s*$")
-    # 【Speaker】
-    spk_re = re.compile(r"^\s*【([^】]+)】\s*$")
-
     current_voice = None
-    i = 0
-    n = len(lines)
+    speaker = None
+    tmp = None
 
-    while i < n:
-        line = lines[i]
+    for line in lines:
+        # @vo Voice / 【Speaker】 都是块起点，先结束正在收集的文本
+        m_vo = VO_RE.match(line)
+        m_spk = None if m_vo else SPEAKER_LINE_RE.match(line)
+        if tmp is not None and (m_vo or m_spk):
+            results.append({"Speaker": speaker, "Voice": current_voice, "Text": text_cleaning_02("".join(tmp))})
+            tmp = None
 
         # 1) 处理 @vo
-        m_vo = vo_re.match(line)
         if m_vo:
             current_voice = m_vo.group(1).strip() or None
-            i += 1
             continue
 
-        # 2) 处理 【Speaker】
-        m_spk = spk_re.match(line)
+        # 2) 处理 【Speaker】，3) 收集文本直到遇到下一个块起点
         if m_spk:
             speaker = m_spk.group(1).replace("　", "").strip()
             speaker = speaker.split("/")[0]
-            i += 1
-
-            # 3) 收集文本直到遇到下一个块起点
             tmp = []
-            while i < n:
-                if spk_re.match(lines[i]) or vo_re.match(lines[i]):
-                    break
-                tmp.append(lines[i])
-                i += 1
-
-            text = text_cleaning_02("".join(tmp))
-            results.append({"Speaker": speaker, "Voice": current_voice, "Text": text})
-            continue
+        elif tmp is not None:
+            tmp.append(line)
 
-        # 非 @vo / 非 Speaker 行：跳过
-        i += 1
+    if tmp is not None:
+        results.append({"Speaker": speaker, "Voice": current_voice, "Text": text_cleaning_02("".join(tmp))})
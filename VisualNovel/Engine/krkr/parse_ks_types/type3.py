@@ -1,6 +1,13 @@
 import re
 
 from .text_cleaning import text_cleaning_02
+from .tokenizer import tokenize
+
+MSGNAME_RE = re.compile(r"\[msgname\s+name=([^\]]+)\]")
+CV_RE = re.compile(r"\[cv\s+str=([^\]]+)\]")
+NAME_RE = re.compile(r"^\[name\s+(?:text|chara)=([^\]]+)\]")
+VOICE_STORAGE_RE = re.compile(r'^\[voice\s+storage=["\']([^"\']+)["\']')
+SKIP_TAG_RE = re.compile(r"^\[(?:font\s+size=\d+|resetwait)\]")
 
 
 def process_type3_0(lines, results):
@@ -15,13 +22,13 @@ def process_type3_0(lines, results):
     buffer = []
 
     for line in lines:
-        m_name = re.search(r"\[msgname\s+name=([^\]]+)\]", line)
+        m_name = MSGNAME_RE.search(line)
         if m_name:
             speaker = m_name.group(1)
             buffer.clear()
             continue
 
-        m_cv = re.search(r"\[cv\s+str=([^\]]+)\]", line)
+        m_cv = CV_RE.search(line)
         if m_cv and speaker is not None:
             voice = m_cv.group(1)
             continue
@@ -45,13 +52,14 @@ def process_type3_1(lines, results):
     「あ……アベスターグの支部。[r]
     お兄ちゃん、せっかくだし寄っていかない？」
     """
+    tokens = tokenize(lines)
+    stripped, heads = tokens.stripped, tokens.heads
     i = 0
-    n = len(lines)
+    n = len(tokens)
 
     while i < n:
-        line = lines[i].strip()
-
-        m_name = re.match(r"^\[name\s+(?:text|chara)=([^\]]+)\]", line)
+        # 只有 [ 开头的行才可能是 [name
+        m_name = NAME_RE.match(stripped[i]) if heads[i] == "[" else None
         if not m_name:
             i += 1
             continue
@@ -61,7 +69,7 @@ def process_type3_1(lines, results):
 
         i += 1
         while i < n:
-            m_voice = re.match(r'^\[voice\s+storage=["\']([^"\']+)["\']', lines[i].strip())
+            m_voice = VOICE_STORAGE_RE.match(stripped[i]) if heads[i] == "[" else None
             if m_voice:
                 voice = m_voice.group(1)
                 i += 1
@@ -74,7 +82,7 @@ def process_type3_1(lines, results):
         buf = []
         while i < n:
             if lines[i].startswith("["):
-                if re.match(r"^\[(?:font\s+size=\d+|resetwait)\]", lines[i].strip()):
+                if SKIP_TAG_RE.match(stripped[i]):
                     # 跳过font标签和resetwait标签，不添加到buffer
                     i += 1
                     continue
@@ -1,6 +1,15 @@
 import re
 
 from .text_cleaning import text_cleaning_02
+from .tokenizer import tokenize
+
+SPEAKER_VOICE_RE = re.compile(r"^@(?P<Speaker>[^\s]+)\s+voice=(?P<Voice>[^\s]+)$")
+SPEAKER_LINE_RE = re.compile(r"^【(?P<SPEAK>[^\]]+)】$")
+SKETCH_RE = re.compile(r"^@(?P<Voice>[^\s]+)\s+\w+$")
+SKETCH_SPEAKER_RE = re.compile(r"^@【(?P<Speaker>[^】]+)】")
+SKETCH_TEXT_RE = re.compile(r'^@\S+\s+text="(?P<Text>.*)"')
+VOICE_ONLY_RE = re.compile(r"^@(?P<Voice>[^\s]+)$")
+SPEAKER_ONLY_RE = re.compile(r"^【(?P<Speaker>[^】]+)】$")
 
 
 def process_type4_0(lines, results):
@@ -17,18 +26,24 @@ def process_type4_0(lines, results):
     【Speaker】
     Text
     """
+    tokens = tokenize(lines)
+    stripped, heads = tokens.stripped, tokens.heads
     i = 0
     while i < len(lines):
-        line = lines[i].strip()
+        # 三种形式都以 @ 行开头
+        if heads[i] != "@":
+            i += 1
+            continue
+        line = stripped[i]
 
         # —— 形式 3: @Speaker voice=Voice
-        mC = re.match(r"^@(?P<Speaker>[^\s]+)\s+voice=(?P<Voice>[^\s]+)$", line)
+        mC = SPEAKER_VOICE_RE.match(line)
         if mC:
             speaker = mC.group("Speaker")
             voice = mC.group("Voice")
             # 下行应该是 【Speaker】
             if i + 1 < len(lines):
-                mS = re.match(r"^【(?P<SPEAK>[^\]]+)】$", lines[i + 1].strip())
+                mS = SPEAKER_LINE_RE.match(stripped[i + 1])
                 if mS:
                     # 再下一行就是 Text
                     text = lines[i + 2]
@@ -37,17 +52,17 @@ def process_type4_0(lines, results):
                     continue
 
         # —— 形式 2: @Voice sketch
-        mB = re.match(r"^@(?P<Voice>[^\s]+)\s+\w+$", line)
+        mB = SKETCH_RE.match(line)
         if mB and "sketch" in line:
             voice = mB.group("Voice")
             # 下行形如 @【Speakerスケブ】
             if i + 1 < len(lines):
-                mSB = re.match(r"^@【(?P<Speaker>[^】]+)】", lines[i + 1])
+                mSB = SKETCH_SPEAKER_RE.match(lines[i + 1])
                 if mSB:
                     speaker = mSB.group("Speaker")
                     # 再下一行形如 @スケブ text="Text"
                     if i + 2 < len(lines):
-                        mT = re.match(r'^@\S+\s+text="(?P<Text>.*)"', lines[i + 2])
+                        mT = SKETCH_TEXT_RE.match(lines[i + 2])
                         if mT:
                             text = mT.group("Text")
                             results.append({"Speaker": speaker.split("/")[0], "Voice": voice, "Text": text_cleaning_02(text.replace("/", ""))})
@@ -55,12 +70,12 @@ def process_type4_0(lines, results):
                             continue
 
         # —— 形式 1: @Voice
-        mA = re.match(r"^@(?P<Voice>[^\s]+)$", line)
+        mA = VOICE_ONLY_RE.match(line)
         if mA:
             voice = mA.group("Voice")
             # 下行应该是 【Speaker】
             if i + 1 < len(lines):
-                mS = re.match(r"^【(?P<Speaker>[^】]+)】$", lines[i + 1].strip())
+                mS = SPEAKER_ONLY_RE.match(stripped[i + 1])
                 if mS:
                     speaker = mS.group("Speaker")
                     # 再下一行就是 Text
@@ -2,6 +2,9 @@ import re
 
 from .text_cleaning import text_cleaning_02
 
+VOICE_RE = re.compile(r"^@v\s+s=(\S+)")
+SPEAKER_RE = re.compile(r"^@【(.+?)】")
+
 
 def process_type5_0(lines, results):
     """
@@ -11,14 +14,11 @@ def process_type5_0(lines, results):
     台词行1
     台词行2
     """
-    voice_re = re.compile(r"^@v\s+s=(\S+)")
-    speaker_re = re.compile(r"^@【(.+?)】")
-
     i = 0
     n = len(lines)
     while i < n:
         # 1. 匹配到 voice 标记
-        m_v = voice_re.match(lines[i])
+        m_v = VOICE_RE.match(lines[i])
         if not m_v:
             i += 1
             continue
@@ -28,11 +28,11 @@ def process_type5_0(lines, results):
         # 2. 在同一段落中继续寻找 speaker 或新的 voice
         while j < n:
             # 如果在找到台词前就遇到下一个 voice，则放弃当前 voice，跳到新 voice
-            if voice_re.match(lines[j]):
+            if VOICE_RE.match(lines[j]):
                 break
 
             # 找到 speaker 行
-            m_sp = speaker_re.match(lines[j])
+            m_sp = SPEAKER_RE.match(lines[j])
             if m_sp:
                 speaker = m_sp.group(1)
                 # 3. 收集后续所有非 @ 开头的台词行
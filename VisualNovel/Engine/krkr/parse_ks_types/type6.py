@@ -2,6 +2,11 @@ import re
 
 from .text_cleaning import text_cleaning_02
 
+HEADER_RE = re.compile(r"^@(?P<Speaker>\S+)\s+voice=(?P<Voice>\S+)")
+TEXT_RE = re.compile(r"^【.*?】　「?(?P<Text>.+?)」?$")
+# Header regex now matches voice in double quotes
+HEADER_QUOTED_RE = re.compile(r'^@(?P<Speaker>\S+)\s+voice="(?P<Voice>[^"]*)"')
+
 
 def process_type6_0(lines, results):
     """
@@ -11,18 +16,15 @@ def process_type6_0(lines, results):
     current_speaker = None
     current_voice = ""
 
-    header_re = re.compile(r"^@(?P<Speaker>\S+)\s+voice=(?P<Voice>\S+)")
-    text_re = re.compile(r"^【.*?】　「?(?P<Text>.+?)」?$")
-
     for line in lines:
-        m1 = header_re.match(line)
+        m1 = HEADER_RE.match(line)
         if m1:
             current_speaker = m1.group("Speaker")
             current_voice = m1.group("Voice").split(".")[0]
             continue
 
         if current_speaker is not None:
-            m2 = text_re.match(line)
+            m2 = TEXT_RE.match(line)
             if m2:
                 raw_text = m2.group("Text").strip()
                 cleaned = text_cleaning_02(raw_text)
@@ -34,11 +36,8 @@ def process_type6_1(lines, results):
     current_voice = ""
     expecting_text = False
 
-    # Header regex now matches voice in double quotes
-    header_re = re.compile(r'^@(?P<Speaker>\S+)\s+voice="(?P<Voice>[^"]*)"')
-
     for line in lines:
-        m1 = header_re.match(line)
+        m1 = HEADER_QUOTED_RE.match(line)
         if m1:
             current_speaker = m1.group("Speaker")
             current_speaker = current_speaker.split("/")[0]
@@ -1,6 +1,9 @@
 import re
 
 from .text_cleaning import text_cleaning_02
+from .tokenizer import tokenize
+
+HEADER_RE = re.compile(r"^\[([^\s\]]+)\s+voice=([^\]\s]+)")
 
 
 def process_type7_0(lines, results):
@@ -10,30 +13,31 @@ def process_type7_0(lines, results):
     「公序良俗に反した行いがなければ、止め立てする理由は
     私たちにはないということ」
     """
-    header_re = re.compile(r"^\[([^\s\]]+)\s+voice=([^\]\s]+)")
-
-    while lines:
-        line = lines[0].strip()
-        m = header_re.match(line)
+    # 按下标前进，不再 lines.pop(0)（每次 O(n)，大文件是平方级，并且会清空调用方的列表）
+    tokens = tokenize(lines)
+    stripped, heads = tokens.stripped, tokens.heads
+    i = 0
+    n = len(tokens)
+
+    while i < n:
+        m = HEADER_RE.match(stripped[i]) if heads[i] == "[" else None
+        i += 1
         if not m:
-            lines.pop(0)
             continue
 
         speaker = m.group(1)
         voice = m.group(2)
-        lines.pop(0)
 
-        if lines and lines[0].strip().startswith("【") and lines[0].strip().endswith("】"):
-            lines.pop(0)
+        if i < n and stripped[i].startswith("【") and stripped[i].endswith("】"):
+            i += 1
 
         text_lines = []
-        while lines:
-            ln = lines[0]
+        while i < n:
+            ln = lines[i]
+            i += 1
             if ln == "":
-                lines.pop(0)
                 break
             text_lines.append(ln)
-            lines.pop(0)
         text_lines = "".join(text_lines)
         text_lines = text_cleaning_02(text_lines)
 
@@ -1,6 +1,10 @@
 import re
 
 from .text_cleaning import text_cleaning_01
+from .tokenizer import tokenize
+
+SPEAKER_RE = re.compile(r"\[(?P<Code>[^\s\]]+)\s+[^\]]*\]")
+PLAYVC_RE = re.compile(r'\[playvc\s+storage="?([^"\]]+)"?\]')
 
 
 def process_type999(lines, results):
@@ -112,13 +116,11 @@ def process_type999(lines, results):
         "MaWos": "妇人",
         "RaOps": "雷达操作员",
     }
-    speaker_re = re.compile(r"\[(?P<Code>[^\s\]]+)\s+[^\]]*\]")
-    playvc_re = re.compile(r'\[playvc\s+storage="?([^"\]]+)"?\]')
-
+    tokens = tokenize(lines)
+    stripped, heads = tokens.stripped, tokens.heads
     i = 0
     while i < len(lines):
-        line = lines[i].strip()
-        m_s = speaker_re.match(line)
+        m_s = SPEAKER_RE.match(stripped[i]) if heads[i] == "[" else None
         if not m_s:
             i += 1
             continue
@@ -132,7 +134,7 @@ def process_type999(lines, results):
         i += 1
         voice = None
         while i < len(lines):
-            m_v = playvc_re.match(lines[i].strip())
+            m_v = PLAYVC_RE.match(stripped[i]) if heads[i] == "[" else None
             if m_v:
                 voice = m_v.group(1)
                 i += 1
@@ -151,7 +153,7 @@ def process_type999(lines, results):
                     text_chunks.append(final)
                 i += 1
                 break
-            clean = txt_line.strip()
+            clean = stripped[i]
             if clean:
                 text_chunks.append(clean)
             i += 1
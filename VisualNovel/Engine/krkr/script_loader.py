@@ -0,0 +1,181 @@
+import codecs
+import hashlib
+import inspect
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import chardet
+from tqdm import tqdm
+
+# 编码检测只看文件开头这么多字节
+PREFIX_SIZE = 64 * 1024
+# 缓存默认放在输入目录下
+CACHE_NAME = ".parse_cache.sqlite3"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_KANA_RE = re.compile(r"[\u3040-\u30ff]")
+_HALFWIDTH_KANA_RE = re.compile(r"[\uff61-\uff9f]")
+
+
+def _decodes(prefix, encoding, complete):
+    """prefix 能否按 encoding 严格解码; 前缀被截断时末尾半个字符不算错"""
+    try:
+        return codecs.getincrementaldecoder(encoding)().decode(prefix, final=complete)
+    except UnicodeDecodeError:
+        return None
+
+
+def _looks_japanese(text):
+    # GBK 等按 cp932 也可能解码成功, 但会变成一堆半角片假名; 日文脚本几乎只用全角假名
+    kana = len(_KANA_RE.findall(text))
+    return kana > 0 and len(_HALFWIDTH_KANA_RE.findall(text)) * 10 < kana
+
+
+def detect_encoding(raw):
+    """BOM -> UTF-8 -> cp932 -> chardet, 都只看前 PREFIX_SIZE 字节"""
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            return encoding
+    prefix = raw[:PREFIX_SIZE]
+    complete = len(raw) <= PREFIX_SIZE
+    if _decodes(prefix, "utf-8", complete) is not None:
+        return "utf-8"
+    text = _decodes(prefix, "cp932", complete)
+    if text is not None and _looks_japanese(text):
+        return "cp932"
+    return chardet.detect(prefix)["encoding"]
+
+
+def decode_text(raw):
+    try:
+        return raw.decode(detect_encoding(raw))
+    except (UnicodeDecodeError, LookupError, TypeError):
+        return raw.decode("cp932")
+
+
+def read_lines(path):
+    """只读一次文件; 换行处理与文本模式的 readlines() 相同"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    text = decode_text(raw).replace("\r\n", "\n").replace("\r", "\n")
+    return io.StringIO(text).readlines()
+
+
+class RecordCache:
+    """(相对路径, 解析器) -> 文件大小, mtime_ns, 解析结果 (JSON)
+
+    同一目录换 -ft 或输出路径重跑时, 没改动的文件直接取缓存;
+    解析器键带有解析代码的摘要 (见 parser_key), 改了解析函数后旧记录自动不再命中"""
+
+    def __init__(self, db_path, root):
+        self.root = root
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS records (path TEXT, parser TEXT, size INTEGER, mtime_ns INTEGER, data TEXT, PRIMARY KEY (path, parser))")
+
+    def _key(self, path):
+        return os.path.relpath(path, self.root).replace("\\", "/")
+
+    def get(self, path, parser, stat):
+        row = self.conn.execute("SELECT size, mtime_ns, data FROM records WHERE path = ? AND parser = ?", (self._key(path), parser)).fetchone()
+        if row is None or (row[0], row[1]) != stat:
+            return None
+        return json.loads(row[2])
+
+    def drop_stale(self, parser):
+        """删掉同一解析器旧源码摘要下 (以及没有摘要的旧版本) 的记录"""
+        name = parser.rsplit(":", 1)[0]
+        prefix = name + ":"
+        self.conn.execute("DELETE FROM records WHERE (parser = ? OR substr(parser, 1, ?) = ?) AND parser != ?", (name, len(prefix), prefix, parser))
+        self.conn.commit()
+
+    def put_many(self, items, parser):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+            [(self._key(path), parser, *stat, json.dumps(records, ensure_ascii=False)) for path, stat, records in items],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def parser_key(name, *funcs):
+    """缓存用的解析器键: name + funcs 所在模块源码的摘要
+
+    函数在包里时取整个包已加载的模块 (type*.py 共用的 tokenizer/text_cleaning 改了也算)"""
+    modules = set()
+    for func in funcs:
+        module = sys.modules[func.__module__]
+        package = module.__package__
+        if package:
+            modules.update(m for m in sys.modules if m == package or m.startswith(package + "."))
+        else:
+            modules.add(module.__name__)
+    digest = hashlib.sha1()
+    for module_name in sorted(modules):
+        try:
+            source = inspect.getsource(sys.modules[module_name])
+        except (OSError, TypeError):
+            continue
+        digest.update(module_name.encode() + b"\0" + source.encode())
+    return f"{name}:{digest.hexdigest()[:16]}"
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def parse_files(paths, worker, parser, jobs=0, cache=None, ncols=None):
+    """worker(path) -> 该文件的记录列表; 在进程池上执行, 按 paths 的顺序合并
+
+    worker 需要能被 pickle (模块级函数或其 functools.partial)"""
+    per_file = [None] * len(paths)
+    pending = []
+    if cache:
+        cache.drop_stale(parser)
+    for i, path in enumerate(paths):
+        stat = file_stat(path)
+        records = cache.get(path, parser, stat) if cache else None
+        if records is None:
+            pending.append((i, stat))
+        else:
+            per_file[i] = records
+
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+    todo = [paths[i] for i, _ in pending]
+    with tqdm(total=len(paths), initial=len(paths) - len(todo), ncols=ncols) as bar:
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                chunksize = max(1, len(todo) // (jobs * 8))
+                parsed = []
+                for records in pool.map(worker, todo, chunksize=chunksize):
+                    parsed.append(records)
+                    bar.update()
+        else:
+            parsed = []
+            for path in todo:
+                parsed.append(worker(path))
+                bar.update()
+
+    for (i, _), records in zip(pending, parsed):
+        per_file[i] = records
+    if cache and pending:
+        cache.put_many([(paths[i], stat, per_file[i]) for i, stat in pending], parser)
+
+    return [record for records in per_file for record in records]
+
+
+def open_cache(root, cache_path=None, enabled=True):
+    if not enabled:
+        return None
+    return RecordCache(cache_path or os.path.join(root, CACHE_NAME), root)
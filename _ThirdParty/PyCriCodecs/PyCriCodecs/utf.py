@@ -1,9 +1,80 @@
+from bisect import bisect_left
+from functools import lru_cache
 from io import BytesIO, FileIO
-from struct import calcsize, unpack
+from struct import Struct
+
+import numpy as np
 
 from .chunk import UTFChunkHeader, UTFType, UTFTypeValues
 
 
+@lru_cache(maxsize=None)
+def _utf_struct(fmt: str) -> Struct:
+    return Struct(">" + fmt)
+
+
+_eutf_keystream = np.array([0x5F], dtype=np.uint8)
+
+
+def eutf_keystream(size: int) -> np.ndarray:
+    """Low bytes of m = 0x655F, m = m * 0x4115 for the first `size` positions, grown by doubling and kept across tables."""
+    global _eutf_keystream
+    ks = _eutf_keystream
+    while len(ks) < size:
+        # ks[n + i] = ks[i] * 0x4115^n (mod 256); uint8 multiply wraps for us.
+        ks = np.concatenate((ks, ks * np.uint8(pow(0x4115, len(ks), 0x100))))
+    _eutf_keystream = ks
+    return ks[:size]
+
+
+def eutf_decrypt(data) -> bytes:
+    """XORs an encrypted @UTF buffer with the EUTF keystream (the cipher is symmetric)."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    return np.bitwise_xor(buf, eutf_keystream(len(buf))).tobytes()
+
+
+class UTFStringPool:
+    """Offset-indexed @UTF string pool. Strings are decoded on first lookup and cached by pointer."""
+
+    def __init__(self, pool: bytes):
+        self.strings = pool.split(b"\x00")
+        self.starts = []
+        start = 0
+        for s in self.strings:
+            self.starts.append(start)
+            start += len(s) + 1
+        self.encoding = "utf-8"
+        self._cache = dict()
+
+    def __getitem__(self, pointer: int) -> str:
+        try:
+            return self._cache[pointer]
+        except KeyError:
+            pass
+        # A pointer into the middle of a string resolves to the next string start, same as the old linear scan.
+        i = bisect_left(self.starts, pointer)
+        if i == len(self.starts):
+            raise Exception("Failed string lookup.")
+        value = self.decode(self.strings[i])
+        self._cache[pointer] = value
+        return value
+
+    def decode(self, raw: bytes) -> str:
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        for x in ["shift-jis", "utf-16"]:
+            try:
+                value = raw.decode(x)
+            except UnicodeDecodeError:
+                continue
+            # This looks sketchy, but it will always work since @UTF only supports these 3 encodings.
+            self.encoding = x
+            return value
+        raise UnicodeError(f"UTF: String of unknown encoding: {raw}")
+
+
 class UTF:
     def __init__(self, stream):
         if isinstance(stream, str):
@@ -16,13 +87,7 @@ class UTF:
             pass
         elif self.magic == UTFType.EUTF.value:
             self.stream.seek(0)
-            data = memoryview(bytearray(self.stream.read()))
-            m = 0x655F
-            t = 0x4115
-            for i in range(len(data)):
-                data[i] ^= 0xFF & m
-                m = (m * t) & 0xFFFFFFFF
-            self.stream = BytesIO(bytearray(data))
+            self.stream = BytesIO(eutf_decrypt(self.stream.read()))
             self.magic, self.table_size, self.rows_offset, self.string_offset, self.data_offset, self.table_name, self.num_columns, self.row_length, self.num_rows = UTFChunkHeader.unpack(self.stream.read(UTFChunkHeader.size))
             if self.magic != UTFType.UTF.value:
                 raise Exception("Decryption error.")
@@ -32,108 +97,100 @@ class UTF:
             raise ValueError("UTF chunk is not present.")
 
     def read_rows_and_columns(self) -> dict:
-        stream = self.stream.read(self.data_offset - 0x18)
-        stream = BytesIO(stream)
-        types = [[], [], [], []]
-        target_data = []
-        target_constant = []
-        target_tuple = []
-        for i in range(self.num_columns):
-            flag = stream.read(1)[0]
+        self.stream.seek(0)
+        buf = self.stream.read()
+        pos = UTFChunkHeader.size
+        data_start = self.data_offset + 0x8
+        u32 = Struct(">I")
+
+        # (name pointer, typeflag[, value]) per storage class, in column order.
+        zero_columns = []
+        constant_columns = []
+        row_columns = []
+        for _ in range(self.num_columns):
+            flag = buf[pos]
+            pos += 1
             stflag = flag >> 4
             typeflag = flag & 0xF
+            name = u32.unpack_from(buf, pos)[0]
+            pos += 4
             if stflag == 0x1:
-                target_constant.append(int.from_bytes(stream.read(4), "big"))
-                types[2].append((">" + self.stringtypes(typeflag), typeflag))
+                zero_columns.append((name, typeflag))
             elif stflag == 0x3:
-                target_tuple.append((int.from_bytes(stream.read(4), "big"), unpack(">" + self.stringtypes(typeflag), stream.read(calcsize(self.stringtypes(typeflag))))))
-                types[1].append((">" + self.stringtypes(typeflag), typeflag))
+                value_struct = _utf_struct(self.stringtypes(typeflag))
+                constant_columns.append((name, typeflag, value_struct.unpack_from(buf, pos)))
+                pos += value_struct.size
             elif stflag == 0x5:
-                target_data.append(int.from_bytes(stream.read(4), "big"))
-                types[0].append((">" + self.stringtypes(typeflag), typeflag))
+                row_columns.append((name, typeflag))
             elif stflag == 0x7:  # Exists in old CPK's.
-                # target_tuple.append((int.from_bytes(stream.read(4), "big"), int.from_bytes(stream.read(calcsize(self.stringtypes(typeflag))), "big")))
-                # types[3].append((">"+self.stringtypes(typeflag), typeflag))
                 raise NotImplementedError("UTF: Unsupported 0x70 storage flag.")
             else:
                 raise Exception("UTF: Unknown storage flag.")
 
-        rows = []
+        # Rows are packed back to back right after the column definitions; one Struct decodes a whole row.
+        row_struct = _utf_struct("".join(self.stringtypes(typeflag) for _, typeflag in row_columns))
+        rows_size = row_struct.size * self.num_rows if row_columns else 0
+        rows = buf[pos : pos + rows_size]
+        pos += rows_size
+
+        strings = UTFStringPool(buf[pos:data_start])
+        self.table_name = strings[self.table_name]
+        UTFTypeValuesList = list(UTFTypeValues)
         table = dict()
-        for j in range(self.num_rows):
-            for i in types[0]:
-                rows.append(unpack(i[0], stream.read(calcsize(i[0]))))
-
-        for i in range(4):
-            for j in range(len(types[i])):
-                types[i][j] = (types[i][j][0][1:], types[i][j][1])
-        strings = (stream.read()).split(b"\x00")
-        strings_copy = strings[:]
-        self.__payload = []
-        self.encoding = "utf-8"
-        for i in range(len(strings)):
-            try:
-                strings_copy[i] = strings[i].decode("utf-8")
-            except Exception:
-                for x in ["shift-jis", "utf-16"]:
-                    try:
-                        strings_copy[i] = strings[i].decode(x)
-                        self.encoding = x
-                        # This looks sketchy, but it will always work since @UTF only supports these 3 encodings.
-                        break
-                    except Exception:
-                        continue
-                else:
-                    # Probably useless.
-                    raise UnicodeDecodeError(f"UTF: String of unknown encoding: {strings[i]}")
         t_t_dict = dict()
-        self.table_name = strings_copy[self.finder(self.table_name, strings)]
-        UTFTypeValuesList = list(UTFTypeValues)
-        for i in range(len(target_constant)):
-            if types[2][i][1] not in [0xA, 0xB]:
-                val = self.finder(target_constant[i], strings)
-                table.setdefault(strings_copy[val], []).append(0)
-                t_t_dict.update({strings_copy[val]: (UTFTypeValuesList[types[2][i][1]], None)})
-            elif types[2][i][1] == 0xA:
-                val = self.finder(target_constant[i], strings)
-                table.setdefault(strings_copy[val], []).append("<NULL>")
-                t_t_dict.update({strings_copy[val]: (UTFTypeValues.string, "<NULL>")})
+        self.__payload = []
+
+        for name, typeflag in zero_columns:
+            name = strings[name]
+            if typeflag == 0xA:
+                table.setdefault(name, []).append("<NULL>")
+                t_t_dict[name] = (UTFTypeValues.string, "<NULL>")
+            elif typeflag == 0xB:
+                table.setdefault(name, []).append(b"")
+                t_t_dict[name] = (UTFTypeValues.bytes, b"")
             else:
-                # Most likely useless, since the code doesn seem to reach here.
-                val = self.finder(target_constant[i], strings)
-                table.setdefault(strings_copy[val], []).append(b"")
-                t_t_dict.update({strings_copy[val]: (UTFTypeValues.bytes, b"")})
-        for i in range(len(target_tuple)):
-            if types[1][i % (len(types[1]))][1] not in [0xA, 0xB]:
-                table.setdefault(strings_copy[self.finder(target_tuple[i][0], strings)], []).append(target_tuple[i][1])
-                t_t_dict.update({strings_copy[self.finder(target_tuple[i][0], strings)]: (UTFTypeValuesList[types[1][i % len(types[1])][1]], target_tuple[i][1][0])})
-            elif types[1][i % (len(types[1]))][1] == 0xA:
-                table.setdefault(strings_copy[self.finder(target_tuple[i][0], strings)], []).append(strings_copy[self.finder(target_tuple[i][1][0], strings)])
-                t_t_dict.update({strings_copy[self.finder(target_tuple[i][0], strings)]: (UTFTypeValues.string, strings_copy[self.finder(target_tuple[i][1][0], strings)])})
+                table.setdefault(name, []).append(0)
+                t_t_dict[name] = (UTFTypeValuesList[typeflag], None)
+
+        for name, typeflag, value in constant_columns:
+            name = strings[name]
+            if typeflag == 0xA:
+                val = strings[value[0]]
+                table.setdefault(name, []).append(val)
+                t_t_dict[name] = (UTFTypeValues.string, val)
+            elif typeflag == 0xB:
+                val = buf[data_start + value[0] : data_start + value[0] + value[1]]
+                table.setdefault(name, []).append(val)
+                t_t_dict[name] = (UTFTypeValues.bytes, val)
             else:
-                self.stream.seek(self.data_offset + target_tuple[i][1][0] + 0x8, 0)
-                bin_val = self.stream.read((target_tuple[i][1][1]))
-                table.setdefault(strings_copy[self.finder(target_tuple[i][0], strings)], []).append(bin_val)
-                t_t_dict.update({strings_copy[self.finder(target_tuple[i][0], strings)]: (UTFTypeValues.bytes, bin_val)})
-        temp_dict = dict()
-        if len(rows) == 0:
+                table.setdefault(name, []).append(value)
+                t_t_dict[name] = (UTFTypeValuesList[typeflag], value[0])
+
+        if row_columns and self.num_rows:
+            # (name, type, slot in the unpacked row, table column) per row column.
+            layout = []
+            slot = 0
+            for name, typeflag in row_columns:
+                name = strings[name]
+                layout.append((name, typeflag, UTFTypeValuesList[typeflag], slot, table.setdefault(name, [])))
+                slot += 2 if typeflag == 0xB else 1
+
+            for values in row_struct.iter_unpack(rows):
+                row = dict()
+                for name, typeflag, type_value, slot, column in layout:
+                    if typeflag == 0xA:
+                        val = strings[values[slot]]
+                    elif typeflag == 0xB:
+                        val = buf[data_start + values[slot] : data_start + values[slot] + values[slot + 1]]
+                    else:
+                        val = values[slot]
+                    column.append(val)
+                    row[name] = (type_value, val)
+                row.update(t_t_dict)
+                self.__payload.append(row)
+        if not self.__payload:
             self.__payload.append(t_t_dict)
-        for i in range(len(rows)):
-            if types[0][i % (len(types[0]))][1] not in [0xA, 0xB]:
-                table.setdefault(strings_copy[self.finder(target_data[i % (len(target_data))], strings)], []).append(rows[i][0])
-                temp_dict.update({strings_copy[self.finder(target_data[i % (len(target_data))], strings)]: (UTFTypeValuesList[types[0][i % (len(types[0]))][1]], rows[i][0])})
-            elif types[0][i % (len(types[0]))][1] == 0xA:
-                table.setdefault(strings_copy[self.finder(target_data[i % (len(target_data))], strings)], []).append(strings_copy[self.finder(rows[i][0], strings)])
-                temp_dict.update({strings_copy[self.finder(target_data[i % (len(target_data))], strings)]: (UTFTypeValues.string, strings_copy[self.finder(rows[i][0], strings)])})
-            else:
-                self.stream.seek(self.data_offset + rows[i][0] + 0x8, 0)
-                bin_val = self.stream.read((rows[i][1]))
-                table.setdefault(strings_copy[self.finder(target_data[i % (len(target_data))], strings)], []).append(bin_val)
-                temp_dict.update({strings_copy[self.finder(target_data[i % (len(target_data))], strings)]: (UTFTypeValues.bytes, bin_val)})
-            if not (i + 1) % (len(types[0])):
-                temp_dict.update(t_t_dict)
-                self.__payload.append(temp_dict)
-                temp_dict = dict()
+        self.encoding = strings.encoding
         return table
 
     def stringtypes(self, type: int) -> str:
@@ -145,16 +202,6 @@ class UTF:
         else:
             raise Exception("Unkown data type.")
 
-    def finder(self, pointer, strings) -> int:
-        sum = 0
-        for i in range(len(strings)):
-            if sum < pointer:
-                sum += len(strings[i]) + 1
-                continue
-            return i
-        else:
-            raise Exception("Failed string lookup.")
-
     def get_payload(self) -> list:
         """Returns list of dictionaries used in the UTF."""
         # I am a noob, but I want to standardize the table output to Donmai WannaCri's payload type.
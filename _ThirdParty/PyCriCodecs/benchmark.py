@@ -0,0 +1,258 @@
+import argparse
+import os
+import time
+from io import BytesIO
+from struct import calcsize, iter_unpack, pack, unpack
+
+from PyCriCodecs.acb import CueGraph
+from PyCriCodecs.chunk import UTFChunkHeader, UTFTypeValues
+from PyCriCodecs.utf import UTF, eutf_decrypt
+
+
+class LegacyUTF(UTF):
+    """The original linear-scan @UTF decoder, kept here as the baseline and reference output."""
+
+    def read_rows_and_columns(self) -> dict:
+        stream = BytesIO(self.stream.read(self.data_offset - 0x18))
+        types = [[], [], [], []]
+        target_data = []
+        target_constant = []
+        target_tuple = []
+        for i in range(self.num_columns):
+            flag = stream.read(1)[0]
+            stflag = flag >> 4
+            typeflag = flag & 0xF
+            if stflag == 0x1:
+                target_constant.append(int.from_bytes(stream.read(4), "big"))
+                types[2].append((">" + self.stringtypes(typeflag), typeflag))
+            elif stflag == 0x3:
+                target_tuple.append((int.from_bytes(stream.read(4), "big"), unpack(">" + self.stringtypes(typeflag), stream.read(calcsize(self.stringtypes(typeflag))))))
+                types[1].append((">" + self.stringtypes(typeflag), typeflag))
+            elif stflag == 0x5:
+                target_data.append(int.from_bytes(stream.read(4), "big"))
+                types[0].append((">" + self.stringtypes(typeflag), typeflag))
+
+        rows = []
+        table = dict()
+        for j in range(self.num_rows):
+            for i in types[0]:
+                rows.append(unpack(i[0], stream.read(calcsize(i[0]))))
+
+        strings = (stream.read()).split(b"\x00")
+        strings_copy = [s.decode("utf-8") for s in strings]
+        self._UTF__payload = []
+        t_t_dict = dict()
+        self.table_name = strings_copy[self.finder(self.table_name, strings)]
+        UTFTypeValuesList = list(UTFTypeValues)
+        for i in range(len(target_constant)):
+            val = strings_copy[self.finder(target_constant[i], strings)]
+            if types[2][i][1] not in [0xA, 0xB]:
+                table.setdefault(val, []).append(0)
+                t_t_dict.update({val: (UTFTypeValuesList[types[2][i][1]], None)})
+            elif types[2][i][1] == 0xA:
+                table.setdefault(val, []).append("<NULL>")
+                t_t_dict.update({val: (UTFTypeValues.string, "<NULL>")})
+            else:
+                table.setdefault(val, []).append(b"")
+                t_t_dict.update({val: (UTFTypeValues.bytes, b"")})
+        for i in range(len(target_tuple)):
+            name = strings_copy[self.finder(target_tuple[i][0], strings)]
+            if types[1][i][1] not in [0xA, 0xB]:
+                table.setdefault(name, []).append(target_tuple[i][1])
+                t_t_dict.update({name: (UTFTypeValuesList[types[1][i][1]], target_tuple[i][1][0])})
+            elif types[1][i][1] == 0xA:
+                table.setdefault(name, []).append(strings_copy[self.finder(target_tuple[i][1][0], strings)])
+                t_t_dict.update({name: (UTFTypeValues.string, strings_copy[self.finder(target_tuple[i][1][0], strings)])})
+            else:
+                self.stream.seek(self.data_offset + target_tuple[i][1][0] + 0x8, 0)
+                bin_val = self.stream.read((target_tuple[i][1][1]))
+                table.setdefault(name, []).append(bin_val)
+                t_t_dict.update({name: (UTFTypeValues.bytes, bin_val)})
+        temp_dict = dict()
+        if len(rows) == 0:
+            self._UTF__payload.append(t_t_dict)
+        for i in range(len(rows)):
+            name = strings_copy[self.finder(target_data[i % (len(target_data))], strings)]
+            typeflag = types[0][i % (len(types[0]))][1]
+            if typeflag not in [0xA, 0xB]:
+                table.setdefault(name, []).append(rows[i][0])
+                temp_dict.update({name: (UTFTypeValuesList[typeflag], rows[i][0])})
+            elif typeflag == 0xA:
+                table.setdefault(name, []).append(strings_copy[self.finder(rows[i][0], strings)])
+                temp_dict.update({name: (UTFTypeValues.string, strings_copy[self.finder(rows[i][0], strings)])})
+            else:
+                self.stream.seek(self.data_offset + rows[i][0] + 0x8, 0)
+                bin_val = self.stream.read((rows[i][1]))
+                table.setdefault(name, []).append(bin_val)
+                temp_dict.update({name: (UTFTypeValues.bytes, bin_val)})
+            if not (i + 1) % (len(types[0])):
+                temp_dict.update(t_t_dict)
+                self._UTF__payload.append(temp_dict)
+                temp_dict = dict()
+        return table
+
+    def finder(self, pointer, strings) -> int:
+        sum = 0
+        for i in range(len(strings)):
+            if sum < pointer:
+                sum += len(strings[i]) + 1
+                continue
+            return i
+        else:
+            raise Exception("Failed string lookup.")
+
+
+def legacy_eutf_decrypt(data: bytes) -> bytes:
+    data = memoryview(bytearray(data))
+    m = 0x655F
+    t = 0x4115
+    for i in range(len(data)):
+        data[i] ^= 0xFF & m
+        m = (m * t) & 0xFFFFFFFF
+    return bytes(data)
+
+
+def build_utf(num_rows: int) -> bytes:
+    """Builds a CueName-like @UTF table with per-row string/int/bytes columns plus constant and zero columns."""
+    pool = bytearray()
+    pointers = {}
+
+    def string(s: str) -> int:
+        if s not in pointers:
+            pointers[s] = len(pool)
+            pool.extend(s.encode("utf-8") + b"\x00")
+        return pointers[s]
+
+    table_name = string("CueNameTable")
+    # (flag, name, constant value)
+    columns = [
+        (0x5A, "CueName", b""),
+        (0x52, "CueIndex", b""),
+        (0x54, "Length", b""),
+        (0x5B, "Command", b""),
+        (0x1A, "UserData", b""),
+        (0x34, "Version", pack(">I", 0x01330000)),
+        (0x3A, "Category", pack(">I", string("voice"))),
+    ]
+    column_defs = b"".join(pack(">BI", flag, string(name)) + value for flag, name, value in columns)
+
+    data = bytearray()
+    rows = bytearray()
+    for i in range(num_rows):
+        command = pack(">HBHH", 2000, 4, 2, i & 0xFFFF) + b"\x00" * (i % 7)
+        rows += pack(">IHIII", string(f"vo_adv_{i:07d}_000"), i & 0xFFFF, 1000 + i, len(data), len(command))
+        data += command
+
+    rows_offset = UTFChunkHeader.size + len(column_defs) - 8
+    string_offset = rows_offset + len(rows)
+    data_offset = string_offset + len(pool)
+    header = UTFChunkHeader.pack(b"@UTF", data_offset + len(data), rows_offset, string_offset, data_offset, table_name, len(columns), 18, num_rows)
+    return header + column_defs + rows + pool + data
+
+
+def timed(cls, data: bytes):
+    start = time.perf_counter()
+    utf = cls(data)
+    return time.perf_counter() - start, utf
+
+
+def bench_utf(sizes, legacy_max_rows: int):
+    for num_rows in sizes:
+        data = build_utf(num_rows)
+        new_time, new = timed(UTF, data)
+        line = f"@UTF {num_rows:>7} rows ({len(data) / 1048576:.1f} MB): indexed {new_time:.3f}s"
+        if num_rows <= legacy_max_rows:
+            old_time, old = timed(LegacyUTF, data)
+            if old.table != new.table or old.get_payload() != new.get_payload():
+                raise AssertionError(f"Output mismatch at {num_rows} rows")
+            line += f", legacy {old_time:.3f}s, x{old_time / new_time:.1f}"
+        else:
+            line += ", legacy skipped"
+        print(line)
+
+
+def bench_eutf(sizes_mb):
+    for size_mb in sizes_mb:
+        size = int(size_mb * 1048576)
+        data = os.urandom(size)
+        start = time.perf_counter()
+        old = legacy_eutf_decrypt(data)
+        old_time = time.perf_counter() - start
+        start = time.perf_counter()
+        new = eutf_decrypt(data)
+        new_time = time.perf_counter() - start
+        if old != new:
+            raise AssertionError(f"EUTF output mismatch at {size_mb} MB")
+        print(f"EUTF {size_mb:>5} MB: vectorized {new_time:.3f}s ({size_mb / new_time:.0f} MB/s), legacy {old_time:.3f}s, x{old_time / new_time:.1f}")
+
+
+class TableACB:
+    """Stand-in for ACB that serves prebuilt table rows, in the (type, value) form @UTF payloads use."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name) -> list:
+        return self.tables.get(name, [])
+
+
+def reference_ids(tables, kind, idx, seen=frozenset()):
+    """Plain reachability walk over the same tables, without memoization."""
+    if (kind, idx) in seen:
+        return set()
+    seen = seen | {(kind, idx)}
+    if kind == CueGraph.WAVEFORM:
+        return {tables["WaveformTable"][idx]["Id"][1]}
+    ids = set()
+    if kind == CueGraph.SYNTH:
+        refs = tables["SynthTable"][idx]["ReferenceItems"][1]
+        for off in range(0, len(refs) - 3, 4):
+            ids |= reference_ids(tables, *unpack(">HH", refs[off : off + 4]), seen)
+    else:
+        tracks = tables["SequenceTable"][idx]["TrackIndex"][1]
+        for (track,) in iter_unpack(">h", tracks):
+            event = tables["TrackTable"][track]["EventIndex"][1]
+            command = tables["TrackEventTable"][event]["Command"][1]
+            ids |= reference_ids(tables, *unpack(">HH", command[3:7]), seen)
+    return ids
+
+
+def check_cue_graph():
+    """Sequences 0 -> 1 -> 2 -> 0 form a cycle, each also playing its own synth/waveform; every sequence must
+    resolve to all three waveforms no matter which one a cue reaches first."""
+    tables = {
+        "WaveformTable": [{"Id": (UTFTypeValues.ushort, i)} for i in range(3)],
+        "SynthTable": [{"ReferenceItems": (UTFTypeValues.bytes, pack(">HH", CueGraph.WAVEFORM, i))} for i in range(3)],
+        "SequenceTable": [],
+        "TrackTable": [],
+        "TrackEventTable": [],
+    }
+    for seq in range(3):
+        targets = [(CueGraph.SYNTH, seq), (CueGraph.SEQUENCE, (seq + 1) % 3)]
+        first = len(tables["TrackTable"])
+        for kind, idx in targets:
+            tables["TrackTable"].append({"EventIndex": (UTFTypeValues.ushort, len(tables["TrackEventTable"]))})
+            tables["TrackEventTable"].append({"Command": (UTFTypeValues.bytes, pack(">HBHH", 2000, 4, kind, idx))})
+        track_index = b"".join(pack(">h", first + i) for i in range(len(targets)))
+        tables["SequenceTable"].append({"NumTracks": (UTFTypeValues.ushort, len(targets)), "TrackIndex": (UTFTypeValues.bytes, track_index)})
+
+    for order in ([0, 1, 2], [1, 0, 2], [2, 1, 0]):
+        graph = CueGraph(TableACB(tables))
+        for seq in order:
+            expected = reference_ids(tables, CueGraph.SEQUENCE, seq)
+            got = set(graph.resolve(CueGraph.SEQUENCE, seq))
+            if got != expected:
+                raise AssertionError(f"CueGraph: sequence {seq} (order {order}) resolved to {sorted(got)}, expected {sorted(expected)}")
+    print("CueGraph: cyclic sequences resolve to the full waveform set")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[0, 10000, 100000])
+    parser.add_argument("--legacy_max_rows", type=int, default=20000, help="The legacy decoder is quadratic; skip it above this size")
+    parser.add_argument("--eutf_mb", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    check_cue_graph()
+    bench_utf(args.rows, args.legacy_max_rows)
+    bench_eutf(args.eutf_mb)
@@ -1,13 +1,18 @@
 import argparse
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import xxhash
 from tqdm import tqdm
 
 from PyCriCodecs.acb import ACB
 from PyCriCodecs.awb import AWB
 
 
-def extract_one(acb_path, out_root, mainkey):
+def extract_one(acb_path, out_root, mainkey, workers=None, progress=True):
     acb = ACB(str(acb_path))
 
     embedded_awb_bytes = None
@@ -26,14 +31,122 @@ def extract_one(acb_path, out_root, mainkey):
     else:
         external_awb = acb_path.with_suffix(".awb")
         if not external_awb.exists():
-            return
+            return None
         awb = AWB(str(external_awb), mainkey)
 
     out_dir = out_root / acb_path.stem
     out_dir.mkdir(parents=True, exist_ok=True)
 
     a = acb.extract()
-    AWB.extract(awb, a, str(out_dir))
+    with awb:
+        stats = awb.extract(a, str(out_dir), workers=workers, progress=progress)
+    stats["cues"] = sorted(a)
+    return stats
+
+
+def file_stat(path):
+    """(size, mtime_ns) of a file, or None when it does not exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def file_xxh3(path, chunk_size=1 << 20):
+    if not path.exists():
+        return None
+    h = xxhash.xxh3_128()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    """SQLite record of extracted ACB/AWB pairs: input stat + content hash, and the cue list written."""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pairs ("
+            "acb_path TEXT PRIMARY KEY, acb_size INTEGER, acb_mtime_ns INTEGER, acb_hash TEXT, "
+            "awb_path TEXT, awb_size INTEGER, awb_mtime_ns INTEGER, awb_hash TEXT, cues TEXT)"
+        )
+
+    def get(self, acb_path):
+        row = self.conn.execute("SELECT acb_size, acb_mtime_ns, acb_hash, awb_size, awb_mtime_ns, awb_hash FROM pairs WHERE acb_path = ?", (str(acb_path),)).fetchone()
+        if row is None:
+            return None
+        acb_stat = (row[0], row[1])
+        awb_stat = (row[3], row[4]) if row[3] is not None else None
+        return acb_stat, awb_stat, (row[2], row[5])
+
+    def put(self, acb_path, acb_stat, awb_path, awb_stat, hashes, cues=None):
+        awb_stat = awb_stat or (None, None)
+        if cues is None:
+            # Content unchanged: keep the recorded cue list, refresh stat and hashes.
+            self.conn.execute(
+                "UPDATE pairs SET acb_size = ?, acb_mtime_ns = ?, acb_hash = ?, awb_size = ?, awb_mtime_ns = ?, awb_hash = ? WHERE acb_path = ?",
+                (*acb_stat, hashes[0], *awb_stat, hashes[1], str(acb_path)),
+            )
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(acb_path), *acb_stat, hashes[0], str(awb_path), *awb_stat, hashes[1], json.dumps(cues, ensure_ascii=False)),
+            )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def process_pair(acb_path, awb_path, out_root, mainkey, workers, known_hashes):
+    """Worker: hashes the pair and extracts it unless the content matches the manifest."""
+    hashes = (file_xxh3(acb_path), file_xxh3(awb_path))
+    if hashes == known_hashes:
+        return hashes, None
+    return hashes, extract_one(acb_path, out_root, mainkey, workers, progress=False)
+
+
+def run_batch(root, out_root, mainkey, jobs, workers, manifest_path):
+    out_root.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(manifest_path)
+
+    pending = []
+    skipped = 0
+    for acb_path in sorted(root.rglob("*.acb")):
+        awb_path = acb_path.with_suffix(".awb")
+        acb_stat, awb_stat = file_stat(acb_path), file_stat(awb_path)
+        known = manifest.get(acb_path)
+        if known is not None and known[:2] == (acb_stat, awb_stat):
+            skipped += 1
+            continue
+        pending.append((acb_path, awb_path, acb_stat, awb_stat, known[2] if known else None))
+
+    print(f"待处理 {len(pending)}，未变化跳过 {skipped}")
+    done = errors = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(process_pair, *item[:2], out_root, mainkey, workers, item[4]): item for item in pending}
+        bar = tqdm(as_completed(futures), total=len(futures), ncols=150)
+        for future in bar:
+            acb_path, awb_path, acb_stat, awb_stat, known_hashes = futures[future]
+            try:
+                hashes, stats = future.result()
+            except Exception as e:
+                errors += 1
+                tqdm.write(f"[E] {acb_path}: {e}")
+                continue
+            if hashes == known_hashes:
+                skipped += 1
+                manifest.put(acb_path, acb_stat, awb_path, awb_stat, hashes)
+                continue
+            done += 1
+            manifest.put(acb_path, acb_stat, awb_path, awb_stat, hashes, stats["cues"] if stats else [])
+            if stats:
+                bar.set_postfix_str(f"{acb_path.stem}: {stats['files']} files, {stats['mb_per_s']:.1f} MB/s, {stats['files_per_s']:.0f} files/s")
+    manifest.close()
+    print(f"完成：处理 {done}，跳过 {skipped}，失败 {errors}")
 
 
 if __name__ == "__main__":
@@ -41,6 +154,9 @@ if __name__ == "__main__":
     parser.add_argument("--in_dir", default=r"D:\Dataset_Game\jp.co.cygames.princessconnectredive\RAW\v")
     parser.add_argument("--out_dir", default=r"D:\Dataset_Game\jp.co.cygames.princessconnectredive\EXP\v")
     parser.add_argument("--mainkey", default=0x000000000030D9E8)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Processes extracting ACB/AWB pairs in parallel")
+    parser.add_argument("--workers", type=int, default=1, help="HCA decrypt/write threads per archive")
+    parser.add_argument("--manifest", default=None, help="SQLite manifest of finished pairs (default: <out_dir>/manifest.sqlite3)")
     args = parser.parse_args()
 
     root = Path(args.in_dir)
@@ -48,7 +164,4 @@ if __name__ == "__main__":
     if not root.exists():
         raise FileNotFoundError(f"输入目录不存在：{root}")
 
-    acb_files = list(root.rglob("*.acb"))
-
-    for acb_path in tqdm(acb_files, ncols=150):
-        extract_one(acb_path, out_root, args.mainkey)
+    run_batch(root, out_root, args.mainkey, args.jobs, args.workers, args.manifest or str(out_root / "manifest.sqlite3"))
@@ -1,4 +1,5 @@
 InMemoryLoading = True
+LazyLoading = False
 FastMode = True
 StrictMode = False
 JsonUseHexNumber = False
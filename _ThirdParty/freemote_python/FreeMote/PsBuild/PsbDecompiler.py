@@ -1,16 +1,18 @@
 import json
 import os
-from io import BytesIO
+from io import BytesIO, StringIO
 from typing import Any, Dict, List, Optional, Tuple
 
-from ..Consts import Context_ArchiveItemFileNames, Context_ArchiveSource, Context_BodyBinName, Context_CryptKey, Context_FileName, Context_MdfKey, Context_MdfKeyLength, Context_MdfMtKey, Context_PsbShellType, JsonArrayCollapse
+from .. import Consts
+from ..Consts import Context_ArchiveItemFileNames, Context_ArchiveSource, Context_BodyBinName, Context_CryptKey, Context_FileName, Context_MdfKey, Context_MdfKeyLength, Context_MdfMtKey, Context_PsbShellType
 from ..Logger import Logger
 from ..MPack import IsSignatureMPack as MPack_IsSig
 from ..Psb.Plugins.freemount import FreeMount
-from ..Psb.Psb import PSB
+from ..Psb.Psb import PSB, JsonDefault
 from ..Psb.PsbExtension import PsbExtension
 from ..PsbEnums import PsbExtractOption, PsbImageFormat, PsbType
 from ..PsbFile import PsbFile
+from .PsbJsonWriter import PsbJsonWriter
 from .PsbResourceJson import PsbResourceJson
 
 
@@ -24,9 +26,14 @@ class PsbDecompiler:
 
     @staticmethod
     def DecompileWithContext(path: str, context: Dict[str, object] | None = None, psbType: PsbType = PsbType.PSB) -> Tuple[str, PSB]:
+        psb = PsbDecompiler.LoadWithContext(path, context, psbType)
+        return PsbDecompiler.DecompilePsb(psb), psb
+
+    @staticmethod
+    def LoadWithContext(path: str, context: Dict[str, object] | None = None, psbType: PsbType = PsbType.PSB) -> PSB:
         with open(path, "rb") as fs:
             ctx = FreeMount.CreateContext(context)
-            t = None
+            t = PsbFile.GetSignatureShellType(fs)
             stream = fs
             ms = ctx.OpenFromShell(fs, t)
             if ms is not None:
@@ -52,13 +59,26 @@ class PsbDecompiler:
                     psb = PSB.DullahanLoad(stream)
         if psbType != PsbType.PSB:
             psb.Type = psbType
-        return PsbDecompiler.DecompilePsb(psb), psb
+        return psb
 
     @staticmethod
     def DecompilePsb(psb: PSB) -> str:
-        if JsonArrayCollapse:
-            return json.dumps(psb.Root, ensure_ascii=False)
-        return json.dumps(psb.Root, indent=2, ensure_ascii=False)
+        if Consts.JsonUseHexNumber:
+            out = StringIO()
+            PsbJsonWriter(out).Write(psb.Root)
+            return out.getvalue()
+        if Consts.JsonArrayCollapse:
+            return json.dumps(psb.Root, ensure_ascii=False, default=JsonDefault)
+        return json.dumps(psb.Root, indent=2, ensure_ascii=False, default=JsonDefault)
+
+    @staticmethod
+    def DecompilePsbToFile(psb: PSB, outputPath: str) -> None:
+        # -oom (not InMemoryLoading): stream the tree instead of building the whole document first
+        with open(outputPath, "w", encoding="utf-8") as f:
+            if Consts.InMemoryLoading:
+                f.write(PsbDecompiler.DecompilePsb(psb))
+            else:
+                PsbJsonWriter(f).Write(psb.Root)
 
     @staticmethod
     def OutputResources(psb: PSB, context, filePath: str, extractOption: PsbExtractOption = PsbExtractOption.Original, extractFormat: PsbImageFormat = PsbImageFormat.png, useResx: bool = True) -> None:
@@ -77,7 +97,7 @@ class PsbDecompiler:
         if useResx:
             resx.Resources = resDictionary
             resx.Context = context.Context
-            if JsonArrayCollapse:
+            if Consts.JsonArrayCollapse:
                 json_text = json.dumps(resx.__dict__, ensure_ascii=False)
             else:
                 json_text = json.dumps(resx.__dict__, indent=2, ensure_ascii=False)
@@ -105,8 +125,7 @@ class PsbDecompiler:
         context = FreeMount.CreateContext(additionalContext)
         if key is not None:
             context.Context[Context_CryptKey] = key
-        with open(outputPath, "w", encoding="utf-8") as f:
-            f.write(PsbDecompiler.DecompilePsb(psb))
+        PsbDecompiler.DecompilePsbToFile(psb, outputPath)
         PsbDecompiler.OutputResources(psb, context, outputPath, extractOption, extractFormat, useResx)
 
     @staticmethod
@@ -115,11 +134,10 @@ class PsbDecompiler:
         if key is not None:
             context.Context[Context_CryptKey] = key
         outputPath = PsbDecompiler._change_extension_for_output_json(inputPath, ".json")
-        json_text, psb = PsbDecompiler.DecompileWithContext(inputPath, context.Context)
+        psb = PsbDecompiler.LoadWithContext(inputPath, context.Context)
         if type != PsbType.PSB:
             psb.Type = type
-        with open(outputPath, "w", encoding="utf-8") as f:
-            f.write(json_text)
+        PsbDecompiler.DecompilePsbToFile(psb, outputPath)
         PsbDecompiler.OutputResources(psb, context, inputPath, extractOption, extractFormat, useResx)
         return outputPath, psb
 
@@ -152,10 +170,11 @@ class PsbDecompiler:
         PsbDecompiler.OutputResources(psb, FreeMount.CreateContext(), path, PsbExtractOption.Extract, format)
 
     @staticmethod
-    def ExtractArchive(filePath: str, key: str, context: Dict[str, object], bodyPath: Optional[str], outputRaw: bool, extractAll: bool, enableParallel: bool) -> None:
+    def ExtractArchive(filePath: str, key: str, context: Dict[str, object], bodyPath: Optional[str], outputRaw: bool, extractAll: bool, enableParallel: bool) -> bool:
+        """Returns False if the archive couldn't be read or extracted (the error is logged)."""
         if not os.path.exists(filePath):
             Logger.LogError(f"Cannot find input file: {filePath}")
-            return
+            return False
         fileName = os.path.basename(filePath)
         dir = os.path.dirname(filePath)
         archiveMdfKey = key + fileName
@@ -200,6 +219,7 @@ class PsbDecompiler:
             with open(filePath, "rb") as fs:
                 shellType = PsbFile.GetSignatureShellType(fs)
                 if shellType != "PSB":
+                    context[Context_MdfKey] = archiveMdfKey
                     try:
                         unpacked = PsbExtension.MdfConvert(fs, shellType, context)
                         psb = PSB(unpacked)
@@ -218,13 +238,12 @@ class PsbDecompiler:
                 else:
                     psb = PSB(fs)
             out_json = os.path.abspath(filePath) + ".json"
-            with open(out_json, "w", encoding="utf-8") as f:
-                f.write(PsbDecompiler.DecompilePsb(psb))
+            PsbDecompiler.DecompilePsbToFile(psb, out_json)
             resx = PsbResourceJson(psb, context)
             if not hasBody:
                 context[Context_ArchiveSource] = [name]
                 PsbDecompiler.OutputResources(psb, FreeMount.CreateContext(context), os.path.abspath(filePath), PsbExtractOption.Extract)
-                return
+                return True
             resx.PsbType = PsbType.ArchiveInfo
             extractDir = os.path.join(dir, name)
             if os.path.isfile(extractDir):
@@ -244,6 +263,8 @@ class PsbDecompiler:
                 f.write(resx.SerializeToJson())
         except Exception as e:
             Logger.LogError(e)
+            return False
+        return True
 
     @staticmethod
     def MtUnpack(filePath: str, outputPath: str, key: str, keyLength: int, fileKey: str = "", suffix: str = "") -> None:
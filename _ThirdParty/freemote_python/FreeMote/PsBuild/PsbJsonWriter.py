@@ -0,0 +1,122 @@
+from collections.abc import Mapping
+from json.encoder import encode_basestring
+from typing import Any, TextIO
+
+from .. import Consts
+from ..Psb.Psb import PsbDict, PsbList
+
+_INFINITY = float("inf")
+
+
+class PsbJsonWriter:
+    """Incremental JSON writer for PSB trees (eager or lazy).
+
+    Writes to `stream` in chunks of about `BufferSize` characters. Output matches
+    `json.dumps(root, ensure_ascii=False)` (collapsed) or `indent=2`. Lazy collections are
+    walked without caching their children, so memory stays bounded by the tree depth."""
+
+    BufferSize = 1 << 16
+
+    def __init__(self, stream: TextIO, collapse: bool | None = None, hexNumber: bool | None = None) -> None:
+        self.Stream = stream
+        self.Collapse = Consts.JsonArrayCollapse if collapse is None else collapse
+        self.HexNumber = Consts.JsonUseHexNumber if hexNumber is None else hexNumber
+        self._parts: list[str] = []
+        self._size = 0
+
+    def Write(self, root: Any) -> None:
+        self._value(root, 0)
+        self._flush()
+
+    def _emit(self, s: str) -> None:
+        self._parts.append(s)
+        self._size += len(s)
+        if self._size >= self.BufferSize:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._parts:
+            self.Stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+    def _number(self, value: int) -> str:
+        if not self.HexNumber:
+            return int.__repr__(value)
+        if -0x80000000 <= value <= 0xFFFFFFFF:
+            return encode_basestring(f"{Consts.NumberStringPrefix}{value & 0xFFFFFFFF:08X}")
+        return encode_basestring(f"{Consts.NumberStringPrefix}{value & 0xFFFFFFFFFFFFFFFF:016X}")
+
+    @staticmethod
+    def _float(value: float) -> str:
+        # same spelling as json's floatstr (allow_nan=True)
+        if value != value:
+            return "NaN"
+        if value == _INFINITY:
+            return "Infinity"
+        if value == -_INFINITY:
+            return "-Infinity"
+        return float.__repr__(value)
+
+    def _value(self, value: Any, level: int) -> None:
+        if isinstance(value, str):
+            self._emit(encode_basestring(value))
+        elif value is None:
+            self._emit("null")
+        elif value is True:
+            self._emit("true")
+        elif value is False:
+            self._emit("false")
+        elif isinstance(value, int):
+            self._emit(self._number(value))
+        elif isinstance(value, float):
+            self._emit(self._float(value))
+        elif isinstance(value, Mapping):
+            self._object(value, level)
+        elif isinstance(value, (list, tuple, PsbList)):
+            self._array(value, level)
+        else:
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def _array(self, value: Any, level: int) -> None:
+        if not len(value):
+            self._emit("[]")
+            return
+        items = value.iter_uncached() if isinstance(value, PsbList) else value
+        if self.Collapse:
+            separator, close = ", ", "]"
+            self._emit("[")
+        else:
+            separator = ",\n" + "  " * (level + 1)
+            close = "\n" + "  " * level + "]"
+            self._emit("[" + separator[1:])
+        first = True
+        for item in items:
+            if first:
+                first = False
+            else:
+                self._emit(separator)
+            self._value(item, level + 1)
+        self._emit(close)
+
+    def _object(self, value: Mapping, level: int) -> None:
+        if not len(value):
+            self._emit("{}")
+            return
+        items = value.iter_uncached() if isinstance(value, PsbDict) else value.items()
+        if self.Collapse:
+            separator, close = ", ", "}"
+            self._emit("{")
+        else:
+            separator = ",\n" + "  " * (level + 1)
+            close = "\n" + "  " * level + "}"
+            self._emit("{" + separator[1:])
+        first = True
+        for key, item in items:
+            if first:
+                first = False
+            else:
+                self._emit(separator)
+            self._emit(encode_basestring(key) + ": ")
+            self._value(item, level + 1)
+        self._emit(close)
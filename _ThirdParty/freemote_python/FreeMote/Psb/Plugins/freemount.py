@@ -1,6 +1,8 @@
 from io import BytesIO
 from typing import Any, Dict
 
+from ..PsbExtension import PsbExtension
+
 
 class FreeMountContext:
     def __init__(self, context: Dict[str, Any] | None = None) -> None:
@@ -8,7 +10,10 @@ class FreeMountContext:
         self.ImageFormat = None
 
     def OpenFromShell(self, stream, type_ref) -> BytesIO | None:
-        return None
+        # plain PSB (or unknown data) is read as is
+        if type_ref in (None, "PSB"):
+            return None
+        return PsbExtension.MdfConvert(stream, type_ref, self.Context)
 
 
 class FreeMount:
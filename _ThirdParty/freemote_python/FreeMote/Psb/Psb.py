@@ -1,6 +1,10 @@
+import mmap
 import struct
+from collections.abc import Mapping, Sequence
 from typing import Any, Dict, List
 
+from .. import Consts
+
 
 class _Header:
     def __init__(self) -> None:
@@ -57,6 +61,40 @@ def _read_psb_array(r: _Reader, n: int) -> List[int]:
     return res
 
 
+def _map_file(f: Any) -> mmap.mmap | None:
+    # not InMemoryLoading: map real files instead of reading them (None for in-memory streams)
+    try:
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        return None
+    pos = f.tell()
+    if pos:
+        # the PSB starts at the stream's position
+        data = m[pos:]
+        m.close()
+        return data
+    return m
+
+
+def _decode_names(charset: List[int], names_data: List[int], name_indexes: List[int]) -> List[str]:
+    # names share trie prefixes, so decode every trie node once and reuse it for all names below it
+    prefixes: Dict[int, bytes] = {0: b""}
+
+    def prefix(node: int) -> bytes:
+        chain: List[int] = []
+        while node not in prefixes:
+            chain.append(node)
+            node = names_data[node]
+        value = prefixes[node]
+        for cur in reversed(chain):
+            code = names_data[cur]
+            value += bytes([(cur - charset[code]) & 0xFF])
+            prefixes[cur] = value
+        return value
+
+    return [prefix(names_data[idx]).decode("utf-8", errors="ignore") for idx in name_indexes]
+
+
 def _read_number(r: _Reader, t: int) -> Any:
     if t == 0x04:
         return 0
@@ -77,6 +115,116 @@ def _read_number(r: _Reader, t: int) -> Any:
     return 0
 
 
+_UNSET = object()
+
+
+class PsbList(Sequence):
+    """Lazy PSB list (0x20): children are decoded from their offsets on first access."""
+
+    __slots__ = ("_psb", "_pos", "_offsets", "_items")
+
+    def __init__(self, psb: "PSB", pos: int, offsets: List[int]) -> None:
+        self._psb = psb
+        self._pos = pos
+        self._offsets = offsets
+        self._items: List[Any] = [_UNSET] * len(offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._offsets)))]
+        value = self._items[index]
+        if value is _UNSET:
+            value = self._psb._unpack_at(self._pos + self._offsets[index])
+            self._items[index] = value
+        return value
+
+    def iter_uncached(self):
+        """Yields children without keeping newly decoded ones, so a full walk stays bounded in memory."""
+        for i, value in enumerate(self._items):
+            yield self._psb._unpack_at(self._pos + self._offsets[i]) if value is _UNSET else value
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, PsbList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PsbList({len(self._offsets)})"
+
+
+class PsbDict(Mapping):
+    """Lazy PSB object (0x21): keys are known up front, values are decoded on first access."""
+
+    __slots__ = ("_psb", "_pos", "_offsets", "_index", "_values")
+
+    def __init__(self, psb: "PSB", pos: int, names_idx: List[int], offsets: List[int]) -> None:
+        self._psb = psb
+        self._pos = pos
+        self._offsets = offsets
+        names = psb.Names
+        # same key order and duplicate handling as building a dict: first position, last value
+        self._index: Dict[str, int] = {}
+        for i in range(len(offsets)):
+            self._index[names[names_idx[i]] if i < len(names_idx) else str(i)] = i
+        self._values: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._index
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self._psb._unpack_at(self._pos + self._offsets[self._index[key]])
+        self._values[key] = value
+        return value
+
+    def iter_uncached(self):
+        """Yields (key, value) pairs without keeping newly decoded values."""
+        values = self._values
+        for key, i in self._index.items():
+            if key in values:
+                yield key, values[key]
+            else:
+                yield key, self._psb._unpack_at(self._pos + self._offsets[i])
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (dict, PsbDict)):
+            return len(self) == len(other) and all(k in other and self[k] == other[k] for k in self)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PsbDict({list(self._index)})"
+
+
+def ToBuiltin(value: Any) -> Any:
+    """Fully decodes lazy collections into plain dicts/lists (for callers that need real ones)."""
+    if isinstance(value, PsbDict):
+        return {k: ToBuiltin(v) for k, v in value.items()}
+    if isinstance(value, PsbList):
+        return [ToBuiltin(v) for v in value]
+    return value
+
+
+def JsonDefault(value: Any) -> Any:
+    """`json.dumps(default=...)` hook: expands one lazy level at a time."""
+    if isinstance(value, PsbDict):
+        return dict(value.items())
+    if isinstance(value, PsbList):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class TypeHandler:
     def OutputResources(self, psb: "PSB", context: Any, name: str, dir_path: str, extract_option: Any) -> Dict[str, str]:
         return {}
@@ -86,7 +234,9 @@ class TypeHandler:
 
 
 class PSB:
-    def __init__(self, path_or_stream: Any = None, *args, **kwargs) -> None:
+    def __init__(self, path_or_stream: Any = None, *args, lazy: bool | None = None, **kwargs) -> None:
+        # lazy: Root/Objects are PsbDict/PsbList proxies decoded on access (default Consts.LazyLoading)
+        self.Lazy = Consts.LazyLoading if lazy is None else lazy
         self.Type = None
         self.Root = {}
         self.Objects = {}
@@ -98,9 +248,13 @@ class PSB:
         if isinstance(path_or_stream, (str, bytes)) or hasattr(path_or_stream, "read"):
             if isinstance(path_or_stream, str):
                 with open(path_or_stream, "rb") as f:
-                    data = f.read()
+                    data = None if Consts.InMemoryLoading else _map_file(f)
+                    if data is None:
+                        data = f.read()
             elif hasattr(path_or_stream, "read"):
-                data = path_or_stream.read()
+                data = None if Consts.InMemoryLoading else _map_file(path_or_stream)
+                if data is None:
+                    data = path_or_stream.read()
             else:
                 data = path_or_stream
             self._load_from_bytes(data)
@@ -137,33 +291,35 @@ class PSB:
         names_data = _read_psb_array(r, n2_type - 0x0D + 1)
         n3_type = r.read(1)[0]
         name_indexes = _read_psb_array(r, n3_type - 0x0D + 1)
-        names: List[str] = []
-        for idx in name_indexes:
-            cur = names_data[idx]
-            buf: List[int] = []
-            while cur != 0:
-                code = names_data[cur]
-                d = charset[code]
-                real_chr = cur - d
-                cur = code
-                buf.append(real_chr & 0xFF)
-            buf.reverse()
-            names.append(bytes(buf).decode("utf-8", errors="ignore"))
-        self.Names = names
+        self.Names = _decode_names(charset, names_data, name_indexes)
+        self._strings: List[str | None] = [None] * len(self._string_offsets)
+        self._r = r
         r.seek(self.Header.OffsetEntries)
         self.Root = self._unpack(r)
-        if isinstance(self.Root, dict):
+        if isinstance(self.Root, (dict, PsbDict)):
             self.Objects = self.Root
+        if not self.Lazy:
+            # nothing refers back into the buffer
+            self._r = None
+
+    def _unpack_at(self, pos: int) -> Any:
+        r = self._r
+        r.seek(pos)
+        return self._unpack(r)
 
     def _read_string_by_index(self, idx: int, r: _Reader) -> str:
         if idx < 0 or idx >= len(self._string_offsets):
             return ""
-        start = self.Header.OffsetStringsData + self._string_offsets[idx]
-        end = start
-        data = r.data
-        while end < len(data) and data[end] != 0:
-            end += 1
-        return data[start:end].decode("utf-8", errors="ignore")
+        s = self._strings[idx]
+        if s is None:
+            start = self.Header.OffsetStringsData + self._string_offsets[idx]
+            data = r.data
+            end = data.find(b"\x00", start)
+            if end < 0:
+                end = len(data)
+            s = data[start:end].decode("utf-8", errors="ignore")
+            self._strings[idx] = s
+        return s
 
     def _unpack(self, r: _Reader) -> Any:
         t = r.read(1)[0]
@@ -193,6 +349,8 @@ class PSB:
             n = n_type - 0x0D + 1
             offsets = _read_psb_array(r, n)
             pos = r.p
+            if self.Lazy:
+                return PsbList(self, pos, offsets)
             res_list: List[Any] = []
             for off in offsets:
                 r.seek(pos + off)
@@ -207,6 +365,8 @@ class PSB:
             n2 = n_off_type - 0x0D + 1
             offsets = _read_psb_array(r, n2)
             pos = r.p
+            if self.Lazy:
+                return PsbDict(self, pos, names_idx, offsets)
             d: Dict[str, Any] = {}
             for i, off in enumerate(offsets):
                 r.seek(pos + off)
@@ -1,5 +1,18 @@
+import hashlib
+import struct
+import zlib
+from functools import lru_cache
+from io import BytesIO
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
+from ..Consts import Context_MdfKey, Context_MdfKeyLength
+
+# shell body is read/decoded in chunks of this size
+MDF_CHUNK_SIZE = 1 << 20
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 
 def ArchiveInfo_GetPackageNameFromBodyBin(file_name: str) -> str:
     if not file_name:
@@ -34,7 +47,118 @@ def get_root_key(t: Any) -> str | None:
     return None
 
 
+def _init_by_array(seeds) -> np.ndarray:
+    """MT19937 state after init_by_array(seeds), as in the reference mt19937ar.c."""
+    mt = [0] * 624
+    mt[0] = 19650218
+    for i in range(1, 624):
+        mt[i] = (1812433253 * (mt[i - 1] ^ (mt[i - 1] >> 30)) + i) & 0xFFFFFFFF
+    key = [int(s) for s in seeds]
+    i, j = 1, 0
+    for _ in range(max(624, len(key))):
+        mt[i] = ((mt[i] ^ ((mt[i - 1] ^ (mt[i - 1] >> 30)) * 1664525)) + key[j] + j) & 0xFFFFFFFF
+        i, j = i + 1, j + 1
+        if i >= 624:
+            mt[0], i = mt[623], 1
+        if j >= len(key):
+            j = 0
+    for _ in range(623):
+        mt[i] = ((mt[i] ^ ((mt[i - 1] ^ (mt[i - 1] >> 30)) * 1566083941)) - i) & 0xFFFFFFFF
+        i += 1
+        if i >= 624:
+            mt[0], i = mt[623], 1
+    mt[0] = 0x80000000
+    return np.array(mt, dtype=np.uint32)
+
+
+class _MdfKeystream:
+    """MT19937 seeded (init_by_array) with the key's MD5 as 4 LE uint32, outputs taken as LE bytes.
+
+    Bytes are generated on demand; the generator state carries over between take() calls."""
+
+    def __init__(self, key: str):
+        seeds = np.frombuffer(hashlib.md5(key.encode("utf-8")).digest(), dtype="<u4")
+        self.mt = np.random.MT19937()
+        self.mt.state = {"bit_generator": "MT19937", "state": {"key": _init_by_array(seeds), "pos": 624}}
+        self.pending = np.empty(0, dtype=np.uint8)
+
+    def take(self, length: int) -> np.ndarray:
+        need = length - len(self.pending)
+        if need > 0:
+            words = self.mt.random_raw((need + 3) // 4).astype("<u4")
+            self.pending = np.concatenate((self.pending, words.view(np.uint8)))
+        out, self.pending = self.pending[:length], self.pending[length:]
+        return out
+
+
+@lru_cache(maxsize=64)
+def _mdf_keystream(key: str, length: int) -> np.ndarray:
+    # only for Context_MdfKeyLength: the short keystream that repeats over the body
+    keystream = _MdfKeystream(key).take(length).copy()
+    keystream.setflags(write=False)
+    return keystream
+
+
+def MdfKeystream(key: str, length: int) -> bytes:
+    return _MdfKeystream(key).take(length).tobytes()
+
+
+def _xor_chunk(chunk: bytes, keystream: np.ndarray, pos: int) -> bytes:
+    # the keystream repeats every len(keystream) bytes: rotate it to pos, then tile it over the chunk
+    offset = pos % len(keystream)
+    pad = np.resize(np.concatenate((keystream[offset:], keystream[:offset])), len(chunk))
+    return np.bitwise_xor(np.frombuffer(chunk, dtype=np.uint8), pad).tobytes()
+
+
+def _new_decompressor(head: bytes):
+    if head.startswith(_ZSTD_MAGIC):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+    if head[:1] == b"\x78":
+        return zlib.decompressobj()
+    raise ValueError("InvalidData")
+
+
 class PsbExtension:
     @staticmethod
-    def MdfConvert(stream: Any, shell_type: str, context: Dict[str, Any]):
-        raise ValueError("InvalidData")
+    def MdfConvert(stream: Any, shell_type: str, context: Dict[str, Any]) -> BytesIO:
+        """Opens an mdf/mfl/mzs shell: 4-byte signature + u32 size + (keyed) zlib/zstd body.
+
+        With Context_MdfKey the body is XORed with an MT19937 keystream that repeats every
+        Context_MdfKeyLength bytes (never repeats when unset, then it is generated chunk by chunk).
+        The body is decoded in MDF_CHUNK_SIZE chunks; compression is detected from the decoded stream header."""
+        header = stream.read(8)
+        if len(header) < 8 or header[3] != 0 or shell_type not in ("MDF", "MFL", "MZS", "MXB"):
+            raise ValueError("InvalidData")
+        size = struct.unpack_from("<I", header, 4)[0]
+
+        key = context.get(Context_MdfKey)
+        repeating = keystream = None
+        if key:
+            key_length = context.get(Context_MdfKeyLength)
+            if key_length:
+                repeating = _mdf_keystream(str(key), int(key_length))
+            else:
+                keystream = _MdfKeystream(str(key))
+
+        out = BytesIO()
+        decompressor = None
+        pos = 0
+        while chunk := stream.read(MDF_CHUNK_SIZE):
+            if repeating is not None:
+                chunk = _xor_chunk(chunk, repeating, pos)
+            elif keystream is not None:
+                chunk = np.bitwise_xor(np.frombuffer(chunk, dtype=np.uint8), keystream.take(len(chunk))).tobytes()
+            pos += len(chunk)
+            if decompressor is None:
+                decompressor = _new_decompressor(chunk)
+            out.write(decompressor.decompress(chunk))
+        if decompressor is None:
+            raise ValueError("InvalidData")
+        if hasattr(decompressor, "flush"):
+            out.write(decompressor.flush())
+        if out.tell() != size or bytes(out.getbuffer()[:4]) != b"PSB\x00":
+            raise ValueError("InvalidData")
+        out.seek(0)
+        return out
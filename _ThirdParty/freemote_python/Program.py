@@ -1,6 +1,8 @@
 import argparse
 import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import FreeMote.Consts as Consts
@@ -25,13 +27,86 @@ def decompile(path: str, keepRaw: bool, format: PsbImageFormat, key: int | None,
         pass
     name = os.path.splitext(os.path.basename(path))[0]
     print(f"Decompiling: {name}")
-    try:
-        if keepRaw:
-            PsbDecompiler.DecompileToFile(path, key=key, type=type_value)
+    if keepRaw:
+        PsbDecompiler.DecompileToFile(path, key=key, type=type_value)
+    else:
+        PsbDecompiler.DecompileToFile(path, PsbExtractOption.Extract, format, key=key, type=type_value, contextDic=dict(context) if context else context)
+
+
+# settings main() changes at runtime; re-applied in pool workers (spawned processes don't inherit them)
+_WORKER_CONSTS = ["InMemoryLoading", "LazyLoading", "JsonArrayCollapse", "JsonUseHexNumber", "FlattenArrayByDefault"]
+
+
+def _init_worker(consts: dict, encoding: str) -> None:
+    for name, value in consts.items():
+        setattr(Consts, name, value)
+    PsbDecompiler.Encoding = encoding
+
+
+def collect_files(paths: list[str], exts: list[str]) -> list[str]:
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+        elif os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for fn in names:
+                    if any(fn.endswith(ext) for ext in exts):
+                        files.append(os.path.join(root, fn))
         else:
-            PsbDecompiler.DecompileToFile(path, PsbExtractOption.Extract, format, key=key, type=type_value, contextDic=context)
-    except Exception as e:
-        print(e)
+            print(f"Input path not found: {path}")
+    return files
+
+
+def run_files(func, files: list[str], args: tuple, enableParallel: bool, maxInflight: int | None = None) -> None:
+    """Runs func(file, *args) for every file, on a process pool unless enableParallel is off.
+
+    Failures are reported per file; a throughput/error summary is printed at the end."""
+    start = time.perf_counter()
+    ok = 0
+    errors = 0
+    if not enableParallel or len(files) <= 1:
+        for path in files:
+            try:
+                func(path, *args)
+                ok += 1
+            except Exception as e:
+                errors += 1
+                print(e)
+    else:
+        jobs = os.cpu_count() or 1
+        maxInflight = maxInflight or jobs * 4
+        consts = {name: getattr(Consts, name) for name in _WORKER_CONSTS}
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(consts, PsbDecompiler.Encoding)) as pool:
+            pending = {}
+            queue = iter(files)
+            while True:
+                # keep at most maxInflight files queued in the pool
+                for path in queue:
+                    pending[pool.submit(func, path, *args)] = path
+                    if len(pending) >= maxInflight:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        future.result()
+                        ok += 1
+                    except Exception as e:
+                        errors += 1
+                        print(f"{path}: {e}")
+    seconds = time.perf_counter() - start
+    rate = len(files) / seconds if seconds else 0.0
+    print(f"{len(files)} files in {seconds:.1f}s ({rate:.1f} files/s): {ok} ok, {errors} failed.")
+
+
+def extract_archive(path: str, key: str, context: dict, bodyPath: str | None, outputRaw: bool, extractAll: bool) -> None:
+    # ExtractArchive writes the file's mdf key into the context, keep files independent
+    if not PsbDecompiler.ExtractArchive(path, key, dict(context), bodyPath, outputRaw, extractAll, False):
+        # ExtractArchive logs and swallows its errors; raise so run_files counts the file as failed
+        raise RuntimeError(f"Failed to extract {path}")
 
 
 def main(argv: list[str]) -> None:
@@ -55,21 +130,8 @@ def main(argv: list[str]) -> None:
             image_parser.add_argument("-1by1", "--enumerate", dest="no_parallel", action="store_true")
             args = image_parser.parse_args(argv[1:])
             enableParallel = not args.no_parallel
-            for psbPath in args.Path:
-                if os.path.isfile(psbPath):
-                    try:
-                        PsbDecompiler.ExtractImageFiles(psbPath)
-                    except Exception as e:
-                        print(e)
-                elif os.path.isdir(psbPath):
-                    for root, _, files in os.walk(psbPath):
-                        for fn in files:
-                            if any(fn.endswith(ext) for ext in [".psb", ".pimg", ".m", ".bytes"]):
-                                s = os.path.join(root, fn)
-                                try:
-                                    PsbDecompiler.ExtractImageFiles(s)
-                                except Exception as e:
-                                    print(e)
+            files = collect_files(args.Path, [".psb", ".pimg", ".m", ".bytes"])
+            run_files(PsbDecompiler.ExtractImageFiles, files, (), enableParallel)
             print("Done.")
             return
         if argv[0] == "unlink":
@@ -133,8 +195,7 @@ def main(argv: list[str]) -> None:
             context = {}
             if keyLen >= 0:
                 context[Consts.Context_MdfKeyLength] = int(keyLen)
-            for s in args.PSB:
-                PsbDecompiler.ExtractArchive(s, key, context, bodyPath, outputRaw, extractAll, enableParallel)
+            run_files(extract_archive, args.PSB, (key, context, bodyPath, outputRaw, extractAll), enableParallel)
             print("Done.")
             return
     parser = argparse.ArgumentParser(add_help=True)
@@ -150,6 +211,7 @@ def main(argv: list[str]) -> None:
     parser.add_argument("-e", "--encoding", dest="encoding", type=str)
     parser.add_argument("-t", "--type", dest="type_value", type=str)
     parser.add_argument("-dci", "--disable-combined-image", dest="disable_combined_image", action="store_true")
+    parser.add_argument("-1by1", "--enumerate", dest="no_parallel", action="store_true")
     args = parser.parse_args(argv)
 
     if args.encoding:
@@ -158,7 +220,9 @@ def main(argv: list[str]) -> None:
         except Exception:
             print(f"[WARN] Encoding {args.encoding} is not valid.")
     if args.oom:
-        pass
+        # map inputs, load lazily and stream the json out instead of holding whole documents
+        Consts.InMemoryLoading = False
+        Consts.LazyLoading = True
     if args.json_array_indent:
         Consts.JsonArrayCollapse = False
     if args.json_hex:
@@ -180,14 +244,8 @@ def main(argv: list[str]) -> None:
             t = PsbType[args.type_value]
         except Exception:
             t = PsbType.PSB
-    for s in args.Files:
-        if os.path.isfile(s):
-            decompile(s, useRaw, PsbImageFormat.png, key, t, context)
-        elif os.path.isdir(s):
-            for root, _, files in os.walk(s):
-                for fn in files:
-                    if any(fn.endswith(ext) for ext in [".psb", ".mmo", ".pimg", ".scn", ".dpak", ".psz", ".psp", ".bytes", ".m"]):
-                        decompile(os.path.join(root, fn), useRaw, PsbImageFormat.png, key, t, context)
+    files = collect_files(args.Files, [".psb", ".mmo", ".pimg", ".scn", ".dpak", ".psz", ".psp", ".bytes", ".m"])
+    run_files(decompile, files, (useRaw, PsbImageFormat.png, key, t, context), not args.no_parallel)
     print("Done.")
 
 
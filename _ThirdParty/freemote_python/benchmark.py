@@ -0,0 +1,171 @@
+import argparse
+import gc
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from FreeMote.Psb.Psb import PSB, ToBuiltin
+from FreeMote.PsBuild.PsbDecompiler import PsbDecompiler
+
+
+def _uint_size(v):
+    return max(1, (v.bit_length() + 7) // 8)
+
+
+def _array(values):
+    count_size = _uint_size(len(values))
+    entry_size = _uint_size(max(values, default=0))
+    out = bytes([0x0D + count_size - 1]) + len(values).to_bytes(count_size, "little") + bytes([0x0C + entry_size])
+    return out + b"".join(v.to_bytes(entry_size, "little") for v in values)
+
+
+class PsbBuilder:
+    """Minimal PSB v3 writer (names trie, string table, object tree) for synthetic benchmark input."""
+
+    def __init__(self):
+        self.names = {}
+        self.strings = {}
+
+    def _name(self, key):
+        return self.names.setdefault(key, len(self.names))
+
+    def _string(self, s):
+        return self.strings.setdefault(s, len(self.strings))
+
+    def _value(self, v):
+        if v is None:
+            return b"\x00"
+        if v is True or v is False:
+            return b"\x03" if v else b"\x02"
+        if isinstance(v, int):
+            if v == 0:
+                return b"\x04"
+            n = (v.bit_length() + 8) // 8
+            return bytes([0x04 + n]) + v.to_bytes(n, "little", signed=True)
+        if isinstance(v, float):
+            return b"\x1f" + struct.pack("<d", v)
+        if isinstance(v, str):
+            idx = self._string(v)
+            n = _uint_size(idx)
+            return bytes([0x15 + n - 1]) + idx.to_bytes(n, "little")
+        if isinstance(v, list):
+            children = [self._value(c) for c in v]
+            return b"\x20" + self._body(children)
+        if isinstance(v, dict):
+            names_idx = [self._name(k) for k in v]
+            children = [self._value(c) for c in v.values()]
+            return b"\x21" + _array(names_idx) + self._body(children)
+        raise TypeError(type(v))
+
+    @staticmethod
+    def _body(children):
+        offsets = []
+        pos = 0
+        for child in children:
+            offsets.append(pos)
+            pos += len(child)
+        return _array(offsets) + b"".join(children)
+
+    def _names_section(self):
+        # trie: node = base[parent] + byte, names_data[node] = parent, charset[parent] = base[parent]
+        charset = [0]
+        names_data = [0]
+        bases = {}
+        children = {}
+        name_indexes = []
+
+        def alloc(parent):
+            if parent not in bases:
+                bases[parent] = len(names_data)
+                names_data.extend([0] * 256)
+                charset.extend([0] * 256)
+                charset[parent] = bases[parent]
+            return bases[parent]
+
+        for key in self.names:
+            node = 0
+            for byte in key.encode("utf-8") + b"\x00":
+                if (node, byte) not in children:
+                    child = alloc(node) + byte
+                    names_data[child] = node
+                    children[(node, byte)] = child
+                node = children[(node, byte)]
+            name_indexes.append(node)
+        return _array(charset) + _array(names_data) + _array(name_indexes)
+
+    def build(self, root):
+        entries = self._value(root)
+        names = self._names_section()
+        data = bytearray()
+        offsets = []
+        for s in self.strings:
+            offsets.append(len(data))
+            data += s.encode("utf-8") + b"\x00"
+
+        off_names = 48
+        off_strings = off_names + len(names)
+        string_offsets = _array(offsets)
+        off_strings_data = off_strings + len(string_offsets)
+        off_entries = off_strings_data + len(data)
+        end = off_entries + len(entries)
+        header = b"PSB\x00" + struct.pack("<I", 3)
+        header += struct.pack("<10I", off_names, 0, off_strings, off_strings_data, end, end, end, off_entries, 0, 0)
+        return header + names + string_offsets + bytes(data) + entries
+
+
+def build_scene(num_scenes, lines_per_scene):
+    """krkr .scn-like tree: scenes with labels and text lines [speaker, display name, text, voice params]."""
+    scenes = []
+    for i in range(num_scenes):
+        texts = []
+        for j in range(lines_per_scene):
+            texts.append([f"chara{j % 7}", None, f"scene {i} line {j}: " + "テキスト" * (j % 5 + 1), [{"voice": f"v_{i:04d}_{j:03d}", "volume": 1.0, "pan": j % 3 - 1}]])
+        scenes.append({"label": f"*scene{i}", "title": f"Scene {i}", "texts": texts, "lines": list(range(lines_per_scene)), "fixed": i % 2 == 0})
+    return {"hash": "0" * 32, "name": "bench.scn", "scenes": scenes, "version": 1.1}
+
+
+def measure(data, lazy):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    psb = PSB(data, lazy=lazy)
+    load = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # typical partial access: one scene's lines
+    start = time.perf_counter()
+    scenes = psb.Root.get("scenes")
+    if scenes:
+        _ = [t[2] for t in scenes[len(scenes) // 2]["texts"]]
+    touch = time.perf_counter() - start
+    return psb, load, touch, current, peak
+
+
+def bench(name, data):
+    print(f"{name}: {len(data) / 1048576:.1f} MB")
+    eager, load, touch, current, peak = measure(data, lazy=False)
+    print(f"   eager: load {load:.3f}s, touch {touch * 1000:.2f}ms, retained {current / 1048576:.1f} MB, peak {peak / 1048576:.1f} MB")
+    lazy, load_l, touch_l, current_l, peak_l = measure(data, lazy=True)
+    print(f"    lazy: load {load_l:.3f}s, touch {touch_l * 1000:.2f}ms, retained {current_l / 1048576:.1f} MB, peak {peak_l / 1048576:.1f} MB")
+    print(f"   load x{load / load_l:.1f}, retained memory x{current / max(current_l, 1):.1f}")
+    if ToBuiltin(lazy.Root) != eager.Root or PsbDecompiler.DecompilePsb(lazy) != PsbDecompiler.DecompilePsb(eager):
+        raise AssertionError(f"lazy tree differs from eager tree for {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("psb", nargs="*", help="Real (unencrypted) PSB files; synthetic scene otherwise")
+    parser.add_argument("--scenes", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.psb:
+        for path in args.psb:
+            with open(path, "rb") as f:
+                bench(os.path.basename(path), f.read())
+    else:
+        bench("synthetic scn", PsbBuilder().build(build_scene(args.scenes, args.lines)))
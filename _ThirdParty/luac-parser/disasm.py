@@ -1,23 +1,37 @@
 import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 from disasm import Disassembler, LuaParseError, parse_lua_bytecode
 
+FORMATS = {"txt": ("txt",), "json": ("json",), "both": ("txt", "json")}
 
-def decompile_file(path: Path) -> None:
+
+def decompile_file(path: Path, formats: tuple[str, ...] = FORMATS["both"]) -> None:
     data = path.read_bytes()
     bytecode = parse_lua_bytecode(data)
     disassembler = Disassembler(bytecode.header.version)
 
-    text_output = disassembler.disassemble_to_txt(bytecode)
-    json_output = disassembler.disassemble_to_json(bytecode)
+    if "txt" in formats:
+        with open(path.with_name(path.name + ".dis.txt"), "w", encoding="utf-8") as f:
+            disassembler.write_txt(bytecode, f)
+    if "json" in formats:
+        with open(path.with_name(path.name + ".dis.json"), "w", encoding="utf-8") as f:
+            disassembler.write_json(bytecode, f)
 
-    text_path = path.with_name(path.name + ".dis.txt")
-    json_path = path.with_name(path.name + ".dis.json")
 
-    text_path.write_text(text_output, encoding="utf-8")
-    json_path.write_text(json_output, encoding="utf-8")
+def try_decompile_file(path: Path, formats: tuple[str, ...]) -> Optional[str]:
+    """Returns a warning line instead of raising, so one bad file doesn't take down a pool worker's batch."""
+    try:
+        decompile_file(path, formats)
+    except LuaParseError as exc:
+        return f"[warn] failed to parse {path}: {exc}"
+    except OSError as exc:
+        return f"[warn] failed to write outputs for {path}: {exc}"
+    return None
 
 
 def iter_luac_files(folder: Path):
@@ -29,6 +43,8 @@ def iter_luac_files(folder: Path):
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("folder", type=Path, help="Input folder containing .luac files")
+    parser.add_argument("--format", choices=FORMATS, default="both", help="Which disassembly outputs to write")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (0 = one per CPU)")
     args = parser.parse_args(argv)
 
     if not args.folder.exists():
@@ -36,15 +52,23 @@ def main(argv: list[str] | None = None) -> int:
     if not args.folder.is_dir():
         parser.error(f"'{args.folder}' is not a directory")
 
+    formats = FORMATS[args.format]
+    files = list(iter_luac_files(args.folder))
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(files) // (jobs * 8))
+            results = list(pool.map(try_decompile_file, files, [formats] * len(files), chunksize=chunksize))
+    else:
+        results = [try_decompile_file(path, formats) for path in files]
+
     processed = 0
-    for luac_path in iter_luac_files(args.folder):
-        try:
-            decompile_file(luac_path)
+    for warning in results:
+        if warning is None:
             processed += 1
-        except LuaParseError as exc:
-            print(f"[warn] failed to parse {luac_path}: {exc}", file=sys.stderr)
-        except OSError as exc:
-            print(f"[warn] failed to write outputs for {luac_path}: {exc}", file=sys.stderr)
+        else:
+            print(warning, file=sys.stderr)
 
     if processed == 0:
         print("No .luac files found.", file=sys.stderr)
@@ -55,4 +79,4 @@ def main(argv: list[str] | None = None) -> int:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
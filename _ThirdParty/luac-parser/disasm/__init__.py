@@ -17,6 +17,7 @@ from .core import (
     parse_lua_bytecode,
 )
 from .disassembler import Disassembler
+from .ir import InstructionColumns, chunk_columns, decode_instructions
 
 __all__ = [
     "LUA51",
@@ -36,4 +37,7 @@ __all__ = [
     "UpValue",
     "parse_lua_bytecode",
     "Disassembler",
+    "InstructionColumns",
+    "chunk_columns",
+    "decode_instructions",
 ]
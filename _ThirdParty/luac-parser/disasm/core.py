@@ -1,6 +1,8 @@
 import struct
 import sys
+from array import array
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, List, Optional, Tuple, Union
 
 LUA51 = 0x51
@@ -139,6 +141,8 @@ class LuaChunk:
     lineinfo: List[int] = field(default_factory=list)
     abslineinfo: List[int] = field(default_factory=list)
     linegaplog: int = 0
+    # decoded InstructionColumns, filled lazily by disasm.ir.chunk_columns
+    columns: Optional[Any] = field(default=None, repr=False, compare=False)
 
     def display_name(self) -> str:
         return self.name.decode("utf-8", errors="replace")
@@ -153,6 +157,34 @@ class LuaBytecode:
     main_chunk: LuaChunk
 
 
+_NATIVE_BIG_ENDIAN = sys.byteorder == "big"
+_INT_CODES_UNSIGNED = {1: "B", 2: "H", 4: "I", 8: "Q"}
+_INT_CODES_SIGNED = {1: "b", 2: "h", 4: "i", 8: "q"}
+# array typecodes by item size; "L"/"l" are 4 or 8 bytes depending on the platform
+_ARRAY_CODES_UNSIGNED = {array(code).itemsize: code for code in "QLIHB"}
+
+_F64_LE = struct.Struct("<d")
+_U64_LE = struct.Struct("<Q")
+
+
+@lru_cache(maxsize=None)
+def _int_struct(size: int, big_endian: bool, unsigned: bool, count: int = 1) -> struct.Struct:
+    mapping = _INT_CODES_UNSIGNED if unsigned else _INT_CODES_SIGNED
+    if size not in mapping:
+        raise LuaParseError(f"unsupported integer size {size}")
+    prefix = ">" if big_endian else "<"
+    return struct.Struct(f"{prefix}{count}{mapping[size]}")
+
+
+@lru_cache(maxsize=None)
+def _float_struct(size: int, big_endian: bool) -> struct.Struct:
+    if size == 4:
+        return struct.Struct(">f" if big_endian else "<f")
+    if size == 8:
+        return struct.Struct(">d" if big_endian else "<d")
+    raise LuaParseError(f"unsupported float size {size}")
+
+
 class ByteReader:
     def __init__(self, data: bytes):
         self._data = memoryview(data)
@@ -174,43 +206,44 @@ class ByteReader:
         return out
 
     def read_u8(self) -> int:
-        return self._read_int_struct("<B")
+        if self._pos >= len(self._data):
+            raise LuaParseError("unexpected end of data")
+        value = self._data[self._pos]
+        self._pos += 1
+        return value
 
     def read_uint(self, size: int, big_endian: bool) -> int:
-        fmt = self._fmt(size, big_endian, unsigned=True)
-        return self._read_int_struct(fmt)
+        return self.unpack(_int_struct(size, big_endian, True))[0]
 
     def read_int(self, size: int, big_endian: bool) -> int:
-        fmt = self._fmt(size, big_endian, unsigned=False)
-        return self._read_int_struct(fmt)
+        return self.unpack(_int_struct(size, big_endian, False))[0]
 
     def read_float(self, size: int, big_endian: bool) -> float:
-        if size == 4:
-            fmt = ">" if big_endian else "<"
-            return self._read_float_struct(f"{fmt}f")
-        if size == 8:
-            fmt = ">" if big_endian else "<"
-            return self._read_float_struct(f"{fmt}d")
-        raise LuaParseError(f"unsupported float size {size}")
-
-    def _fmt(self, size: int, big_endian: bool, unsigned: bool) -> str:
-        mapping_unsigned = {1: "B", 2: "H", 4: "I", 8: "Q"}
-        mapping_signed = {1: "b", 2: "h", 4: "i", 8: "q"}
-        mapping = mapping_unsigned if unsigned else mapping_signed
-        if size not in mapping:
+        return self.unpack(_float_struct(size, big_endian))[0]
+
+    def read_uint_array(self, count: int, size: int, big_endian: bool) -> List[int]:
+        """Reads `count` unsigned integers of `size` bytes in one slice instead of one struct call each."""
+        if count < 0:
+            raise LuaParseError("negative array length")
+        data = self._data[self._pos : self._pos + count * size]
+        if len(data) != count * size:
+            raise LuaParseError("unexpected end of data")
+        code = _ARRAY_CODES_UNSIGNED.get(size)
+        if code is None:
             raise LuaParseError(f"unsupported integer size {size}")
-        prefix = ">" if big_endian else "<"
-        return f"{prefix}{mapping[size]}"
-
-    def _read_int_struct(self, fmt: str) -> int:
-        size = struct.calcsize(fmt)
-        data = self.read(size)
-        return struct.unpack(fmt, data)[0]
-
-    def _read_float_struct(self, fmt: str) -> float:
-        size = struct.calcsize(fmt)
-        data = self.read(size)
-        return struct.unpack(fmt, data)[0]
+        values = array(code)
+        values.frombytes(data)
+        if size > 1 and big_endian != _NATIVE_BIG_ENDIAN:
+            values.byteswap()
+        self._pos += count * size
+        return values.tolist()
+
+    def unpack(self, fmt: struct.Struct) -> Tuple[Any, ...]:
+        if self._pos + fmt.size > len(self._data):
+            raise LuaParseError("unexpected end of data")
+        values = fmt.unpack_from(self._data, self._pos)
+        self._pos += fmt.size
+        return values
 
 
 def parse_lua_bytecode(data: bytes) -> LuaBytecode:
@@ -385,8 +418,7 @@ def _read_lua_string(reader: ByteReader, header: LuaHeader) -> bytes:
 
 def _read_local51(reader: ByteReader, header: LuaHeader) -> LuaLocal:
     name = _read_lua_string(reader, header)
-    start_pc = _read_lua_int(reader, header)
-    end_pc = _read_lua_int(reader, header)
+    start_pc, end_pc = reader.unpack(_int_struct(header.int_size, header.big_endian, True, 2))
     return LuaLocal(name=name.decode("utf-8", errors="replace"), start_pc=start_pc, end_pc=end_pc)
 
 
@@ -525,7 +557,7 @@ def _parse_chunk54(reader: ByteReader, header: LuaHeader) -> LuaChunk:
     max_stack = reader.read_u8()
 
     instruction_count = _read_lua54_int(reader)
-    instructions = [reader.read_uint(header.instruction_size, header.big_endian) for _ in range(instruction_count)]
+    instructions = reader.read_uint_array(instruction_count, header.instruction_size, header.big_endian)
     constants = _read_constants54(reader)
     upvalues = _read_upvalues54(reader)
     prototypes = _read_prototypes54(reader, header)
@@ -559,10 +591,7 @@ def _read_instructions(reader: ByteReader, header: LuaHeader) -> List[int]:
     count = _read_lua_int(reader, header)
     if header.instruction_size != 4:
         raise LuaParseError("only 32-bit instructions are supported")
-    instructions = []
-    for _ in range(count):
-        instructions.append(reader.read_uint(4, header.big_endian))
-    return instructions
+    return reader.read_uint_array(count, 4, header.big_endian)
 
 
 def _read_constants_basic(reader: ByteReader, header: LuaHeader) -> List[LuaConstant]:
@@ -584,11 +613,7 @@ def _read_prototypes(
 
 def _read_source_lines(reader: ByteReader, header: LuaHeader) -> List[Tuple[int, int]]:
     count = _read_lua_int(reader, header)
-    lines = []
-    for _ in range(count):
-        line = _read_lua_int(reader, header)
-        lines.append((int(line), 0))
-    return lines
+    return [(line, 0) for line in reader.read_uint_array(count, header.int_size, header.big_endian)]
 
 
 def _read_locals(reader: ByteReader, header: LuaHeader, factory) -> List[LuaLocal]:
@@ -609,12 +634,8 @@ def _read_upvalue_names(reader: ByteReader, header: LuaHeader) -> List[bytes]:
 
 def _read_upvalues52(reader: ByteReader, header: LuaHeader) -> List[UpValue]:
     count = _read_lua_int(reader, header)
-    result = []
-    for _ in range(count):
-        on_stack = reader.read_uint(1, False) != 0
-        upvalue_id = reader.read_uint(1, False)
-        result.append(UpValue(on_stack=on_stack, id=upvalue_id, kind=0))
-    return result
+    data = reader.read(count * 2)
+    return [UpValue(on_stack=data[i] != 0, id=data[i + 1], kind=0) for i in range(0, len(data), 2)]
 
 
 def _read_lua53_string(reader: ByteReader) -> bytes:
@@ -622,15 +643,14 @@ def _read_lua53_string(reader: ByteReader) -> bytes:
     if length == 0:
         return b""
     if length == 0xFF:
-        length = reader.read_uint(8, False)
+        length = reader.unpack(_U64_LE)[0]
     data = reader.read(length - 1)
     return data
 
 
 def _read_local53(reader: ByteReader, header: LuaHeader) -> LuaLocal:
     name = _read_lua53_string(reader)
-    start_pc = _read_lua_int(reader, header)
-    end_pc = _read_lua_int(reader, header)
+    start_pc, end_pc = reader.unpack(_int_struct(header.int_size, header.big_endian, True, 2))
     return LuaLocal(name=name.decode("utf-8", errors="replace"), start_pc=start_pc, end_pc=end_pc)
 
 
@@ -653,7 +673,7 @@ def _read_constants53(reader: ByteReader, header: LuaHeader) -> List[LuaConstant
             value = reader.read_u8()
             constants.append(LuaConstant.bool(value != 0))
         elif tag == 0x03:
-            number = LuaNumber(value=reader.read_float(8, False), is_integer=False)
+            number = LuaNumber(value=reader.unpack(_F64_LE)[0], is_integer=False)
             constants.append(LuaConstant.number(number))
         elif tag in (0x04, 0x14):
             strlen = reader.read_u8()
@@ -663,7 +683,7 @@ def _read_constants53(reader: ByteReader, header: LuaHeader) -> List[LuaConstant
                 data = reader.read(strlen - 1)
                 constants.append(LuaConstant.string(data))
         elif tag == 0x13:
-            value = reader.read_uint(8, False)
+            value = reader.unpack(_U64_LE)[0]
             constants.append(LuaConstant.number(LuaNumber(value=value, is_integer=True)))
         else:
             raise LuaParseError(f"unsupported Lua 5.3 constant tag 0x{tag:02x}")
@@ -711,13 +731,13 @@ def _read_constants54(reader: ByteReader) -> List[LuaConstant]:
         elif tag == 0x11:
             result.append(LuaConstant.bool(True))
         elif tag == 0x13:
-            value = reader.read_float(8, False)
+            value = reader.unpack(_F64_LE)[0]
             result.append(LuaConstant.number(LuaNumber(value=value, is_integer=False)))
         elif tag in (0x04, 0x14):
             data = _read_lua54_string(reader)
             result.append(LuaConstant.string(data))
         elif tag == 0x03:
-            value = reader.read_uint(8, False)
+            value = reader.unpack(_U64_LE)[0]
             result.append(LuaConstant.number(LuaNumber(value=value, is_integer=True)))
         else:
             raise LuaParseError(f"unsupported Lua 5.4 constant tag 0x{tag:02x}")
@@ -726,13 +746,8 @@ def _read_constants54(reader: ByteReader) -> List[LuaConstant]:
 
 def _read_upvalues54(reader: ByteReader) -> List[UpValue]:
     count = _read_lua54_int(reader)
-    upvalues = []
-    for _ in range(count):
-        on_stack = reader.read_u8() != 0
-        upvalue_id = reader.read_u8()
-        kind = reader.read_u8()
-        upvalues.append(UpValue(on_stack=on_stack, id=upvalue_id, kind=kind))
-    return upvalues
+    data = reader.read(count * 3)
+    return [UpValue(on_stack=data[i] != 0, id=data[i + 1], kind=data[i + 2]) for i in range(0, len(data), 3)]
 
 
 def _read_prototypes54(reader: ByteReader, header: LuaHeader) -> List[LuaChunk]:
@@ -745,7 +760,7 @@ def _read_prototypes54(reader: ByteReader, header: LuaHeader) -> List[LuaChunk]:
 
 def _read_lua54_lineinfo(reader: ByteReader) -> List[int]:
     count = _read_lua54_int(reader)
-    return [reader.read_u8() for _ in range(count)]
+    return list(reader.read(count))
 
 
 def _read_lua54_source_lines(reader: ByteReader) -> List[Tuple[int, int]]:
@@ -0,0 +1,82 @@
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+from .core import LuaChunk, LuaVersion
+
+
+@dataclass(frozen=True)
+class InstructionLayout:
+    """Bit positions of the iABC/iABx/iAx fields in a 32-bit instruction."""
+
+    op_mask: int = 0x3F
+    a_shift: int = 6
+    a_mask: int = 0xFF
+    b_shift: int = 23
+    b_mask: int = 0x1FF
+    c_shift: int = 14
+    c_mask: int = 0x1FF
+    bx_shift: int = 14
+    sbx_bias: int = 131071
+    ax_shift: int = 6
+
+
+# 5.4 is rendered with the 5.3 opcode table, so every version shares the 5.1-5.3 field layout here
+_LAYOUT = InstructionLayout()
+
+
+@dataclass
+class InstructionColumns:
+    """Columnar form of a chunk's instructions: one array per decoded field, indexed by pc."""
+
+    raw: array
+    opcode: array
+    a: array
+    b: array
+    c: array
+    bx: array
+    sbx: array
+    ax: array
+    lines: array
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def opcode_histogram(self) -> Counter:
+        return Counter(self.opcode)
+
+
+def decode_instructions(instructions: List[int], version: LuaVersion, source_lines=()) -> InstructionColumns:
+    layout = _LAYOUT
+    raw = array("I", instructions)
+    # one pass per column keeps each loop a tight mask/shift over the whole array
+    op_mask = layout.op_mask
+    a_shift, a_mask = layout.a_shift, layout.a_mask
+    b_shift, b_mask = layout.b_shift, layout.b_mask
+    c_shift, c_mask = layout.c_shift, layout.c_mask
+    bx_shift, bias, ax_shift = layout.bx_shift, layout.sbx_bias, layout.ax_shift
+    bx = array("I", [x >> bx_shift for x in raw])
+    lines = array("Q", [line for line, _ in source_lines[: len(raw)]])
+    if len(lines) < len(raw):
+        lines.extend([0] * (len(raw) - len(lines)))
+    return InstructionColumns(
+        raw=raw,
+        opcode=array("B", [x & op_mask for x in raw]),
+        a=array("B", [(x >> a_shift) & a_mask for x in raw]),
+        b=array("H", [(x >> b_shift) & b_mask for x in raw]),
+        c=array("H", [(x >> c_shift) & c_mask for x in raw]),
+        bx=bx,
+        sbx=array("i", [x - bias for x in bx]),
+        ax=array("I", [x >> ax_shift for x in raw]),
+        lines=lines,
+    )
+
+
+def chunk_columns(chunk: LuaChunk, version: LuaVersion) -> InstructionColumns:
+    """Decodes `chunk.instructions` once and keeps the result on the chunk."""
+    columns = chunk.columns
+    if columns is None or len(columns) != len(chunk.instructions):
+        columns = decode_instructions(chunk.instructions, version, chunk.source_lines)
+        chunk.columns = columns
+    return columns
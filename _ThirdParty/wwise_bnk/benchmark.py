@@ -0,0 +1,133 @@
+import argparse
+import gc
+import logging
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+from main import HIRC_TYPES, build_event_media_map
+from parser import wio, wparser
+
+# HIRC types used as filler: RanSeqCntr, ActorMixer, Bus, Attenuation, AuxBus, MusicTrack, MusicSegment, SwitchCntr, LayerCntr
+FILLER_TYPES = (0x05, 0x07, 0x08, 0x0E, 0x12, 0x0B, 0x0A, 0x06, 0x09)
+
+
+def _chunk(tag, body):
+    return tag + struct.pack("<I", len(body)) + body
+
+
+def _hirc_item(hirc_type, body):
+    return struct.pack("<BI", hirc_type, len(body)) + body
+
+
+def build_bank(bank_id, num_events, filler_per_event=4, media_size=2048, version=134):
+    """Builds a v134 bank with one Event -> ActionPlay -> Sound -> DIDX media chain per event, plus zero-filled filler objects."""
+    items = []
+    didx = bytearray()
+    data = bytearray()
+    for i in range(num_events):
+        source_id = bank_id * 1000000 + i
+        sound_id, action_id, event_id = source_id + 100000, source_id + 200000, source_id + 300000
+        # ulID, ulPluginID, StreamType, sourceID; NodeBaseParams are all zero
+        items.append(_hirc_item(0x02, struct.pack("<IIBI", sound_id, 0, 0, source_id) + bytes(48)))
+        # ulID, ulActionType=Play, idExt; props/params are all zero
+        items.append(_hirc_item(0x03, struct.pack("<IHI", action_id, 0x0403, sound_id) + bytes(12)))
+        items.append(_hirc_item(0x04, struct.pack("<IBI", event_id, 1, action_id)))
+        for j in range(filler_per_event):
+            items.append(_hirc_item(FILLER_TYPES[(i + j) % len(FILLER_TYPES)], struct.pack("<I", source_id + 400000 + j) + bytes(96)))
+
+        didx += struct.pack("<III", source_id, len(data), media_size)
+        data += bytes([i & 0xFF]) * media_size
+        data += bytes(-len(data) % 16)
+
+    bkhd = _chunk(b"BKHD", struct.pack("<IIIII", version, bank_id, 0, 0, 0))
+    hirc = _chunk(b"HIRC", struct.pack("<I", len(items)) + b"".join(items))
+    return bkhd + _chunk(b"DIDX", bytes(didx)) + _chunk(b"DATA", bytes(data)) + hirc
+
+
+def write_banks(out_dir, num_banks, num_events):
+    paths = []
+    for i in range(num_banks):
+        path = os.path.join(out_dir, f"bank_{i:03d}.bnk")
+        with open(path, "wb") as f:
+            f.write(build_bank(i + 1, num_events))
+        paths.append(path)
+    return paths
+
+
+def bench_raw_reads(paths):
+    """Reader cost alone: every bank read as a sequence of u8/u16/u32 fields, no nodes built."""
+    times = {}
+    for name in ("file", "buffer"):
+        start = time.perf_counter()
+        for path in paths:
+            with open(path, "rb") as f:
+                if name == "file":
+                    r = wio.FileReader(f)
+                else:
+                    r = wio.BufferReader(f.read(), path)
+                end = r.get_size() - 7
+                while r.current() < end:
+                    r.u32()
+                    r.u16()
+                    r.u8()
+                    r.u8()
+        times[name] = time.perf_counter() - start
+        print(f"raw {name:>6}: {times[name]:.2f}s")
+    print(f"raw speedup x{times['file'] / times['buffer']:.2f}")
+
+
+def bench_readers(paths):
+    total = sum(os.path.getsize(p) for p in paths)
+    times = {}
+    for reader in (wparser.Parser.READER_FILE, wparser.Parser.READER_BUFFER):
+        parser = wparser.Parser(reader=reader)
+        start = time.perf_counter()
+        parser.parse_banks(paths)
+        times[reader] = time.perf_counter() - start
+        # drop the parsed trees before the next run so GC pressure doesn't skew it
+        del parser
+        gc.collect()
+        print(f"{reader:>7}: {len(paths)} banks, {total / 1048576:.1f} MB in {times[reader]:.2f}s")
+    print(f"speedup x{times[wparser.Parser.READER_FILE] / times[wparser.Parser.READER_BUFFER]:.2f}")
+
+
+def bench_projection(paths):
+    """Event -> media map from a full HIRC parse vs. a Sound/Action/Event projection."""
+    times = {}
+    maps = {}
+    for name, hirc_types in (("full", None), ("projected", HIRC_TYPES)):
+        parser = wparser.Parser(hirc_types=hirc_types)
+        start = time.perf_counter()
+        parser.parse_banks(paths)
+        maps[name] = {bank.get_filename(): build_event_media_map(bank) for bank in parser.get_banks()}
+        times[name] = time.perf_counter() - start
+        del parser
+        gc.collect()
+        print(f"{name:>9}: {sum(len(m) for m in maps[name].values())} events in {times[name]:.2f}s")
+    if maps["full"] != maps["projected"]:
+        raise AssertionError("projected event map differs from the full parse")
+    print(f"projection speedup x{times['full'] / times['projected']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bnk_root", default=None, help="Benchmark real banks under this folder instead of synthetic ones")
+    parser.add_argument("--banks", type=int, default=8)
+    parser.add_argument("--events", type=int, default=2000, help="Events per synthetic bank")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.bnk_root:
+        paths = [str(p) for p in Path(args.bnk_root).rglob("*.bnk")]
+        bench_raw_reads(paths)
+        bench_readers(paths)
+        bench_projection(paths)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_banks(tmp, args.banks, args.events)
+            bench_raw_reads(paths)
+            bench_readers(paths)
+            bench_projection(paths)
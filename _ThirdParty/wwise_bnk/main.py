@@ -1,103 +1,58 @@
 import argparse
+import mmap
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import xxhash
 from parser import wparser
 from tqdm import tqdm
 
 
-def banks_to_dict_list(banks):
-    return [node_to_dict(node) for node in banks]
+# event -> media only needs these HIRC items, everything else is skipped while parsing
+HIRC_TYPES = ("Sound", "Action", "Event")
 
 
-def node_to_dict(node):
-    if hasattr(node, "_NodeField__name"):
-        key = node._NodeField__name
-        value = node._NodeField__value
-        return {key: value}
+def field_value(node, name):
+    found = node.find1(name=name)
+    return None if found is None else found.value()
 
-    if hasattr(node, "_NodeRoot__filename"):
-        key = node._NodeRoot__filename
-    elif hasattr(node, "_NodeObject__name"):
-        key = node._NodeObject__name
-    elif hasattr(node, "_NodeList__name"):
-        key = node._NodeList__name
-    else:
-        raise ValueError(f"Unrecognized node type: {node}")
 
-    children = getattr(node, "_children", []) or []
-
-    children_dicts = [node_to_dict(child) for child in children]
-
-    merged = {}
-    for cd in children_dicts:
-        for k, v in cd.items():
-            if k in merged:
-                if not isinstance(merged[k], list):
-                    merged[k] = [merged[k]]
-                merged[k].append(v)
-            else:
-                merged[k] = v
-
-    return {key: merged}
-
-
-def normalize_list(item):
-    if isinstance(item, list):
-        return item
-    elif isinstance(item, dict):
-        return [item]
-    else:
-        return []
-
-
-def build_event_media_map(bank_dict):
-    media_headers = bank_dict["MediaIndex"]["pLoadedMedia"]["MediaHeader"]
-    hirc_items = bank_dict["HircChunk"]["listLoadedItem"]
-    sounds = hirc_items.get("CAkSound", [])
-    actions = hirc_items.get("CAkActionPlay", [])
-    events = hirc_items.get("CAkEvent", [])
+def build_event_media_map(bank):
+    media_index = bank.find1(name="MediaIndex")
+    hirc_items = bank.find1(name="listLoadedItem")
 
     #   A. MediaHeader:  sourceID ➜ {uOffset, uSize}
-    media_map = {md["id"]: {"uOffset": md["uOffset"], "uSize": md["uSize"]} for md in normalize_list(media_headers)}
+    media_map = {}
+    for md in media_index.finds(name="MediaHeader"):
+        media_id = field_value(md, "id")
+        media_map[media_id] = {"id": media_id, "uOffset": field_value(md, "uOffset"), "uSize": field_value(md, "uSize")}
 
-    #   B. Sound:  sound_ulID ➜ sourceID
     sound_map = {}
-    for snd in normalize_list(sounds):
-        source_id = snd["SoundInitialValues"]["AkBankSourceData"]["AkMediaInformation"]["sourceID"]
-        sound_map[snd["ulID"]] = source_id
-
-    #   C. Action: action_ulID ➜ idExt(=sound_ulID)
     action_map = {}
-    for act in normalize_list(actions):
-        action_map[act["ulID"]] = act["ActionInitialValues"]["idExt"]
+    events = []
+    for item in (hirc_items.get_children() if hirc_items else None) or []:
+        name = item.get_name()
+        if name == "CAkSound":
+            #   B. Sound:  sound_ulID ➜ sourceID
+            sound_map[field_value(item, "ulID")] = field_value(item, "sourceID")
+        elif name == "CAkActionPlay":
+            #   C. Action: action_ulID ➜ idExt(=sound_ulID)
+            action_map[field_value(item, "ulID")] = field_value(item, "idExt")
+        elif name == "CAkEvent":
+            events.append(item)
 
     result = {}
-
-    def extract_action_ids(action_block):
-        if action_block is None:
-            return []
-
-        if isinstance(action_block, list):
-            return [item.get("Action", item).get("ulActionID") for item in action_block if isinstance(item, (dict,)) and ("Action" in item or "ulActionID" in item)]
-
-        if isinstance(action_block, dict):
-            act_field = action_block.get("Action", action_block)
-            if isinstance(act_field, list):
-                return [x.get("ulActionID") for x in act_field if "ulActionID" in x]
-            elif isinstance(act_field, dict):
-                return [act_field.get("ulActionID")] if "ulActionID" in act_field else []
-
-        return []
-
-    for evt in normalize_list(events):
-        evt_id = evt.get("ulID")
+    for evt in events:
+        evt_id = field_value(evt, "ulID")
         if evt_id is None:
             continue
 
         # 取出它引用的 Action ID 列表
-        actions_block = evt["EventInitialValues"]["actions"] if "EventInitialValues" in evt else None
-        for act_id in extract_action_ids(actions_block):
-            sound_ulid = action_map.get(act_id)
+        for act_field in evt.finds(name="ulActionID"):
+            sound_ulid = action_map.get(act_field.value())
             if sound_ulid is None:
                 continue
 
@@ -115,62 +70,175 @@ def build_event_media_map(bank_dict):
     return result
 
 
-def extract_all_wems(bnk_paths, out_root="./output_wems"):
-    parser = wparser.Parser()
-    parser.parse_banks(bnk_paths)
-    banks = parser.get_banks()
+def data_chunk_start(bank):
+    # DATA payload starts right after the chunk's dwChunkSize field
+    data_chunk = bank.find1(name="DataChunk")
+    if data_chunk is None:
+        return None
+    return data_chunk.find1(name="dwChunkSize").get_attr("offset") + 4
 
-    banks_dicts = banks_to_dict_list(banks)
-
-    bank_info = {}
-    for entry in tqdm(banks_dicts, ncols=150):
-        for name, bd in entry.items():
-            media_index = bd.get("MediaIndex", {})
-            if media_index == {}:
-                continue
-            bank_info[name] = {"dwChunkSize": media_index["dwChunkSize"], "events": build_event_media_map(bd)}
 
-    out_root = Path(out_root)
-    out_root.mkdir(exist_ok=True)
-    name2path = {Path(p).name: Path(p) for p in bnk_paths}
-
-    for name, info in tqdm(bank_info.items(), ncols=150):
-        src_path = name2path.get(name)
-        if not src_path or not src_path.exists():
-            print(f"⚠️ 跳过，找不到源文件 {name}")
-            continue
+def plan_bank(bnk_path):
+    """Worker: parses one bank and returns its (event_id, media_id, start, size, hash) WEM slices."""
+    parser = wparser.Parser(hirc_types=HIRC_TYPES)
+    if not parser.parse_bank(bnk_path):
+        raise ValueError("解析失败")
+    bank = parser.get_banks()[0]
 
-        data = src_path.read_bytes()
-        didx = data.find(b"DIDX")
-        if didx < 0:
-            print(f"⚠️ {name} 无 DIDX，跳过")
-            continue
-
-        base = didx + 8 + info["dwChunkSize"]
-        if data[base : base + 4] != b"DATA":
-            print(f"⚠️ {name} DIDX 后非 DATA，跳过")
-            continue
-        data_start = base + 8
-
-        odir = out_root / name.replace(".bnk", "")
-        odir.mkdir(exist_ok=True)
+    data_start = data_chunk_start(bank)
+    if bank.find1(name="MediaIndex") is None or data_start is None:
+        return []
 
-        for evt_id, mm in info["events"].items():
-            start = data_start + mm["uOffset"]
-            wem = data[start : start + mm["uSize"]]
-            (odir / f"{evt_id}.wem").write_bytes(wem)
+    slices = []
+    with open(bnk_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        hashes = {}
+        for evt_id, mm_info in build_event_media_map(bank).items():
+            start = data_start + mm_info["uOffset"]
+            size = mm_info["uSize"]
+            if (start, size) not in hashes:
+                hashes[(start, size)] = xxhash.xxh3_64_hexdigest(mm[start : start + size])
+            slices.append((evt_id, mm_info["id"], start, size, hashes[(start, size)]))
+    return slices
+
+
+def write_slices(bnk_path, out_dir, slices):
+    """Worker: writes WEM slices straight from the mapped bank."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(bnk_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            for evt_id, _media_id, start, size, _hash in slices:
+                with open(out_dir / f"{evt_id}.wem", "wb") as out:
+                    out.write(view[start : start + size])
+                written += size
+        finally:
+            view.release()
+    return written
+
+
+def link_or_copy(src, dst):
+    """Hard-links dst to an already written src; copies where links aren't supported (other volume, FAT)."""
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def extract_all_wems(bnk_paths, out_root="./output_wems", jobs=None, seen=None):
+    """Extracts every bank's event WEMs on a process pool and returns a summary dict.
+
+    Every event still gets its own `{evt_id}.wem`, but identical media is only sliced out once: `seen` maps
+    (media_id, content hash) to the first file successfully written for it and the other events are hard-linked to that file.
+    Pass the same dict across calls to share media between banks and languages."""
+    if seen is None:
+        seen = {}
+    out_root = Path(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+    start_time = time.perf_counter()
+
+    plans = {}
+    errors = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(plan_bank, path): path for path in bnk_paths}
+        for future in tqdm(as_completed(futures), total=len(futures), ncols=150):
+            path = futures[future]
+            try:
+                plans[path] = future.result()
+            except Exception as e:
+                errors += 1
+                tqdm.write(f"⚠️ 跳过 {path}: {e}")
+
+        # dedup in input order so the kept copy doesn't depend on worker timing
+        pending = {}  # media not written yet -> every event using it, in input order
+        aliases = []
+        for path in bnk_paths:
+            out_dir = out_root / Path(path).stem
+            for item in plans.get(path, []):
+                key = (item[1], item[4])
+                dest = out_dir / f"{item[0]}.wem"
+                if key in seen:
+                    if seen[key] != dest:
+                        aliases.append((seen[key], dest))
+                    continue
+                pending.setdefault(key, []).append((path, out_dir, item))
+
+        # slice each media out of its first event's bank; a key only enters `seen` once that write succeeded,
+        # if it failed the next event's bank is tried instead
+        attempt = dict.fromkeys(pending, 0)
+        written = 0
+        files = 0
+        while pending:
+            batch = {}
+            for key, events in pending.items():
+                path, out_dir, item = events[attempt[key]]
+                batch.setdefault((path, out_dir), []).append(item)
+
+            futures = {pool.submit(write_slices, path, out_dir, items): (path, out_dir, items) for (path, out_dir), items in batch.items()}
+            for future in tqdm(as_completed(futures), total=len(futures), ncols=150):
+                path, out_dir, items = futures[future]
+                try:
+                    written += future.result()
+                except Exception as e:
+                    errors += 1
+                    tqdm.write(f"⚠️ 写出失败 {path}: {e}")
+                    continue
+                files += len(items)
+                for item in items:
+                    seen[(item[1], item[4])] = out_dir / f"{item[0]}.wem"
+
+            for key in list(pending):
+                if key in seen:
+                    for _path, out_dir, item in pending.pop(key):
+                        dest = out_dir / f"{item[0]}.wem"
+                        if seen[key] != dest:
+                            aliases.append((seen[key], dest))
+                else:
+                    attempt[key] += 1
+                    if attempt[key] == len(pending[key]):
+                        del pending[key]
+
+    # duplicates point at files written above (or by an earlier call), so link them once all writes are done
+    linked = 0
+    for src, dst in aliases:
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(src, dst)
+            linked += 1
+        except OSError as e:
+            errors += 1
+            tqdm.write(f"⚠️ 链接失败 {dst} -> {src}: {e}")
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "banks": len(plans),
+        "errors": errors,
+        "files": files + linked,
+        "bytes": written,
+        "duplicates": linked,
+        "seconds": seconds,
+        "banks_per_s": len(plans) / seconds if seconds else 0.0,
+        "mb_per_s": written / 1048576 / seconds if seconds else 0.0,
+    }
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--bnk_root", default=Path(r"D:\Dataset_Game\com.bluepoch.m.en.reverse1999\Android\audios\Android"), help="Root folder containing language subfolders with .bnk files")
     parser.add_argument("--out_root", default=Path(r"D:\Dataset_Game\com.bluepoch.m.en.reverse1999\EXP\audios\Android"), help="Output root for extracted WEMs organized by language")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Processes parsing/extracting banks in parallel")
     args = parser.parse_args()
 
+    # media already written (id + content) -> its file, shared so identical media is linked instead of re-extracted
+    seen = {}
     languages = ["zh", "kr", "en", "jp"]
     for lang in languages:
-        bnk_folder = args.bnk_root / lang
-        out_folder = args.out_root / lang
+        bnk_folder = Path(args.bnk_root) / lang
+        out_folder = Path(args.out_root) / lang
         out_folder.mkdir(parents=True, exist_ok=True)
 
         bnk_files = list(bnk_folder.rglob("*.bnk"))
@@ -179,5 +247,9 @@ if __name__ == "__main__":
             continue
 
         print(f"Processing language '{lang}' with {len(bnk_files)} files...")
-        extract_all_wems([str(p) for p in bnk_files], out_root=str(out_folder))
-        print(f"Finished processing {lang}. Outputs in {out_folder}")
+        stats = extract_all_wems([str(p) for p in bnk_files], out_root=str(out_folder), jobs=args.jobs, seen=seen)
+        print(
+            f"Finished processing {lang}: {stats['banks']} banks ({stats['banks_per_s']:.1f} banks/s), "
+            f"{stats['files']} files, {stats['bytes'] / 1048576:.1f} MB ({stats['mb_per_s']:.1f} MB/s), "
+            f"{stats['duplicates']} linked to identical media, {stats['errors']} errors. Outputs in {out_folder}"
+        )
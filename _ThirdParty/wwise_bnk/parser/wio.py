@@ -1,6 +1,25 @@
 import os
 import struct
 
+_D64LE = struct.Struct("<d")
+_D64BE = struct.Struct(">d")
+_F32LE = struct.Struct("<f")
+_F32BE = struct.Struct(">f")
+_S64LE = struct.Struct("<q")
+_S64BE = struct.Struct(">q")
+_U64LE = struct.Struct("<Q")
+_U64BE = struct.Struct(">Q")
+_S32LE = struct.Struct("<i")
+_S32BE = struct.Struct(">i")
+_U32LE = struct.Struct("<I")
+_U32BE = struct.Struct(">I")
+_S16LE = struct.Struct("<h")
+_S16BE = struct.Struct(">h")
+_U16LE = struct.Struct("<H")
+_U16BE = struct.Struct(">H")
+_S8 = struct.Struct("b")
+_U8 = struct.Struct("B")
+
 
 class FileReader(object):
     def __init__(self, file):
@@ -229,6 +248,188 @@ class FileReader(object):
         self._xorpad = xorpad
 
 
+# Same interface as FileReader, but over an in-memory buffer (bytes or a read-only mmap of the bank).
+# Fields are read with unpack_from on precompiled Structs, so there is no seek/read per field. As in
+# FileReader, the xorpad only applies to numeric reads; strings and fourccs are returned as stored.
+class BufferReader(object):
+    def __init__(self, buf, filename=""):
+        self.buf = buf
+        self.filename = filename
+        self.be = False
+        self.pos = 0
+        self.size = len(buf)
+        self._xorpad = None
+
+    def _check(self, offset, size):
+        if offset < 0 or offset + size > self.size:
+            raise ReaderError("can't read requested 0x%x bytes at 0x%x" % (size, offset))
+
+    def __read(self, offset, st):
+        if offset is None:
+            offset = self.pos
+        self._check(offset, st.size)
+        self.pos = offset + st.size
+        if self._xorpad and offset < len(self._xorpad):
+            return st.unpack(self.__unxor(offset, st.size))[0]
+        return st.unpack_from(self.buf, offset)[0]
+
+    def __unxor(self, offset, size):
+        elem = bytearray(self.buf[offset : offset + size])
+        for i in range(offset, min(offset + size, len(self._xorpad))):
+            elem[i - offset] ^= self._xorpad[i]
+        return elem
+
+    def __bytes(self, offset, size):
+        if offset is None:
+            offset = self.pos
+        self._check(offset, size)
+        self.pos = offset + size
+        return bytes(self.buf[offset : offset + size])
+
+    def __read_string(self, offset, size):
+        if size == 0:
+            if offset is not None:
+                self.pos = offset
+            return ""
+        elem = self.__bytes(offset, size)
+        # remove c-string null terminator, .decode() retains it
+        if elem[-1] == 0:
+            elem = elem[:-1]
+        return elem.decode("UTF-8")
+
+    def d64le(self, offset=None):
+        return self.__read(offset, _D64LE)
+
+    def d64be(self, offset=None):
+        return self.__read(offset, _D64BE)
+
+    def d64(self, offset=None):
+        return self.__read(offset, _D64BE if self.be else _D64LE)
+
+    def f32le(self, offset=None):
+        return self.__read(offset, _F32LE)
+
+    def f32be(self, offset=None):
+        return self.__read(offset, _F32BE)
+
+    def f32(self, offset=None):
+        return self.__read(offset, _F32BE if self.be else _F32LE)
+
+    def s64le(self, offset=None):
+        return self.__read(offset, _S64LE)
+
+    def s64be(self, offset=None):
+        return self.__read(offset, _S64BE)
+
+    def u64le(self, offset=None):
+        return self.__read(offset, _U64LE)
+
+    def u64be(self, offset=None):
+        return self.__read(offset, _U64BE)
+
+    def s64(self, offset=None):
+        return self.__read(offset, _S64BE if self.be else _S64LE)
+
+    def u64(self, offset=None):
+        return self.__read(offset, _U64BE if self.be else _U64LE)
+
+    def s32le(self, offset=None):
+        return self.__read(offset, _S32LE)
+
+    def s32be(self, offset=None):
+        return self.__read(offset, _S32BE)
+
+    def u32le(self, offset=None):
+        return self.__read(offset, _U32LE)
+
+    def u32be(self, offset=None):
+        return self.__read(offset, _U32BE)
+
+    def s32(self, offset=None):
+        return self.__read(offset, _S32BE if self.be else _S32LE)
+
+    def u32(self, offset=None):
+        return self.__read(offset, _U32BE if self.be else _U32LE)
+
+    def s16le(self, offset=None):
+        return self.__read(offset, _S16LE)
+
+    def s16be(self, offset=None):
+        return self.__read(offset, _S16BE)
+
+    def s16(self, offset=None):
+        return self.__read(offset, _S16BE if self.be else _S16LE)
+
+    def u16le(self, offset=None):
+        return self.__read(offset, _U16LE)
+
+    def u16be(self, offset=None):
+        return self.__read(offset, _U16BE)
+
+    def u16(self, offset=None):
+        return self.__read(offset, _U16BE if self.be else _U16LE)
+
+    def s8(self, offset=None):
+        return self.__read(offset, _S8)
+
+    def u8(self, offset=None):
+        return self.__read(offset, _U8)
+
+    def str(self, size, offset=None):
+        return self.__read_string(offset, size)
+
+    def fourcc(self, offset=None):
+        # as bytes rather than string to avoid failures on bad data
+        return self.__bytes(offset, 4)
+
+    def gap(self, bytes):
+        offset_after = self.pos + bytes
+        if offset_after > self.size:
+            raise ReaderError("can't skip requested 0x%x bytes at 0x%x" % (bytes, self.pos))
+        self.pos = offset_after
+
+    def seek(self, offset):
+        self.pos = offset
+
+    def skip(self, bytes):
+        self.pos += bytes
+
+    def current(self):
+        return self.pos
+
+    def get_size(self):
+        return self.size
+
+    def guess_endian32(self, offset):
+        current = self.pos
+        var_le = self.u32le(offset)
+        var_be = self.u32be(offset)
+
+        if var_le > var_be:
+            self.be = True
+        else:
+            self.be = False
+        self.pos = current
+
+    def get_endian_big(self):
+        return self.be
+
+    def set_endian(self, big_endian):
+        self.be = big_endian
+
+    def is_eof(self):
+        return self.pos >= self.size
+
+    def get_path(self):
+        return os.path.dirname(self.filename)
+
+    def get_filename(self):
+        return os.path.basename(self.filename)
+
+    def set_xorpad(self, xorpad):
+        self._xorpad = xorpad
+
+
 class ReaderError(Exception):
     def __init__(self, msg):
         super(ReaderError, self).__init__(msg)
@@ -147,7 +147,7 @@ class NodeElement(object):
 
 # root node with special definitions (represents a bank)
 class NodeRoot(NodeElement):
-    __slots__ = ["__r", "__filename", "__path", "_version", "_id", "_lang", "_feedback", "_custom", "_subversion", "_names", "_strings"]
+    __slots__ = ["__r", "__filename", "__path", "_version", "_id", "_lang", "_feedback", "_custom", "_subversion", "_names", "_strings", "_hirc_types"]
 
     def __init__(self, r, version=0):
         super(NodeRoot, self).__init__(None, "root")
@@ -163,6 +163,7 @@ class NodeRoot(NodeElement):
         self._custom = False
         self._names = None
         self._strings = []
+        self._hirc_types = None  # HIRC item types to parse, None = all
 
     # *** inheritance ***
 
@@ -242,6 +243,12 @@ class NodeRoot(NodeElement):
     def set_names(self, names):
         self._names = names
 
+    def get_hirc_types(self):
+        return self._hirc_types
+
+    def set_hirc_types(self, hirc_types):
+        self._hirc_types = hirc_types
+
     def is_be(self):
         return self.__r.get_endian_big()
 
@@ -352,11 +359,20 @@ class NodeObject(NodeElement):
     def gap(self, name, size):
         return self.field(TYPE_GAP, name, size=size).fmt(wdefs.fmt_hex)
 
+    def peek8(self):
+        value = self.__r.u8()
+        self.__r.skip(-1)
+        return value
+
     def peek32(self):
         value = self.__r.u32()
         self.__r.skip(-4)
         return value
 
+    # moves past data without registering any node (for parts the caller doesn't want parsed)
+    def skip(self, size):
+        self.__r.gap(size)
+
     # register new field and add value to object
     def field(self, type, name, value=None, size=None):
         r = self.__r
@@ -1,4 +1,5 @@
 import logging
+import mmap
 
 from tqdm import tqdm
 
@@ -3190,6 +3191,28 @@ def get_hirc_dispatch(obj):
     return hirc_dispatch
 
 
+# projection mode: yields only items whose eHircType was requested, others are skipped by
+# dwSectionSize without creating nodes (listLoadedItem then only has the wanted items)
+def iter_hirc_projection(obj, items, count, hirc_types):
+    version = get_version(obj)
+
+    for _ in range(count):
+        if version <= 48:
+            hirc_type = obj.peek32()
+            type_size = 4
+        else:
+            hirc_type = obj.peek8()
+            type_size = 1
+
+        if hirc_type in hirc_types:
+            yield next(items)
+            continue
+
+        obj.skip(type_size)
+        section_size = obj.peek32()
+        obj.skip(4 + section_size)
+
+
 # 026>=
 def CAkBankMgr__ProcessHircChunk(obj):
     # CAkBankMgr::ProcessHircChunk
@@ -3198,11 +3221,15 @@ def CAkBankMgr__ProcessHircChunk(obj):
     version = get_version(obj)
 
     hirc_dispatch = get_hirc_dispatch(obj)
+    hirc_types = obj.get_root().get_hirc_types()
 
     count = 0
     try:
         obj.u32("NumReleasableHircItem")
-        for elem in obj.list("listLoadedItem", "AkListLoadedItem", obj.lastval):
+        items = obj.list("listLoadedItem", "AkListLoadedItem", obj.lastval)
+        if hirc_types is not None:
+            items = iter_hirc_projection(obj, items, obj.lastval, hirc_types)
+        for elem in items:
             # AkBank::AKBKSubHircSection
             if version <= 48:
                 elem.U32("eHircType").fmt(wdefs.AkBank__AKBKHircType)
@@ -3871,10 +3898,30 @@ class Parser(object):
         MULTIBANK_SMALLEST,
     ]
 
-    def __init__(self):
+    # how bank bytes are read
+    READER_BUFFER = "buffer"  # mmap'd bank + unpack_from (default)
+    READER_FILE = "file"  # seek + read per field
+
+    def __init__(self, reader=READER_BUFFER, hirc_types=None):
         # self._ignore_version = ignore_version
         self._banks = {}
         self._names = None
+        self._reader = reader
+        # HIRC projection: only parse these item types (names like "Sound" or eHircType codes), None = all
+        self._hirc_types = hirc_types
+
+    def _resolve_hirc_types(self):
+        # names depend on the version's type table, so resolve after wdefs.setup
+        if self._hirc_types is None:
+            return None
+        names = wdefs.AkBank__AKBKHircType.enum
+        codes = set()
+        for hirc_type in self._hirc_types:
+            if isinstance(hirc_type, int):
+                codes.add(hirc_type)
+            else:
+                codes.update(code for code, name in names.items() if name == hirc_type)
+        return codes
 
     def _check_header(self, r, bank):
         root = bank.get_root()
@@ -3964,9 +4011,20 @@ class Parser(object):
         try:
             with open(filename, "rb") as infile:
                 # real_filename = infile.name
-                r = wio.FileReader(infile)
-                r.guess_endian32(0x04)
-                res = self._process(r, filename)
+                buf = None
+                if self._reader != self.READER_FILE:
+                    try:
+                        buf = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (ValueError, OSError):
+                        # empty (or unmappable) file: FileReader reports it like any other truncated bank
+                        pass
+                r = wio.FileReader(infile) if buf is None else wio.BufferReader(buf, infile.name)
+                try:
+                    r.guess_endian32(0x04)
+                    res = self._process(r, filename)
+                finally:
+                    if buf is not None:
+                        buf.close()
 
             if res:
                 logging.info("parser: %s", res)
@@ -4008,6 +4066,7 @@ class Parser(object):
 
         try:
             version = self._check_header(r, bank)
+            bank.set_hirc_types(self._resolve_hirc_types())
 
             # first chunk in ancient versions doesn't follow the usual rules
             if version <= 14:
@@ -0,0 +1,135 @@
+import argparse
+import os
+import struct
+import tempfile
+import time
+from multiprocessing import Process, Queue, cpu_count
+
+from wem_extract import _largest_first, _process_one_file, _worker
+from wem_tools.converter_opus_wem import crc32_ogg
+
+
+def legacy_crc32_ogg(data: bytes) -> int:
+    """The original per-byte table loop, kept as the baseline and reference output."""
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    crc = 0
+    for b in data:
+        idx = ((crc >> 24) & 0xFF) ^ b
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[idx]
+    return crc & 0xFFFFFFFF
+
+
+def build_opus_wem(num_packets, packet_size=160, channels=2):
+    """Minimal Wwise Opus (0x3041) WEM: fmt + seek table + constant-size 20ms CELT packets."""
+    fmt = struct.pack("<HHIIHH", 0x3041, channels, 48000, 0, 0, 0) + bytes(0x0C)
+    fmt += struct.pack("<IHBB", num_packets, 312, 1, 0)
+    seek = struct.pack("<H", packet_size) * num_packets
+    packet = bytes([0xFC]) + bytes(range(1, packet_size))
+    data = packet * num_packets
+
+    body = b"WAVE"
+    for tag, chunk in ((b"fmt ", fmt), (b"seek", seek), (b"data", data)):
+        body += tag + struct.pack("<I", len(chunk)) + chunk
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def write_corpus(root, num_small, num_large, small_packets, large_packets):
+    """Skewed corpus: a few big music files (sorted first by name, like a music folder) + many short voice lines."""
+    files = []
+    for i in range(num_large):
+        files.append((os.path.join(root, "music", f"bgm_{i:03d}.wem"), large_packets))
+    for i in range(num_small):
+        files.append((os.path.join(root, "vo", f"vo_{i:05d}.wem"), small_packets))
+    for path, packets in files:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(build_opus_wem(packets))
+    return sorted(path for path, _ in files)
+
+
+def _static_worker(files, input_root, output_root):
+    for src in files:
+        out_dir = os.path.join(output_root, os.path.dirname(os.path.relpath(src, input_root)))
+        os.makedirs(out_dir, exist_ok=True)
+        _process_one_file(src, out_dir)
+
+
+def run_static(files, input_root, output_root, workers):
+    """Old scheduling: one equal slice of the file list per process."""
+    size = (len(files) + workers - 1) // workers
+    procs = [Process(target=_static_worker, args=(files[i * size : (i + 1) * size], input_root, output_root)) for i in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def run_queue(files, input_root, output_root, workers, prefetch):
+    tasks = Queue()
+    for src in _largest_first(files):
+        tasks.put(src)
+    for _ in range(workers):
+        tasks.put(None)
+    q = Queue()
+    procs = [Process(target=_worker, args=(rank, tasks, input_root, output_root, q, prefetch)) for rank in range(workers)]
+    for p in procs:
+        p.start()
+    done = 0
+    while done < workers:
+        if q.get()[0] == "done":
+            done += 1
+    for p in procs:
+        p.join()
+
+
+def bench_crc(size_mb):
+    data = os.urandom(int(size_mb * 1048576))
+    start = time.perf_counter()
+    old = legacy_crc32_ogg(data)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = crc32_ogg(data)
+    new_time = time.perf_counter() - start
+    if old != new:
+        raise AssertionError("Ogg CRC mismatch")
+    print(f"crc {size_mb} MB: zlib {new_time:.4f}s, legacy {old_time:.3f}s, x{old_time / new_time:.0f}")
+
+
+def bench_scheduler(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        input_root = os.path.join(tmp, "in")
+        files = write_corpus(input_root, args.small, args.large, args.small_packets, args.large_packets)
+        total = sum(os.path.getsize(p) for p in files)
+        print(f"corpus: {len(files)} files, {total / 1048576:.1f} MB, {args.workers} workers")
+
+        times = {}
+        for name in ("static", "queue"):
+            output_root = os.path.join(tmp, name)
+            start = time.perf_counter()
+            if name == "static":
+                run_static(files, input_root, output_root, args.workers)
+            else:
+                run_queue(files, input_root, output_root, args.workers, args.prefetch)
+            times[name] = time.perf_counter() - start
+            print(f"{name:>6}: {times[name]:.2f}s")
+        print(f"scheduler speedup x{times['static'] / times['queue']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=min(8, cpu_count()))
+    parser.add_argument("--prefetch", type=int, default=2)
+    parser.add_argument("--small", type=int, default=2000, help="Short voice-line WEMs")
+    parser.add_argument("--large", type=int, default=12, help="Long music WEMs")
+    parser.add_argument("--small_packets", type=int, default=100)
+    parser.add_argument("--large_packets", type=int, default=15000)
+    parser.add_argument("--crc_mb", type=float, default=1)
+    args = parser.parse_args()
+
+    bench_crc(args.crc_mb)
+    bench_scheduler(args)
@@ -1,8 +1,10 @@
 import argparse
 import glob
 import os
+import threading
 from multiprocessing import Process, cpu_count, Queue
 from queue import Empty
+from queue import Queue as ThreadQueue
 from time import sleep
 
 from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn, MofNCompleteColumn
@@ -16,12 +18,14 @@ def args_parser():
     ap.add_argument("--input", default=r"D:\Reverse\_Unreal Engine\FModel\Output\Exports\Client\Content\Aki\WwiseAudio_Generated")
     ap.add_argument("--output", default=r"D:\Reverse\_Unreal Engine\FModel\Output\Exports\Client\Content\Aki\WwiseAudio_Generated")
     ap.add_argument("--workers", type=int, default=cpu_count(), help="进程数，默认=CPU核心数")
+    ap.add_argument("--prefetch", type=int, default=2, help="每个进程预读的文件数")
     return ap
 
 
-def _process_one_file(in_path, out_spec):
-    with open(in_path, "rb") as f:
-        buf = f.read()
+def _process_one_file(in_path, out_spec, buf=None):
+    if buf is None:
+        with open(in_path, "rb") as f:
+            buf = f.read()
 
     info = extract_info(buf)
 
@@ -57,15 +61,35 @@ def _process_one_file(in_path, out_spec):
             out.write(buf[payload_off: payload_off + payload_sz])
 
 
-def _worker(rank, files, input_root, output_root, q: Queue):
+def _prefetch(tasks: Queue, loaded: ThreadQueue):
+    # 后台线程：从共享队列取任务并预读文件，转换与磁盘读取重叠
+    while True:
+        src = tasks.get()
+        if src is None:
+            loaded.put(None)
+            return
+        try:
+            with open(src, "rb") as f:
+                loaded.put((src, f.read()))
+        except OSError as e:
+            loaded.put((src, e))
+
+
+def _worker(rank, tasks: Queue, input_root, output_root, q: Queue, prefetch):
     ok = 0
     err = 0
-    for src in files:
+    loaded = ThreadQueue(maxsize=max(1, prefetch))
+    threading.Thread(target=_prefetch, args=(tasks, loaded), daemon=True).start()
+    while (item := loaded.get()) is not None:
+        src, buf = item
         try:
+            if isinstance(buf, OSError):
+                raise buf
             rel = os.path.relpath(src, input_root)
             rel_dir = os.path.dirname(rel)
             out_dir = os.path.join(output_root, rel_dir)
-            _process_one_file(src, out_dir)
+            os.makedirs(out_dir, exist_ok=True)  # 不存在时会被当成输出文件名
+            _process_one_file(src, out_dir, buf)
             ok += 1
             q.put(("progress", rank, 1))  # 单个文件完成
         except Exception as e:
@@ -74,10 +98,9 @@ def _worker(rank, files, input_root, output_root, q: Queue):
     q.put(("done", rank, {"ok": ok, "err": err}))
 
 
-def _split_even(lst, n):
-    n = max(1, int(n))
-    size = (len(lst) + n - 1) // n  # ceil
-    return [lst[i*size:(i+1)*size] for i in range(n) if lst[i*size:(i+1)*size]]
+def _largest_first(files):
+    # 大文件先发，避免最后只剩一个进程在处理大体积音乐
+    return sorted(files, key=os.path.getsize, reverse=True)
 
 
 if __name__ == "__main__":
@@ -94,13 +117,19 @@ if __name__ == "__main__":
         print("未发现 .wem/.WEM 文件。")
         raise SystemExit(0)
 
-    chunks = _split_even(files, workers)
-    workers = len(chunks)
+    workers = min(workers, len(files))
+
+    # 动态任务队列：空闲进程自行领取下一个文件
+    tasks: Queue = Queue()
+    for src in _largest_first(files):
+        tasks.put(src)
+    for _ in range(workers):
+        tasks.put(None)
 
     q: Queue = Queue()
     procs = []
-    for rank, chunk in enumerate(chunks):
-        p = Process(target=_worker, args=(rank, chunk, input_root, output_root, q))
+    for rank in range(workers):
+        p = Process(target=_worker, args=(rank, tasks, input_root, output_root, q, args.prefetch))
         p.start()
         procs.append(p)
 
@@ -118,9 +147,9 @@ if __name__ == "__main__":
     with progress:
         total_task = progress.add_task("total", total=len(files), title="Total")
         worker_tasks = {}
-        for rank, chunk in enumerate(chunks):
+        for rank in range(workers):
             worker_tasks[rank] = progress.add_task(
-                f"worker-{rank+1}", total=len(chunk),
+                f"worker-{rank+1}", total=None,
                 title=f"Worker {rank+1}"
             )
 